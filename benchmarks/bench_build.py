@@ -0,0 +1,53 @@
+"""
+One-time builds: the search indexes over the tables and the data derived
+from the whole unicode database.
+"""
+import tempfile
+import unicodedata
+
+from mathutf import build, symbols
+from mathutf.index import SearchIndex
+
+
+def time_search_index():
+    SearchIndex(symbols.STORE.records())
+
+
+def time_fuzzy_index():
+    symbols._FUZZY_INDEX = None
+    symbols._get_fuzzy_index()
+
+
+def time_unicode_fuzzy_index():
+    symbols._UNICODE_FUZZY_INDEX = None
+    symbols._get_unicode_fuzzy_index()
+
+
+def time_scan_unicode():
+    build.scan(build.DEFAULT_PATTERN, workers=0)
+
+
+def time_build_name_index():
+    with tempfile.TemporaryDirectory() as dpath:
+        build.build(workers=0, dpath=dpath)
+
+
+def time_scan_unicode_legacy():
+    """
+    The loop of the old ``_dev_search_for_symbols`` (which went up to 1e8),
+    clipped to the last codepoint, for comparison with ``time_scan_unicode``.
+    """
+    found = []
+    for i in range(1, 0x110000):
+        try:
+            utf_name = unicodedata.name(chr(i))
+            if 'ELEMENT OF' in utf_name:
+                found.append((i, utf_name))
+        except Exception:
+            pass
+
+
+for _func in [time_fuzzy_index, time_unicode_fuzzy_index, time_scan_unicode,
+              time_build_name_index, time_scan_unicode_legacy]:
+    _func.number = 1
+    _func.repeat = 3
@@ -0,0 +1,85 @@
+"""
+Startup costs, measured in fresh interpreters.
+
+"cold" runs start with an empty bytecode cache, so every module is compiled.
+"warm" runs use a bytecode cache that was filled by an earlier run. Both use
+their own cache directory (``-X pycache_prefix``, Python 3.8+), so neither
+depends on the state of the ``__pycache__`` directories or on
+``PYTHONDONTWRITEBYTECODE``.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DPATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#: Number of fresh interpreters per measurement, the median is reported
+RUNS = 5
+
+_SNIPPET = ('import time; start = time.perf_counter(); import {}; '
+            'print(time.perf_counter() - start)')
+
+
+def _run(args, prefix, write=False):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in [REPO_DPATH, env.get('PYTHONPATH', '')] if p)
+    if write:
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+    else:
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+    command = [sys.executable, '-X', f'pycache_prefix={prefix}'] + args
+    start = time.perf_counter()
+    proc = subprocess.run(command, env=env, capture_output=True, text=True,
+                          check=True)
+    return proc.stdout, time.perf_counter() - start
+
+
+def _median_ms(args, cold, parse):
+    times = []
+    with tempfile.TemporaryDirectory() as prefix:
+        if not cold:
+            _run(args, prefix, write=True)
+        for _ in range(RUNS):
+            out, elapsed = _run(args, prefix)
+            times.append((float(out) if parse else elapsed) * 1e3)
+    return statistics.median(times)
+
+
+def _import_ms(modname, cold):
+    return _median_ms(['-c', _SNIPPET.format(modname)], cold, parse=True)
+
+
+def track_import_mathutf_cold():
+    return _import_ms('mathutf', cold=True)
+
+
+def track_import_mathutf_warm():
+    return _import_ms('mathutf', cold=False)
+
+
+def track_import_symbols_cold():
+    """
+    Importing :mod:`mathutf.symbols` builds the tables.
+    """
+    return _import_ms('mathutf.symbols', cold=True)
+
+
+def track_import_symbols_warm():
+    return _import_ms('mathutf.symbols', cold=False)
+
+
+def track_cli_query():
+    """
+    Wall time of ``python -m mathutf alpha``, including interpreter startup.
+    """
+    return _median_ms(['-m', 'mathutf', 'alpha'], cold=False, parse=False)
+
+
+for _func in [track_import_mathutf_cold, track_import_mathutf_warm,
+              track_import_symbols_cold, track_import_symbols_warm,
+              track_cli_query]:
+    _func.unit = 'ms'
@@ -0,0 +1,95 @@
+"""
+Queries against warm indexes. The one-time index builds are timed in
+``bench_build``.
+"""
+import random
+
+from mathutf import symbols
+
+QUERIES = []
+QUERIES_100K = []
+
+
+def make_queries(num, seed=0):
+    """
+    A realistic mix of exact keys, partial names, misses and a few regexes.
+    """
+    rng = random.Random(seed)
+    records = list(symbols.STORE.records())
+    queries = []
+    for idx in range(num):
+        record = rng.choice(records)
+        kind = idx % 10
+        if kind < 5:
+            query = record.key
+        elif kind < 8:
+            name = record.utf_name
+            start = rng.randrange(len(name))
+            query = name[start:start + rng.randint(3, 12)]
+        elif kind < 9:
+            query = record.key + '_missing_{}'.format(idx)
+        else:
+            query = '^{}$'.format(record.key)
+        queries.append(query)
+    return queries
+
+
+def setup():
+    QUERIES[:] = make_queries(1000)
+    QUERIES_100K[:] = make_queries(100000)
+    symbols._get_index()
+    symbols._get_fuzzy_index()
+    symbols._get_unicode_fuzzy_index()
+    list(symbols.search('arrow', all_unicode=True, literal=True))
+
+
+def time_search_literal():
+    list(symbols.search('element', literal=True))
+
+
+def time_search_regex():
+    list(symbols.search(r'^sup_[0-9]$'))
+
+
+def time_search_match_all():
+    list(symbols.search('*'))
+
+
+def time_search_all_unicode_literal():
+    list(symbols.search('arrow', all_unicode=True, literal=True))
+
+
+def time_search_many_1000():
+    symbols.search_many(QUERIES)
+
+
+def time_search_many_100k():
+    """
+    The batch size ``search_many`` was written for.
+    """
+    symbols.search_many(QUERIES_100K)
+
+
+time_search_many_100k.number = 1
+time_search_many_100k.repeat = 3
+
+
+def time_search_loop_1000():
+    """
+    The baseline for ``search_many``: one ``search`` per query.
+    """
+    search = symbols.search
+    for query in QUERIES:
+        list(search(query))
+
+
+def time_search_ranked():
+    symbols.search_ranked('superset equal')
+
+
+def time_search_ranked_typo():
+    symbols.search_ranked('lamda')
+
+
+def time_search_ranked_all_unicode():
+    symbols.search_ranked('double struck capital', all_unicode=True)
@@ -0,0 +1,52 @@
+"""
+Access to single symbols: ``SYMBOLS`` and package attributes, codepoint
+lookups, and updates of the tables.
+"""
+import mathutf
+from mathutf import symbols
+
+KEYS = []
+CHARS = []
+TEXT = ''
+
+
+def setup():
+    global TEXT
+    KEYS[:] = list(symbols.SYMBOLS)
+    CHARS[:] = [record.chr for record in symbols.STORE.records()]
+    # mostly prose with a math character every few words, ~100KB
+    TEXT = ('Let x ∈ ℝ and ε > 0, then there is a δ > 0 such that '
+            '|f(x) − f(y)| < ε whenever |x − y| < δ. ') * 1000
+    symbols.lookup('∈')
+
+
+def time_symbols_getitem():
+    table = symbols.SYMBOLS
+    for key in KEYS:
+        table[key]
+
+
+def time_package_getattr():
+    for key in KEYS:
+        getattr(mathutf, key)
+
+
+def time_lookup():
+    lookup = symbols.lookup
+    for char in CHARS:
+        lookup(char)
+
+
+def time_lookup_many_100k():
+    symbols.lookup_many(TEXT)
+
+
+def time_table_update():
+    """
+    Add and remove a table, then rebuild the search index for the change.
+    """
+    symbols.TABLES['bench'] = [
+        {'chr': 'ꙮ', 'key': 'bench_eye',
+         'utf_name': 'CYRILLIC LETTER MULTIOCULAR O'}]
+    del symbols.TABLES['bench']
+    symbols._get_index()
@@ -0,0 +1,49 @@
+"""
+Throughput of the text conversions and of corpus scanning, on ~100KB texts.
+"""
+import io
+
+from mathutf import corpus, transliterate
+
+TEX = ''
+UNICODE = ''
+
+
+def setup():
+    global TEX, UNICODE
+    TEX = (r'\forall x \in \mathbb{R}: x^2 \geq 0, \alpha_1 + \beta_2 \neq '
+           r'\gamma \implies \sum_{i} a_i \leq \infty. Some plain prose. ') * 1000
+    UNICODE = transliterate.to_unicode(TEX)
+    transliterate.to_latex(UNICODE)
+
+
+def time_to_unicode():
+    transliterate.to_unicode(TEX)
+
+
+def time_to_latex():
+    transliterate.to_latex(UNICODE)
+
+
+def time_iter_to_unicode():
+    for _ in transliterate.iter_to_unicode(io.StringIO(TEX), chunk_size=8192):
+        pass
+
+
+def time_iter_to_latex():
+    for _ in transliterate.iter_to_latex(io.StringIO(UNICODE), chunk_size=8192):
+        pass
+
+
+def time_build_transliterators():
+    transliterate._DEFAULT.clear()
+    transliterate._unicode_transliterator()
+    transliterate._latex_transliterator()
+
+
+def time_scan_text():
+    corpus.scan(UNICODE)
+
+
+def time_scan_text_positions():
+    corpus.scan(UNICODE, positions=True)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Run the mathutf benchmarks and store the results as JSON.
+
+Benchmarks live in ``benchmarks/bench_*.py`` and follow the naming of `asv
+<https://asv.readthedocs.io>`_, so they can be run by either tool:
+
+* ``time_*`` functions are timed by the runner. Like :mod:`timeit` each is
+  called in a loop (``number`` calls, chosen so a loop takes at least
+  ``--min-time`` seconds unless the function sets a ``number`` attribute),
+  the loop is repeated ``repeat`` times and the per call time of every loop
+  is recorded.
+
+* ``track_*`` functions measure something themselves (e.g. the import time
+  of a fresh interpreter) and return a number, in the unit given by their
+  ``unit`` attribute.
+
+A module may define ``setup()``, which is called once before its benchmarks
+and is not timed.
+
+Results are written to ``benchmarks/results/<commit>.json`` (``-dirty`` is
+appended if the work tree has changes). Compare two result files to find
+regressions between commits:
+
+CommandLine:
+    # run everything, results go to benchmarks/results/
+    python benchmarks/run.py
+
+    # a subset, quickly (one call per benchmark)
+    python benchmarks/run.py --filter search --quick
+
+    # compare two runs, exits 1 if anything is more than 20% slower
+    git checkout main && python benchmarks/run.py --output main.json
+    git checkout my-branch && python benchmarks/run.py --output new.json
+    python benchmarks/run.py --compare main.json new.json --threshold 1.2
+"""
+import argparse
+import datetime
+import gc
+import importlib.util
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DPATH = os.path.dirname(os.path.abspath(__file__))
+REPO_DPATH = os.path.dirname(BENCH_DPATH)
+RESULTS_DPATH = os.path.join(BENCH_DPATH, 'results')
+
+#: Default number of timed loops per benchmark
+REPEAT = 5
+
+#: Default minimum duration of one timed loop in seconds
+MIN_TIME = 0.05
+
+
+def discover(pattern=None):
+    """
+    Find the benchmarks.
+
+    Args:
+        pattern (str | None): only keep benchmarks whose name (e.g.
+            ``bench_search.time_literal``) matches this regex
+
+    Returns:
+        List[Tuple[module, List[Tuple[str, Callable]]]]
+    """
+    if REPO_DPATH not in sys.path:
+        # benchmark the work tree, not an installed copy
+        sys.path.insert(0, REPO_DPATH)
+    found = []
+    for fname in sorted(os.listdir(BENCH_DPATH)):
+        if not (fname.startswith('bench_') and fname.endswith('.py')):
+            continue
+        modname = fname[:-3]
+        spec = importlib.util.spec_from_file_location(
+            modname, os.path.join(BENCH_DPATH, fname))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        benches = []
+        for attr in sorted(vars(module)):
+            if not attr.startswith(('time_', 'track_')):
+                continue
+            name = f'{modname}.{attr}'
+            if pattern is None or re.search(pattern, name):
+                benches.append((name, getattr(module, attr)))
+        if benches:
+            found.append((module, benches))
+    return found
+
+
+def _loop(func, number):
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def time_func(func, repeat=REPEAT, min_time=MIN_TIME):
+    """
+    Time a function like :meth:`timeit.Timer.autorange`.
+
+    Returns:
+        Dict: the per call times of each loop and a summary
+    """
+    number = getattr(func, 'number', None)
+    repeat = getattr(func, 'repeat', repeat)
+    if number is None:
+        number = 1
+        while True:
+            elapsed = _loop(func, number)
+            if elapsed >= min_time:
+                break
+            number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed))
+    values = [_loop(func, number) / number for _ in range(repeat)]
+    return {
+        'unit': 'seconds',
+        'number': number,
+        'repeat': repeat,
+        'min': min(values),
+        'median': statistics.median(values),
+        'values': values,
+    }
+
+
+def track_func(func):
+    return {'unit': getattr(func, 'unit', 'unit'), 'value': func()}
+
+
+def _git(*args):
+    try:
+        proc = subprocess.run(['git'] + list(args), cwd=REPO_DPATH,
+                              capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def environment():
+    """
+    Describe the commit and machine the benchmarks ran on.
+    """
+    commit = _git('rev-parse', '--short', 'HEAD')
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': commit,
+        'dirty': bool(status),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(pattern=None, repeat=REPEAT, min_time=MIN_TIME, quick=False,
+        verbose=True):
+    """
+    Run the benchmarks.
+
+    Args:
+        pattern (str | None): see :func:`discover`
+        repeat (int): timed loops per benchmark
+        min_time (float): minimum duration of a timed loop
+        quick (bool): call each benchmark once, to check that they work
+        verbose (bool): print each result as it is measured
+
+    Returns:
+        Dict: the environment and a mapping from names to results
+    """
+    results = {}
+    for module, benches in discover(pattern):
+        setup = getattr(module, 'setup', None)
+        if setup is not None:
+            setup()
+        for name, func in benches:
+            if name.split('.')[1].startswith('track_'):
+                result = track_func(func)
+                text = f"{result['value']:.4g} {result['unit']}"
+            elif quick:
+                result = {'unit': 'seconds', 'number': 1, 'repeat': 1}
+                result['min'] = result['median'] = _loop(func, 1)
+                result['values'] = [result['min']]
+                text = _format_seconds(result['median'])
+            else:
+                result = time_func(func, repeat=repeat, min_time=min_time)
+                text = (f"{_format_seconds(result['median'])} "
+                        f"(min {_format_seconds(result['min'])}, "
+                        f"{result['number']} x {result['repeat']})")
+            results[name] = result
+            if verbose:
+                print(f'{name:<48} {text}', flush=True)
+    return {'env': environment(), 'results': results}
+
+
+def _format_seconds(seconds):
+    for unit, scale in [('s', 1), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= scale:
+            return f'{seconds / scale:.3g}{unit}'
+    return f'{seconds / 1e-9:.3g}ns'
+
+
+def _value(result):
+    return result['median'] if 'median' in result else result['value']
+
+
+def compare(old, new, threshold=1.2, verbose=True):
+    """
+    Compare two sets of results.
+
+    Args:
+        old (Dict): results returned by :func:`run` (or loaded from JSON)
+        new (Dict): later results
+        threshold (float): a benchmark regressed if new / old exceeds this
+
+    Returns:
+        List[str]: the names of the benchmarks that regressed
+    """
+    regressed = []
+    rows = []
+    for name in sorted(set(old['results']) & set(new['results'])):
+        before = _value(old['results'][name])
+        after = _value(new['results'][name])
+        ratio = after / before if before else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = 'slower'
+            regressed.append(name)
+        elif ratio < 1 / threshold:
+            flag = 'faster'
+        rows.append((name, before, after, ratio, flag))
+    if verbose:
+        print(f"{'benchmark':<48} {'old':>10} {'new':>10} {'ratio':>7}")
+        for name, before, after, ratio, flag in rows:
+            print(f'{name:<48} {before:>10.4g} {after:>10.4g} '
+                  f'{ratio:>7.2f} {flag}')
+        for name in sorted(set(old['results']) ^ set(new['results'])):
+            print(f'{name:<48} only in one of the results')
+    return regressed
+
+
+def _load(fpath):
+    with open(fpath) as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--filter', default=None,
+        help='only run benchmarks whose name matches this regex')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--min-time', type=float, default=MIN_TIME)
+    parser.add_argument(
+        '--quick', action='store_true',
+        help='call each benchmark once, to check that they still work')
+    parser.add_argument(
+        '--output', default=None,
+        help='where to write the JSON results, defaults to '
+             'benchmarks/results/<commit>.json')
+    parser.add_argument(
+        '--compare', nargs='+', default=None, metavar='JSON',
+        help=('compare an older results file with a newer one (or with a '
+              'fresh run if only one is given)'))
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare takes one or two files')
+    if args.compare and len(args.compare) == 2:
+        old, new = [_load(fpath) for fpath in args.compare]
+        return 1 if compare(old, new, args.threshold) else 0
+
+    results = run(args.filter, repeat=args.repeat, min_time=args.min_time,
+                  quick=args.quick)
+    fpath = args.output
+    if fpath is None:
+        env = results['env']
+        stem = (env['commit'] or 'unknown') + ('-dirty' if env['dirty'] else '')
+        os.makedirs(RESULTS_DPATH, exist_ok=True)
+        fpath = os.path.join(RESULTS_DPATH, stem + '.json')
+    with open(fpath, 'w') as file:
+        json.dump(results, file, indent=1)
+    print(f'wrote {fpath}')
+    if args.compare:
+        old = _load(args.compare[0])
+        return 1 if compare(old, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
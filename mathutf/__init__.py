@@ -1,18 +1,67 @@
 __version__ = '0.1.0'
 
-from mathutf import symbols
+# Attributes are resolved lazily (PEP 562) so ``import mathutf`` does not build
+# the symbol tables. Modules and functions are cached here on first access.
+# Symbol names like ``mathutf.alpha`` are looked up in
+# :data:`mathutf.symbols.SYMBOLS` every time, so they follow table changes.
+_LAZY_ATTRS = {
+    'symbols': None,
+    'aio': None,
+    'client': None,
+    'corpus': None,
+    'instrument': None,
+    'registry': None,
+    'server': None,
+    'search': 'symbols',
+    'search_many': 'symbols',
+    'search_ranked': 'symbols',
+    'lookup': 'symbols',
+    'lookup_many': 'symbols',
+    'scan': 'corpus',
+    'scan_files': 'corpus',
+    'to_unicode': 'transliterate',
+    'iter_to_unicode': 'transliterate',
+    'to_latex': 'transliterate',
+    'iter_to_latex': 'transliterate',
+    'to_subscript': 'transliterate',
+    'to_superscript': 'transliterate',
+    'render_scripts': 'transliterate',
+    'style': 'styles',
+    'fold': 'folding',
+    'register_table': 'registry',
+    'unregister_table': 'registry',
+}
 
-from mathutf.symbols import search
 
+def __getattr__(key):
+    import importlib
+    if key in _LAZY_ATTRS:
+        modname = _LAZY_ATTRS[key]
+        if modname is None:
+            value = importlib.import_module('mathutf.' + key)
+        else:
+            module = importlib.import_module('mathutf.' + modname)
+            value = getattr(module, key)
+    elif key == '__all__':
+        # Not cached, the symbol tables may change at runtime
+        return _compute_all()
+    elif key.startswith('__'):
+        raise AttributeError(f'module {__name__!r} has no attribute {key!r}')
+    else:
+        from mathutf.symbols import SYMBOLS
+        try:
+            return SYMBOLS[key]
+        except KeyError:
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {key!r}') from None
+    globals()[key] = value
+    return value
 
-globals().update(symbols.SYMBOLS)
-# def __getattr__(key):
-#     return symbols.SYMBOLS[key]
 
-
-def __dir__():
-    return __all__
+def _compute_all():
+    from mathutf.symbols import SYMBOLS
+    return list(_LAZY_ATTRS) + list(SYMBOLS)
 
 
-__all__ = ['search', 'symbols']
-__all__ += list(symbols.SYMBOLS)
+def __dir__():
+    return _compute_all()
@@ -1,14 +1,124 @@
-# PYTHON_ARGCOMPLETE_OK
 #!/usr/bin/env python3
-import scriptconfig as scfg
-import ubelt as ub
+"""
+The mathutf command line interface.
 
+The default code path only uses the standard library so shell prompts and git
+hooks that call ``python -m mathutf`` do not pay for importing heavy
+renderers. ``--format=rich`` and ``--format=pandas`` import those libraries
+on demand.
 
-class MathUTFCLI(scfg.DataConfig):
-    query = scfg.Value(None, help=ub.paragraph(
-        '''
-        if specified search for a symbol related to the query
-        '''), position=1)
+The machine readable formats (``json``, ``jsonl``, ``tsv`` and ``csv``) write
+each row as soon as the search produces it, so pipelines see results
+incrementally and memory stays bounded. ``--limit`` stops the search early
+and ``--fields`` selects the columns.
+
+Queries are matched as literal substrings unless ``--regex`` is given, the
+query ``*`` lists every symbol.
+
+``mathutf scan [PATH ...]`` counts the math characters used by files (or
+stdin), see :mod:`mathutf.corpus`.
+
+``mathutf serve [--socket [PATH]]`` keeps the indexes warm and answers JSON
+line requests, see :mod:`mathutf.server` and :mod:`mathutf.client`.
+"""
+
+#: Columns shown for each search result
+COLUMNS = ['chr', 'key', 'utf_name', 'tex', 'group', 'alias']
+
+#: Columns shown for each character found by ``mathutf scan``
+SCAN_COLUMNS = ['chr', 'key', 'group', 'count']
+
+#: Fields that ``--fields`` may select
+FIELDS = ['chr', 'key', 'utf_name', 'tex', 'group', 'alias', 'references']
+
+#: Output formats accepted by ``--format``
+FORMATS = ['plain', 'rich', 'pandas', 'json', 'jsonl', 'tsv', 'csv']
+
+
+class MathUTFCLI:
+    """
+    Search for math unicode symbols.
+
+    Example:
+        >>> from mathutf.__main__ import MathUTFCLI
+        >>> MathUTFCLI.main(cmdline=['--regex', '^sup_[12]$'])
+        chr  key    utf_name         tex  group         alias
+        ¹    sup_1  SUPERSCRIPT ONE  ^1   superscripts
+        ²    sup_2  SUPERSCRIPT TWO  ^2   superscripts  squared
+        >>> MathUTFCLI.main(cmdline=[
+        >>>     'sup_', '--format', 'jsonl', '--fields', 'chr,key,alias',
+        >>>     '--limit', '3'])
+        {"chr": "⁰", "key": "sup_0", "alias": []}
+        {"chr": "¹", "key": "sup_1", "alias": []}
+        {"chr": "²", "key": "sup_2", "alias": ["squared"]}
+    """
+    __default__ = {
+        'query': None,
+        'format': 'plain',
+        'regex': False,
+        'limit': None,
+        'fields': None,
+        'verbose': False,
+    }
+
+    @classmethod
+    def parser(cls):
+        import argparse
+        parser = argparse.ArgumentParser(
+            prog='mathutf', description=cls.__doc__.strip().split('\n')[0])
+        parser.add_argument(
+            'query', nargs='?', default=None,
+            help='if specified search for a symbol related to the query')
+        parser.add_argument(
+            '--format', default='plain', choices=FORMATS,
+            help=(
+                'how to print results. The default "plain" format only uses '
+                'the standard library. "json", "jsonl", "tsv" and "csv" '
+                'stream rows as they are found. Without a query these list '
+                'every symbol'))
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='stop after this many results')
+        parser.add_argument(
+            '--fields', default=None,
+            help=(
+                'comma separated fields to output, from ' + ','.join(FIELDS) +
+                '. Defaults to ' + ','.join(COLUMNS)))
+        parser.add_argument(
+            '--regex', action='store_true',
+            help=(
+                'treat the query as a case insensitive regular expression '
+                'instead of a literal substring'))
+        parser.add_argument(
+            '-v', '--verbose', action='store_true',
+            help='print the resolved configuration before running')
+        return parser
+
+    @classmethod
+    def cli(cls, cmdline=1, data=None):
+        """
+        Resolve the configuration from the command line and keyword defaults.
+
+        Args:
+            cmdline (bool | List[str]): if truthy parse arguments, either from
+                the given list or from ``sys.argv``.
+            data (Dict | None): overrides for the defaults
+
+        Returns:
+            Dict
+        """
+        config = dict(cls.__default__)
+        if data:
+            unknown = set(data) - set(config)
+            if unknown:
+                raise ValueError(f'Unknown config options: {sorted(unknown)}')
+            config.update(data)
+        if cmdline:
+            argv = None if cmdline is True or cmdline == 1 else cmdline
+            parser = cls.parser()
+            parser.set_defaults(**config)
+            config.update(vars(parser.parse_args(argv)))
+        return config
 
     @classmethod
     def main(cls, cmdline=1, **kwargs):
@@ -18,23 +128,296 @@ class MathUTFCLI(scfg.DataConfig):
             >>> from mathutf.__main__ import *  # NOQA
             >>> cmdline = 0
             >>> kwargs = dict()
-            >>> cls = MainCLI
+            >>> cls = MathUTFCLI
             >>> cls.main(cmdline=cmdline, **kwargs)
         """
-        import rich
-        config = cls.cli(cmdline=cmdline, data=kwargs, strict=True)
-        rich.print('config = ' + ub.urepr(config, nl=1))
+        argv = _argv(cmdline)
+        if argv and argv[0] in SUBCOMMANDS:
+            return SUBCOMMANDS[argv[0]].main(cmdline=argv[1:], **kwargs)
+        config = cls.cli(cmdline=cmdline, data=kwargs)
+        if config['verbose']:
+            print('config = {}'.format(config))
 
-        if config.query is None:
+        fmt = config['format']
+        fields = _resolve_fields(config['fields'])
+        if config['query'] is None and fmt not in WRITERS:
             from mathutf.symbols import USEFUL_SYMBOLS
-            print(ub.highlight_code(USEFUL_SYMBOLS, 'reStructuredText'))
+            if fmt == 'plain':
+                print(USEFUL_SYMBOLS)
+            else:
+                import ubelt as ub
+                print(ub.highlight_code(USEFUL_SYMBOLS, 'reStructuredText'))
+            return
+        if config['query'] is None:
+            from mathutf.symbols import STORE
+            records = STORE.records()
+        else:
+            import re
+            from mathutf.symbols import search
+            try:
+                # a generator, but the query is checked before it is returned
+                records = search(config['query'],
+                                 literal=not config['regex'])
+            except (ValueError, re.error) as ex:
+                # UnsafePatternError is a ValueError
+                import sys
+                print(f'mathutf: invalid query: {ex}', file=sys.stderr)
+                raise SystemExit(2)
+        if config['limit'] is not None:
+            import itertools
+            records = itertools.islice(records, max(0, config['limit']))
+        rows = (_project(record, fields) for record in records)
+        if fmt in WRITERS:
+            _stream(WRITERS[fmt], rows, fields)
+        elif fmt == 'plain':
+            _print_plain(list(rows), columns=fields)
+        elif fmt == 'rich':
+            _print_rich(list(rows), columns=fields)
+        elif fmt == 'pandas':
+            _print_pandas(list(rows))
         else:
-            import mathutf
-            results = list(mathutf.search(config.query))
-            import pandas as pd
-            import rich
-            import rich.markup
-            rich.print(rich.markup.escape(pd.DataFrame(results).to_string()))
+            raise KeyError(fmt)
+
+
+class ScanCLI(MathUTFCLI):
+    """
+    Count the math characters used by files.
+
+    Example:
+        >>> import pathlib, tempfile
+        >>> from mathutf.__main__ import MathUTFCLI
+        >>> fpath = pathlib.Path(tempfile.mkdtemp()) / 'a.txt'
+        >>> _ = fpath.write_text('∀x ∈ A: x ≤ y ∧ y ≤ x', encoding='utf8')
+        >>> MathUTFCLI.main(cmdline=['scan', str(fpath)])
+        chr  key        group        count
+        ≤    le         relational   2
+        ∀    forall     quantifiers  1
+        ∈    elementof  quantifiers  1
+        ∧    and        logic        1
+        5 math characters in 1 source
+    """
+    __default__ = {
+        'paths': [],
+        'workers': None,
+        'fold': True,
+        'verbose': False,
+    }
+
+    @classmethod
+    def parser(cls):
+        import argparse
+        parser = argparse.ArgumentParser(
+            prog='mathutf scan',
+            description=cls.__doc__.strip().split('\n')[0])
+        parser.add_argument(
+            'paths', nargs='*', default=[],
+            help='UTF-8 encoded files, read stdin if none or "-" are given')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='number of worker processes (0 scans in process)')
+        parser.add_argument(
+            '--no-fold', dest='fold', action='store_false',
+            help='only count the exact table characters, not look-alikes '
+                 'such as µ for μ')
+        parser.add_argument(
+            '-v', '--verbose', action='store_true',
+            help='print the resolved configuration before running')
+        return parser
+
+    @classmethod
+    def main(cls, cmdline=1, **kwargs):
+        import sys
+        from mathutf import corpus
+        config = cls.cli(cmdline=cmdline, data=kwargs)
+        if config['verbose']:
+            print('config = {}'.format(config))
+        paths = config['paths'] or ['-']
+        try:
+            report = corpus.scan_files(
+                [p for p in paths if p != '-'], workers=config['workers'],
+                fold=config['fold'])
+            if '-' in paths:
+                report.update(corpus.scan(sys.stdin.buffer,
+                                          fold=config['fold']))
+        except OSError as ex:
+            print(f'mathutf: {ex}', file=sys.stderr)
+            raise SystemExit(2)
+        _print_plain(report.rows(), columns=SCAN_COLUMNS)
+        num = len(report.sources)
+        plural = '' if num == 1 else 's'
+        print(f'{report.total} math characters in {num} source{plural}')
+
+
+class ServeCLI(MathUTFCLI):
+    """
+    Answer JSON line requests with warm search indexes.
+    """
+    __default__ = {
+        'socket': None,
+        'verbose': False,
+    }
+
+    @classmethod
+    def parser(cls):
+        import argparse
+        parser = argparse.ArgumentParser(
+            prog='mathutf serve',
+            description=cls.__doc__.strip().split('\n')[0])
+        parser.add_argument(
+            '--socket', nargs='?', const='', default=None,
+            help=(
+                'listen on a Unix socket (by default $MATHUTF_SOCKET or a '
+                'per-user file) instead of stdin / stdout'))
+        parser.add_argument(
+            '-v', '--verbose', action='store_true',
+            help='print the resolved configuration before running')
+        return parser
+
+    @classmethod
+    def main(cls, cmdline=1, **kwargs):
+        import sys
+        from mathutf import server
+        config = cls.cli(cmdline=cmdline, data=kwargs)
+        if config['verbose']:
+            # stdout carries the responses
+            print('config = {}'.format(config), file=sys.stderr)
+        if config['socket'] is None:
+            server.serve(stdio=True)
+            return
+        try:
+            server.serve(config['socket'] or None)
+        except OSError as ex:
+            print(f'mathutf: {ex}', file=sys.stderr)
+            raise SystemExit(2)
+
+
+#: Subcommands, selected by the first argument
+SUBCOMMANDS = {
+    'scan': ScanCLI,
+    'serve': ServeCLI,
+}
+
+
+def _argv(cmdline):
+    import sys
+    if not cmdline:
+        return []
+    if cmdline is True or cmdline == 1:
+        return sys.argv[1:]
+    return list(cmdline)
+
+
+def _resolve_fields(fields):
+    """
+    Parse and check the ``--fields`` option.
+    """
+    if fields is None:
+        return COLUMNS
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown or not fields:
+        import sys
+        print(f'mathutf: unknown fields {unknown}, choose from {FIELDS}',
+              file=sys.stderr)
+        raise SystemExit(2)
+    return list(fields)
+
+
+def _project(record, fields):
+    """
+    The selected fields of a :class:`mathutf.records.SymbolRecord`.
+    """
+    row = {}
+    for field in fields:
+        value = getattr(record, field)
+        row[field] = list(value) if isinstance(value, tuple) else value
+    return row
+
+
+def _cell(item, column):
+    value = item.get(column, None)
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(value)
+    return str(value)
+
+
+def _print_plain(results, columns=COLUMNS):
+    """
+    Print results as an aligned text table using only the standard library.
+    """
+    rows = [columns] + [[_cell(item, c) for c in columns] for item in results]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        line = '  '.join(cell.ljust(width) for cell, width in zip(row, widths))
+        print(line.rstrip())
+
+
+def _print_rich(results, columns=COLUMNS):
+    import rich
+    import rich.markup
+    import rich.table
+    table = rich.table.Table(*columns)
+    for item in results:
+        table.add_row(*[rich.markup.escape(_cell(item, c)) for c in columns])
+    rich.print(table)
+
+
+def _print_pandas(results):
+    import pandas as pd
+    print(pd.DataFrame(results).to_string())
+
+
+def _write_json(rows, fields, file):
+    import json
+    sep = '\n'
+    file.write('[')
+    for row in rows:
+        file.write(sep)
+        file.write(json.dumps(row, ensure_ascii=False))
+        sep = ',\n'
+    file.write('\n]\n')
+
+
+def _write_jsonl(rows, fields, file):
+    import json
+    for row in rows:
+        file.write(json.dumps(row, ensure_ascii=False))
+        file.write('\n')
+
+
+def _write_delimited(delimiter):
+    def _write(rows, fields, file):
+        import csv
+        writer = csv.writer(file, delimiter=delimiter, lineterminator='\n')
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow([_cell(row, f) for f in fields])
+    return _write
+
+
+#: Formats that are written one row at a time, as rows are produced
+WRITERS = {
+    'json': _write_json,
+    'jsonl': _write_jsonl,
+    'tsv': _write_delimited('\t'),
+    'csv': _write_delimited(','),
+}
+
+
+def _stream(writer, rows, fields):
+    import sys
+    try:
+        writer(rows, fields, sys.stdout)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. ``| head``), silence the final flush
+        import os
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        raise SystemExit(1)
 
 
 __cli__ = MathUTFCLI
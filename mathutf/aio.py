@@ -0,0 +1,369 @@
+r"""
+An :mod:`asyncio` front end to searching and transliteration.
+
+Everything here can be awaited from an event loop without stalling it:
+
+* Slow one-time work (importing the symbol tables, building the search
+  indexes, loading the unicode name index) and large batch jobs run in a
+  managed executor (see :func:`get_executor`).
+
+* Work that yields many results is done in slices. The loop is given control
+  back (``await asyncio.sleep(0)``) whenever a slice has run for longer than
+  the time budget, :data:`BUDGET` by default.
+
+* Large texts are converted in chunks of at most :data:`CHUNK_SIZE`
+  characters. The regex engine holds the GIL for the whole of a call, so this
+  also bounds how long a conversion running in a worker thread can block the
+  loop.
+
+Example:
+    >>> import asyncio
+    >>> from mathutf import aio
+    >>> async def main():
+    ...     found = await aio.search('^sup_[12]$')
+    ...     text = await aio.to_unicode(r'\alpha \leq \beta')
+    ...     pieces = [piece async for piece in aio.aiter_to_latex(['x₁₂ ', '≤ α'])]
+    ...     return [r.key for r in found], text, ''.join(pieces)
+    >>> asyncio.run(main())
+    (['sup_1', 'sup_2'], 'α ≤ β', 'x_{12} \\leq \\alpha')
+"""
+import asyncio
+import sys
+import threading
+import time
+
+#: Default number of seconds a slice of work may run before yielding to the
+#: event loop
+BUDGET = 0.005
+
+#: Texts are transliterated in pieces of at most this many characters
+CHUNK_SIZE = 1 << 14
+
+#: Number of worker threads in the default executor
+MAX_WORKERS = 4
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the executor used for offloaded work, creating a thread pool on
+    first use.
+
+    Returns:
+        concurrent.futures.Executor
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=MAX_WORKERS, thread_name_prefix='mathutf')
+    return _EXECUTOR
+
+
+def set_executor(executor):
+    """
+    Use a different executor for offloaded work. The caller is responsible
+    for shutting it down.
+
+    Args:
+        executor (concurrent.futures.Executor | None): the new executor, or
+            None to go back to a default thread pool
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        _EXECUTOR = executor
+
+
+def shutdown(wait=True):
+    """
+    Shut down the current executor. A new default one is created if more
+    work is submitted later.
+
+    Args:
+        wait (bool): wait for pending work to finish
+    """
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_in_executor(func, *args):
+    """
+    Run a function in the managed executor and await its result.
+
+    Args:
+        func (Callable): the function
+        *args: positional arguments for func
+
+    Returns:
+        Any: the result of ``func(*args)``
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+class _Pacer:
+    """
+    Tracks how long the current slice of work has held the loop.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = BUDGET if budget is None else budget
+        self.deadline = time.perf_counter() + self.budget
+
+    async def tick(self):
+        if time.perf_counter() >= self.deadline:
+            await asyncio.sleep(0)
+            self.deadline = time.perf_counter() + self.budget
+
+
+async def _symbols():
+    """
+    Import :mod:`mathutf.symbols` (which builds the tables) off the loop.
+    """
+    if 'mathutf.symbols' not in sys.modules:
+        await run_in_executor(__import__, 'mathutf.symbols')
+    return sys.modules['mathutf.symbols']
+
+
+async def _prepare(is_ready, build):
+    """
+    Run ``build`` in the executor unless ``is_ready()`` says its result is
+    already cached, so the loop only ever does cheap lookups.
+    """
+    if not is_ready():
+        await run_in_executor(build)
+
+
+async def aiter_search(query, as_dict=False, all_unicode=False,
+                       literal=False, budget=None):
+    """
+    Asynchronous version of :func:`mathutf.symbols.search`.
+
+    Args:
+        query (str): see :func:`mathutf.symbols.search`
+        as_dict (bool): yield plain dictionaries
+        all_unicode (bool): search the names of every unicode character
+        literal (bool): treat the query as a plain substring
+        budget (float | None): seconds of work between yields to the loop
+
+    Yields:
+        SymbolRecord | Dict: the matching symbols in table order
+    """
+    symbols = await _symbols()
+    if all_unicode:
+        from mathutf import unicode_names
+        await _prepare(lambda: unicode_names._GLOBAL_INDEX is not None,
+                       unicode_names.global_index)
+    else:
+        await _prepare(
+            lambda: (symbols._INDEX is not None and
+                     symbols._INDEX.signature == symbols.STORE.version),
+            symbols._get_index)
+    pacer = _Pacer(budget)
+    for item in symbols.search(query, as_dict=as_dict,
+                               all_unicode=all_unicode, literal=literal):
+        yield item
+        await pacer.tick()
+
+
+async def search(query, as_dict=False, all_unicode=False, literal=False,
+                 budget=None):
+    """
+    Asynchronous version of :func:`mathutf.symbols.search` that collects
+    the results.
+
+    Args:
+        query (str): see :func:`mathutf.symbols.search`
+        as_dict (bool): return plain dictionaries
+        all_unicode (bool): search the names of every unicode character
+        literal (bool): treat the query as a plain substring
+        budget (float | None): seconds of work between yields to the loop
+
+    Returns:
+        List[SymbolRecord | Dict]
+    """
+    return [item async for item in aiter_search(
+        query, as_dict=as_dict, all_unicode=all_unicode, literal=literal,
+        budget=budget)]
+
+
+async def search_many(queries, as_dict=False, literal=False):
+    """
+    Asynchronous version of :func:`mathutf.symbols.search_many`. The batch
+    runs in the executor.
+
+    Args:
+        queries (Iterable[str]): see :func:`mathutf.symbols.search_many`
+        as_dict (bool): return plain dictionaries
+        literal (bool): treat every query as a plain substring
+
+    Returns:
+        Dict[str, List[SymbolRecord | Dict]]
+    """
+    symbols = await _symbols()
+    queries = list(queries)
+    return await run_in_executor(
+        lambda: symbols.search_many(queries, as_dict=as_dict, literal=literal))
+
+
+async def search_ranked(query, k=10, as_dict=False, all_unicode=False):
+    """
+    Asynchronous version of :func:`mathutf.symbols.search_ranked`. The
+    indexes are built in the executor, queries are fast enough to answer
+    on the loop.
+
+    Args:
+        query (str): free text
+        k (int): the maximum number of results
+        as_dict (bool): return plain dictionaries
+        all_unicode (bool): also rank the names of every unicode character
+
+    Returns:
+        List[SymbolRecord | Dict]
+    """
+    symbols = await _symbols()
+    await _prepare(
+        lambda: (symbols._FUZZY_INDEX is not None and
+                 symbols._FUZZY_INDEX.signature == symbols.STORE.version),
+        symbols._get_fuzzy_index)
+    if all_unicode:
+        await _prepare(lambda: symbols._UNICODE_FUZZY_INDEX is not None,
+                       symbols._get_unicode_fuzzy_index)
+    return symbols.search_ranked(query, k=k, as_dict=as_dict,
+                                 all_unicode=all_unicode)
+
+
+async def _transliterator(name):
+    symbols = await _symbols()
+    from mathutf import transliterate
+    factory = {
+        'to_unicode': transliterate._unicode_transliterator,
+        'to_latex': transliterate._latex_transliterator,
+    }[name]
+
+    def _is_ready():
+        cached = transliterate._DEFAULT.get(name, None)
+        return cached is not None and cached[0] == symbols.STORE.version
+
+    await _prepare(_is_ready, factory)
+    return factory()
+
+
+def _split(text, chunk_size):
+    return (text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
+
+
+async def _convert(name, text, chunk_size):
+    trans = await _transliterator(name)
+    if len(text) <= chunk_size:
+        return trans.convert(text)
+    pieces = _split(text, chunk_size)
+    return await run_in_executor(
+        lambda: ''.join(trans.iter_convert(pieces)))
+
+
+async def _aiter_convert(name, source, chunk_size, budget):
+    trans = await _transliterator(name)
+    pacer = _Pacer(budget)
+    buf = ''
+    async for chunk in _aiter_chunks(source, chunk_size):
+        for piece in _split(chunk, chunk_size):
+            out, buf = trans.convert_partial(buf + piece)
+            if out:
+                yield out
+            await pacer.tick()
+    if buf:
+        yield trans.convert(buf)
+
+
+async def _aiter_chunks(source, chunk_size):
+    if hasattr(source, '__aiter__'):
+        async for chunk in source:
+            yield chunk
+    elif hasattr(source, 'read'):
+        # blocking reads happen off the loop
+        while True:
+            chunk = await run_in_executor(source.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+async def to_unicode(text, chunk_size=CHUNK_SIZE):
+    """
+    Asynchronous version of :func:`mathutf.transliterate.to_unicode`.
+
+    Texts longer than ``chunk_size`` are converted in the executor, one
+    chunk at a time.
+
+    Args:
+        text (str): text containing LaTeX macros
+        chunk_size (int): the largest piece converted in one call
+
+    Returns:
+        str
+    """
+    return await _convert('to_unicode', text, chunk_size)
+
+
+async def to_latex(text, chunk_size=CHUNK_SIZE):
+    """
+    Asynchronous version of :func:`mathutf.transliterate.to_latex`.
+
+    Texts longer than ``chunk_size`` are converted in the executor, one
+    chunk at a time.
+
+    Args:
+        text (str): unicode text
+        chunk_size (int): the largest piece converted in one call
+
+    Returns:
+        str
+    """
+    return await _convert('to_latex', text, chunk_size)
+
+
+def aiter_to_unicode(source, chunk_size=CHUNK_SIZE, budget=None):
+    """
+    Stream :func:`mathutf.transliterate.to_unicode` over an asynchronous
+    source with bounded memory.
+
+    Args:
+        source (AsyncIterable[str] | Iterable[str] | io.TextIOBase): the
+            input. Blocking ``read`` calls of file objects run in the
+            executor.
+        chunk_size (int): the largest piece converted in one call
+        budget (float | None): seconds of work between yields to the loop
+
+    Returns:
+        AsyncIterator[str]: pieces of converted text
+    """
+    return _aiter_convert('to_unicode', source, chunk_size, budget)
+
+
+def aiter_to_latex(source, chunk_size=CHUNK_SIZE, budget=None):
+    """
+    Stream :func:`mathutf.transliterate.to_latex` over an asynchronous
+    source with bounded memory.
+
+    Args:
+        source (AsyncIterable[str] | Iterable[str] | io.TextIOBase): the
+            input. Blocking ``read`` calls of file objects run in the
+            executor.
+        chunk_size (int): the largest piece converted in one call
+        budget (float | None): seconds of work between yields to the loop
+
+    Returns:
+        AsyncIterator[str]: pieces of converted text
+    """
+    return _aiter_convert('to_latex', source, chunk_size, budget)
@@ -0,0 +1,266 @@
+r"""
+Regenerate the data derived from the unicode database.
+
+This replaces the old ``_dev_search_for_symbols`` helper, which tried 100
+million codepoints one at a time. Here only :data:`ASSIGNED_RANGES
+<mathutf.unicode_names.ASSIGNED_RANGES>` are visited, the ranges are split
+into shards that are scanned by a process pool, and the per-shard results
+are merged into:
+
+* a candidate table: rows (``chr``, ``key``, ``utf_name``) in the format of
+  :data:`mathutf.symbols.TABLES` for every character whose name matches a
+  pattern, with keys shortened the way the curated tables spell them
+  (see :func:`candidate_key`), and
+
+* the sorted name index of :mod:`mathutf.unicode_names` (written to the
+  cache directory), which is what ``search(all_unicode=True)`` uses.
+
+CommandLine:
+    python -m mathutf.build --pattern 'ELEMENT OF'
+    python -m mathutf.build --pattern '\bSUBSCRIPT\b' --workers 4 --out candidates.json
+
+Example:
+    >>> from mathutf.build import build_candidates
+    >>> rows = build_candidates(r'^SUPERSCRIPT (ONE|TWO)$', workers=0)
+    >>> [(row['chr'], row['key']) for row in rows]
+    [('²', 'sup_2'), ('¹', 'sup_1')]
+"""
+import os
+import re
+import unicodedata
+
+from mathutf.unicode_names import ASSIGNED_RANGES, iter_named_codepoints
+
+#: The default candidate pattern (what the old helper selected)
+DEFAULT_PATTERN = 'ELEMENT OF'
+
+_DIGIT_NAMES = {unicodedata.name(c).replace('DIGIT ', '').lower(): c
+                for c in '0123456789'}
+
+_SET_RELATED = re.compile(r'\b(SUPERSET|SUBSET|SET)\b')
+
+_SCRIPT_REPLACEMENTS = [
+    ('latin_', ''),
+    ('greek_', ''),
+    ('subscript', 'sub'),
+    ('superscript', 'sup'),
+    ('small_letter_', ''),
+    ('_sign', ''),
+    ('parenthesis', 'paren'),
+    ('left_paren', 'lparen'),
+    ('right_paren', 'rparen'),
+    ('plus_with_sub_2', 'plus_sub_2'),
+    ('arabic_sub_alef', 'sub_alef'),
+]
+
+
+def candidate_key(utf_name):
+    """
+    Shorten a unicode name into a key in the style of the curated tables.
+
+    Args:
+        utf_name (str): a unicode character name
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.build import candidate_key
+        >>> candidate_key('SUBSCRIPT LEFT PARENTHESIS')
+        'sub_lparen'
+        >>> candidate_key('SUBSET OF OR EQUAL TO')
+        'subset_eq'
+    """
+    key = utf_name.replace('-', '_').replace(' ', '_').lower()
+    key = key.replace('equal', 'eq')
+    if _SET_RELATED.match(utf_name):
+        key = key.replace('_of', '').replace('_to', '').replace('_or', '')
+    if 'SUPERSCRIPT' in utf_name or 'SUBSCRIPT' in utf_name:
+        for old, new in _SCRIPT_REPLACEMENTS:
+            key = key.replace(old, new)
+        for name, digit in _DIGIT_NAMES.items():
+            key = key.replace(name, digit)
+    return key
+
+
+def shard_ranges(num_shards, ranges=None):
+    """
+    Split codepoint ranges into shards with about the same number of
+    codepoints.
+
+    Args:
+        num_shards (int): the number of shards wanted
+        ranges (List[Tuple[int, int]] | None): half-open ranges, defaults to
+            :data:`mathutf.unicode_names.ASSIGNED_RANGES`
+
+    Returns:
+        List[Tuple[int, int]]: half-open ranges in ascending order
+
+    Example:
+        >>> from mathutf.build import shard_ranges
+        >>> shard_ranges(3, [(0, 10), (20, 25)])
+        [(0, 5), (5, 10), (20, 25)]
+    """
+    if ranges is None:
+        ranges = ASSIGNED_RANGES
+    total = sum(hi - lo for lo, hi in ranges)
+    size = max(1, -(-total // max(1, num_shards)))
+    shards = []
+    for lo, hi in ranges:
+        for start in range(lo, hi, size):
+            shards.append((start, min(start + size, hi)))
+    return shards
+
+
+def scan_shard(shard, pattern=None):
+    """
+    Scan one shard of the codepoint space. Runs in a worker process.
+
+    Args:
+        shard (Tuple[int, int]): a half-open codepoint range
+        pattern (str | None): if given, also collect the characters whose
+            unicode name matches this regular expression
+
+    Returns:
+        Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+            every named codepoint in the shard and the matching ones
+    """
+    named = list(iter_named_codepoints(*shard))
+    matched = []
+    if pattern is not None:
+        search = re.compile(pattern).search
+        matched = [(cp, name) for cp, name in named if search(name)]
+    return named, matched
+
+
+def _default_workers():
+    cpus = os.cpu_count() or 1
+    # process startup is not worth it without a second CPU
+    return 0 if cpus < 2 else min(8, cpus)
+
+
+def scan(pattern=None, workers=None):
+    """
+    Scan every assigned codepoint, in parallel.
+
+    Args:
+        pattern (str | None): see :func:`scan_shard`
+        workers (int | None): number of processes. Defaults to the number
+            of CPUs (at most 8), or 0 on a single CPU machine. Use 0 to scan
+            in this process.
+
+    Returns:
+        Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+            every named codepoint and the ones matching pattern, in
+            codepoint order
+    """
+    if workers is None:
+        workers = _default_workers()
+    if pattern is not None:
+        re.compile(pattern)  # fail early on a bad pattern
+    named = []
+    matched = []
+    if workers <= 0:
+        results = [scan_shard(shard, pattern) for shard in shard_ranges(1)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        # a few shards per worker so a slow (dense) shard does not stall
+        # the others
+        shards = shard_ranges(workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                scan_shard, shards, [pattern] * len(shards)))
+    # shards are in ascending order, so concatenation keeps codepoint order
+    for shard_named, shard_matched in results:
+        named.extend(shard_named)
+        matched.extend(shard_matched)
+    return named, matched
+
+
+def candidate_rows(matched):
+    """
+    Args:
+        matched (Iterable[Tuple[int, str]]): codepoints and their names
+
+    Returns:
+        List[Dict]: rows in the layout of :data:`mathutf.symbols.TABLES`
+    """
+    return [{'chr': chr(cp), 'key': candidate_key(name), 'utf_name': name}
+            for cp, name in matched]
+
+
+def build_candidates(pattern=DEFAULT_PATTERN, workers=None):
+    """
+    Build the candidate table for a name pattern.
+
+    Args:
+        pattern (str): regular expression matched against unicode names
+        workers (int | None): see :func:`scan`
+
+    Returns:
+        List[Dict]: candidate rows in codepoint order
+    """
+    _, matched = scan(pattern, workers=workers)
+    return candidate_rows(matched)
+
+
+def build(pattern=DEFAULT_PATTERN, workers=None, index_fpath=None,
+          dpath=None):
+    """
+    Scan the unicode database once and regenerate both the candidate table
+    and the name index.
+
+    Args:
+        pattern (str | None): see :func:`build_candidates`
+        workers (int | None): see :func:`scan`
+        index_fpath (str | None): where to write the name index, defaults to
+            :func:`mathutf.unicode_names.default_fpath`
+        dpath (str | None): cache directory used when index_fpath is not
+            given
+
+    Returns:
+        Tuple[List[Dict], str]: the candidate rows and the index path
+    """
+    from mathutf import unicode_names
+    named, matched = scan(pattern, workers=workers)
+    if index_fpath is None:
+        index_fpath = unicode_names.default_fpath(dpath)
+    unicode_names.write_index(index_fpath, named)
+    return candidate_rows(matched), index_fpath
+
+
+def main(argv=None):
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(
+        prog='python -m mathutf.build',
+        description='Regenerate the candidate table and unicode name index')
+    parser.add_argument(
+        '--pattern', default=DEFAULT_PATTERN,
+        help='regex matched against unicode names to select candidates')
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='number of worker processes (0 scans in process)')
+    parser.add_argument(
+        '--out', default=None,
+        help='write the candidates as JSON here instead of printing them')
+    parser.add_argument(
+        '--no-index', action='store_true',
+        help='do not rewrite the cached unicode name index')
+    args = parser.parse_args(argv)
+    if args.no_index:
+        rows = build_candidates(args.pattern, workers=args.workers)
+    else:
+        rows, index_fpath = build(args.pattern, workers=args.workers)
+        print(f'wrote name index to {index_fpath}')
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump(rows, file, ensure_ascii=False, indent=1)
+        print(f'wrote {len(rows)} candidates to {args.out}')
+    else:
+        for row in rows:
+            print(f'{row!r},')
+
+
+if __name__ == '__main__':
+    main()
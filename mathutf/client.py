@@ -0,0 +1,223 @@
+"""
+A thin client for ``mathutf serve``.
+
+A client process only imports the standard library and this module: queries
+are sent as JSON lines over a Unix socket to a running server (see
+:mod:`mathutf.server`), which keeps the tables and search indexes warm. If no
+server is listening, the request is answered in process instead, so callers
+never need to know whether a server is running.
+
+CommandLine:
+    python -m mathutf serve --socket &
+    python -m mathutf.client 'element of'
+    python -m mathutf.client --method search_ranked 'lamda'
+
+Example:
+    >>> from mathutf import client
+    >>> [row['key'] for row in client.call('search', query='^sup_[12]$', literal=False)]
+    ['sup_1', 'sup_2']
+    >>> client.call('to_unicode', text=r'\\alpha \\leq \\beta')
+    'α ≤ β'
+"""
+import json
+import os
+import tempfile
+
+#: Environment variable that overrides :func:`default_socket_path`
+SOCKET_ENV = 'MATHUTF_SOCKET'
+
+#: Seconds to wait for a server to answer
+TIMEOUT = 10.0
+
+
+class RemoteError(Exception):
+    """
+    A request failed. Raised for both server and in-process answers.
+
+    Attributes:
+        kind (str): the name of the exception type raised by the handler,
+            e.g. ``'UnsafePatternError'``
+    """
+
+    def __init__(self, kind, message):
+        super().__init__(f'{kind}: {message}')
+        self.kind = kind
+
+
+def default_socket_path():
+    """
+    The socket the server listens on by default.
+
+    This is ``$MATHUTF_SOCKET`` if set, otherwise a per-user file in
+    ``$XDG_RUNTIME_DIR`` or the temporary directory.
+
+    Returns:
+        str
+    """
+    fpath = os.environ.get(SOCKET_ENV, '')
+    if fpath:
+        return fpath
+    dpath = os.environ.get('XDG_RUNTIME_DIR', '') or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(dpath, f'mathutf-{uid}.sock')
+
+
+def _unwrap(response):
+    if 'error' in response:
+        error = response['error']
+        raise RemoteError(error['type'], error['message'])
+    return response['result']
+
+
+class Client:
+    """
+    A connection to a running server.
+
+    Args:
+        fpath (str | None): the socket, defaults to
+            :func:`default_socket_path`
+        timeout (float): seconds to wait for the server
+
+    Raises:
+        OSError: if no server is listening
+
+    Example:
+        >>> # xdoctest: +SKIP
+        >>> from mathutf.client import Client
+        >>> with Client() as client:
+        >>>     client.call('lookup', chr='∇')['key']
+        'nabla'
+    """
+
+    def __init__(self, fpath=None, timeout=TIMEOUT):
+        import socket
+        if fpath is None:
+            fpath = default_socket_path()
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError('unix sockets are not supported on this platform')
+        self.fpath = fpath
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.connect(fpath)
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile('rwb')
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def request(self, method, **params):
+        """
+        Send one request and wait for the response.
+
+        Args:
+            method (str): see :data:`mathutf.server.METHODS`
+            **params: the arguments of the method
+
+        Returns:
+            Dict: the raw response
+        """
+        self._next_id += 1
+        message = {'id': self._next_id, 'method': method, 'params': params}
+        self._file.write(json.dumps(message, ensure_ascii=False).encode('utf8'))
+        self._file.write(b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('the server closed the connection')
+        return json.loads(line)
+
+    def call(self, method, **params):
+        """
+        Call a method on the server.
+
+        Args:
+            method (str): see :data:`mathutf.server.METHODS`
+            **params: the arguments of the method
+
+        Returns:
+            Any: the result
+
+        Raises:
+            RemoteError: if the method failed
+        """
+        return _unwrap(self.request(method, **params))
+
+
+def call(method, fpath=None, fallback=True, **params):
+    """
+    Call a method on the running server, or in process if there is none.
+
+    Args:
+        method (str): see :data:`mathutf.server.METHODS`
+        fpath (str | None): the socket, defaults to
+            :func:`default_socket_path`
+        fallback (bool): if False raise instead of answering in process
+        **params: the arguments of the method
+
+    Returns:
+        Any: the result
+
+    Raises:
+        RemoteError: if the method failed
+        OSError: if no server is running and fallback is False
+    """
+    try:
+        client = Client(fpath)
+    except OSError:
+        if not fallback:
+            raise
+        from mathutf.server import handle
+        response = handle({'id': None, 'method': method, 'params': params})
+    else:
+        with client:
+            response = client.request(method, **params)
+    return _unwrap(response)
+
+
+def main(argv=None):
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(
+        prog='python -m mathutf.client',
+        description='Search for math unicode symbols using a running server')
+    parser.add_argument('query', help='the query')
+    parser.add_argument(
+        '--method', default='search',
+        choices=['search', 'search_ranked', 'lookup'],
+        help='how to look up the query')
+    parser.add_argument(
+        '--regex', action='store_true',
+        help='treat a search query as a regular expression')
+    parser.add_argument(
+        '--socket', default=None, help='the server socket')
+    args = parser.parse_args(argv)
+    if args.method == 'search':
+        params = {'query': args.query, 'literal': not args.regex}
+    elif args.method == 'search_ranked':
+        params = {'query': args.query}
+    else:
+        params = {'chr': args.query}
+    try:
+        results = call(args.method, fpath=args.socket, **params)
+    except RemoteError as ex:
+        print(f'mathutf: invalid query: {ex}', file=sys.stderr)
+        raise SystemExit(2)
+    if args.method == 'lookup':
+        results = [] if results is None else [results]
+    from mathutf.__main__ import _print_plain
+    _print_plain(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+r"""
+Audit texts and files for the math characters they use.
+
+:func:`scan` counts every character of a text, file or stream that is in the
+symbol tables and returns a :class:`ScanReport` with the counts, per-group
+histograms and (optionally) the position of each occurrence.
+:func:`scan_files` scans many files in parallel across a process pool.
+
+The characters are found by a compiled regular expression, so the per
+character work happens inside the regex engine rather than in a Python loop:
+
+* files are memory mapped (or read at once if they are small) and searched
+  as UTF-8 bytes, without decoding, by a pattern whose alternatives are
+  arranged in a trie of their encodings (see :func:`byte_pattern`),
+
+* texts (``str``) are encoded and searched the same way, which is faster
+  than a character class. If positions are requested they are searched
+  with a character class so the offsets are in characters,
+
+* other file objects, e.g. ``sys.stdin``, are read in chunks of
+  :data:`CHUNK_SIZE`.
+
+The workers only see the set of characters to look for, not the symbol
+tables, so groups are attached to the counts by the calling process using
+the precomputed index of :func:`mathutf.symbols.lookup`. Look-alikes of the
+table characters (see :func:`mathutf.folding.variants`) are searched for by
+the same pattern and then counted as the character they fold to.
+
+CommandLine:
+    python -m mathutf scan paper.tex notes/*.md
+    cat dump.txt | python -m mathutf scan
+
+Example:
+    >>> from mathutf.corpus import scan
+    >>> report = scan('∀ε>0 ∃δ>0: |x−y| < δ ⇒ |f(x)−f(y)| < ε')
+    >>> report.total
+    11
+    >>> report.most_common(3)
+    [('ε', 2), ('>', 2), ('δ', 2)]
+    >>> report.groups()['relational']
+    Counter({'gt': 2, 'lt': 2})
+"""
+import functools
+import io
+import os
+import re
+from collections import Counter
+
+#: Number of characters (or bytes) read per chunk from file objects
+CHUNK_SIZE = 1 << 20
+
+#: Files at least this large are memory mapped instead of read
+MMAP_THRESHOLD = 1 << 20
+
+#: The source name used for texts
+TEXT_SOURCE = '<text>'
+
+
+class ScanReport:
+    """
+    The math characters found in one or more sources.
+
+    Attributes:
+        counts (collections.Counter): occurrences of each character
+        sources (List[str]): the scanned sources, :data:`TEXT_SOURCE` for
+            texts and the path (or ``name``) for files
+        positions (Dict[str, List[Tuple[int, str]]] | None): if positions
+            were requested, the offset and character of each occurrence per
+            source. Offsets are in characters for texts and text streams and
+            in bytes for paths and binary streams.
+    """
+
+    def __init__(self, counts=None, sources=None, positions=None):
+        self.counts = Counter() if counts is None else counts
+        self.sources = [] if sources is None else sources
+        self.positions = positions
+
+    def __repr__(self):
+        return (f'<ScanReport sources={len(self.sources)} total={self.total} '
+                f'distinct={len(self.counts)}>')
+
+    @property
+    def total(self):
+        """
+        int: the number of math characters found
+        """
+        return sum(self.counts.values())
+
+    def most_common(self, n=None):
+        """
+        Args:
+            n (int | None): number of characters, all by default
+
+        Returns:
+            List[Tuple[str, int]]
+        """
+        return self.counts.most_common(n)
+
+    def update(self, other):
+        """
+        Merge another report into this one.
+
+        Args:
+            other (ScanReport): a report of other sources
+
+        Returns:
+            ScanReport: this report
+        """
+        self.counts.update(other.counts)
+        self.sources.extend(other.sources)
+        if other.positions is not None:
+            if self.positions is None:
+                self.positions = {}
+            for source, found in other.positions.items():
+                self.positions.setdefault(source, []).extend(found)
+        return self
+
+    def groups(self, by='key'):
+        """
+        Histograms of the counts per symbol table.
+
+        Args:
+            by (str): the record field that labels the bins, e.g. ``'key'``
+                or ``'chr'``
+
+        Returns:
+            Dict[str, collections.Counter]: group name to histogram
+        """
+        from mathutf.symbols import lookup
+        groups = {}
+        for char, count in self.counts.most_common():
+            record = lookup(char)
+            if record is not None:
+                hist = groups.setdefault(record.group, Counter())
+                hist[getattr(record, by)] += count
+        return groups
+
+    def rows(self):
+        """
+        One dictionary per distinct character, most common first.
+
+        Returns:
+            List[Dict]: items with ``chr``, ``key``, ``group`` and ``count``
+        """
+        from mathutf.symbols import lookup
+        rows = []
+        for char, count in self.counts.most_common():
+            record = lookup(char)
+            if record is not None:
+                rows.append({'chr': char, 'key': record.key,
+                             'group': record.group, 'count': count})
+        return rows
+
+
+def _byte_trie(encoded):
+    """
+    Arrange byte strings into a trie regex, leaves that differ only in their
+    last byte become a character class. UTF-8 is a prefix code, so words
+    only end at leaves.
+
+    The first byte of every branch is kept a literal: the regex engine can
+    then skip ahead to the possible first bytes, which it does not do if
+    one of the alternatives is a character class.
+    """
+    trie = {}
+    for word in encoded:
+        node = trie
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def _emit(node, top=False):
+        leaves = []
+        branches = []
+        for byte in sorted(k for k in node if k is not None):
+            child = node[byte]
+            if list(child) == [None]:
+                leaves.append(byte)
+            else:
+                branches.append(re.escape(bytes([byte])) + _emit(child))
+        if len(leaves) == 1 or top:
+            branches.extend(re.escape(bytes([b])) for b in leaves)
+        elif leaves:
+            branches.append(
+                b'[' + b''.join(re.escape(bytes([b])) for b in leaves) + b']')
+        if len(branches) == 1:
+            return branches[0]
+        return b'(?:' + b'|'.join(branches) + b')'
+
+    return _emit(trie, top=True)
+
+
+def byte_pattern(chars):
+    r"""
+    Compile a pattern that finds characters in UTF-8 encoded bytes.
+
+    Args:
+        chars (Iterable[str]): the characters
+
+    Returns:
+        re.Pattern: a bytes pattern
+
+    Example:
+        >>> from mathutf.corpus import byte_pattern
+        >>> pat = byte_pattern(['∈', '∉', '>'])
+        >>> pat.pattern
+        b'(?:\xe2\x88[\x88\x89]|>)'
+        >>> pat.findall('x ∉ A > 0'.encode())
+        [b'\xe2\x88\x89', b'>']
+    """
+    return re.compile(_byte_trie(sorted({c.encode('utf8') for c in chars})))
+
+
+@functools.lru_cache(maxsize=8)
+def _patterns(chars):
+    text_pat = re.compile('[' + ''.join(map(re.escape, chars)) + ']')
+    return text_pat, byte_pattern(chars)
+
+
+def _table_chars(fold=True):
+    """
+    The characters to look for, and the variants to fold.
+    """
+    from mathutf.symbols import _get_codepoint_index
+    index = _get_codepoint_index()
+    if fold:
+        return tuple(sorted(index.rowids)), index.variants
+    chars = (char for char in index.rowids if char not in index.variants)
+    return tuple(sorted(chars)), {}
+
+
+def _fold_report(report, variants):
+    """
+    Count the variants found as the table characters they fold to.
+    """
+    counts = report.counts
+    folded = [char for char in counts if char in variants]
+    if not folded:
+        return report
+    for char in folded:
+        counts[variants[char]] += counts.pop(char)
+    if report.positions is not None:
+        for found in report.positions.values():
+            found[:] = [(pos, variants.get(char, char)) for pos, char in found]
+    return report
+
+
+def _count(patterns, data, positions):
+    """
+    Count (and optionally locate) the characters of a text or of UTF-8
+    encoded bytes.
+    """
+    text_pat, bytes_pat = patterns
+    if isinstance(data, str):
+        if positions:
+            found = [(m.start(), m.group()) for m in text_pat.finditer(data)]
+            return Counter(char for _, char in found), found
+        # the byte pattern is faster than the character class, even with
+        # the cost of encoding
+        data = data.encode('utf8', 'surrogatepass')
+    if positions:
+        found = [(m.start(), m.group().decode('utf8'))
+                 for m in bytes_pat.finditer(data)]
+        return Counter(char for _, char in found), found
+    counts = Counter(bytes_pat.findall(data))
+    return Counter({k.decode('utf8'): v for k, v in counts.items()}), None
+
+
+def _utf8_boundary(chunk):
+    """
+    The length of the longest prefix of chunk that does not end inside a
+    multi-byte UTF-8 sequence.
+    """
+    size = len(chunk)
+    idx = size - 1
+    while idx >= 0 and size - idx <= 4 and 0x80 <= chunk[idx] < 0xC0:
+        idx -= 1
+    if idx < 0 or chunk[idx] < 0x80:
+        return size
+    lead = chunk[idx]
+    need = 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    return idx if idx + need > size else size
+
+
+def _scan_stream(file, name, chars, positions, chunk_size):
+    patterns = _patterns(chars)
+    counts = Counter()
+    found = [] if positions else None
+    offset = 0
+    buf = b''
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        if not isinstance(chunk, str):
+            # do not split a character across two searches
+            chunk = buf + chunk
+            cut = _utf8_boundary(chunk)
+            chunk, buf = chunk[:cut], chunk[cut:]
+        part, where = _count(patterns, chunk, positions)
+        counts.update(part)
+        if positions:
+            found.extend((offset + pos, char) for pos, char in where)
+        offset += len(chunk)
+    if buf:
+        part, where = _count(patterns, buf, positions)
+        counts.update(part)
+        if positions:
+            found.extend((offset + pos, char) for pos, char in where)
+    return ScanReport(counts, [name], {name: found} if positions else None)
+
+
+def _scan_path(fpath, chars, positions=False):
+    """
+    Scan one file. Runs in a worker process.
+    """
+    import mmap
+    patterns = _patterns(chars)
+    name = os.fspath(fpath)
+    with open(fpath, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                counts, found = _count(patterns, data, positions)
+        elif size > 0:
+            counts, found = _count(patterns, file.read(), positions)
+        else:
+            # not a regular file (e.g. a pipe), or empty
+            return _scan_stream(file, name, chars, positions, CHUNK_SIZE)
+    return ScanReport(counts, [name], {name: found} if positions else None)
+
+
+def scan(source, positions=False, chunk_size=CHUNK_SIZE, fold=True):
+    """
+    Count the math characters of a text, file or stream.
+
+    Args:
+        source (str | os.PathLike | io.IOBase): a text, the path of a UTF-8
+            encoded file (a :class:`pathlib.Path` or other path-like object,
+            plain strings are always treated as text), or a file object open
+            in text or binary mode.
+        positions (bool): if True also record where each character occurs
+        chunk_size (int): characters or bytes read at a time from file
+            objects
+        fold (bool): if True count look-alikes of the table characters,
+            e.g. ``µ`` is counted as ``μ`` (also in the positions)
+
+    Returns:
+        ScanReport
+
+    Example:
+        >>> import io
+        >>> from mathutf.corpus import scan
+        >>> report = scan(io.BytesIO('x ∈ A ∪ B'.encode()), positions=True)
+        >>> report.positions
+        {'<stream>': [(2, '∈'), (8, '∪')]}
+        >>> scan('x ∈ A ∪ B', positions=True).positions
+        {'<text>': [(2, '∈'), (6, '∪')]}
+        >>> scan('2µm ∊ 𝛼').counts, scan('2µm ∊ 𝛼', fold=False).counts
+        (Counter({'μ': 1, '∈': 1, 'α': 1}), Counter())
+    """
+    chars, variants = _table_chars(fold)
+    if isinstance(source, str):
+        counts, found = _count(_patterns(chars), source, positions)
+        report = ScanReport(counts, [TEXT_SOURCE],
+                            {TEXT_SOURCE: found} if positions else None)
+    elif isinstance(source, os.PathLike):
+        report = _scan_path(source, chars, positions)
+    elif isinstance(source, io.IOBase) or hasattr(source, 'read'):
+        name = getattr(source, 'name', None)
+        name = name if isinstance(name, str) else '<stream>'
+        report = _scan_stream(source, name, chars, positions, chunk_size)
+    else:
+        raise TypeError(f'cannot scan a {type(source).__name__}')
+    return _fold_report(report, variants)
+
+
+def _default_workers(num_files):
+    cpus = os.cpu_count() or 1
+    # process startup is not worth it without a second CPU or file
+    if cpus < 2 or num_files < 2:
+        return 0
+    return min(8, cpus, num_files)
+
+
+def scan_files(fpaths, positions=False, workers=None, fold=True):
+    """
+    Scan many files, in parallel.
+
+    Args:
+        fpaths (Iterable[str | os.PathLike]): paths of UTF-8 encoded files
+        positions (bool): if True also record where each character occurs,
+            offsets are in bytes
+        workers (int | None): number of processes. Defaults to the number of
+            CPUs (at most 8), or 0 on a single CPU machine. Use 0 to scan in
+            this process.
+        fold (bool): if True count look-alikes of the table characters, see
+            :func:`scan`
+
+    Returns:
+        ScanReport: the merged report, sources are in the given order
+
+    Example:
+        >>> import pathlib, tempfile
+        >>> from mathutf.corpus import scan_files
+        >>> dpath = pathlib.Path(tempfile.mkdtemp())
+        >>> _ = (dpath / 'a.txt').write_text('α ≤ β', encoding='utf8')
+        >>> _ = (dpath / 'b.txt').write_text('β ≥ α ≥ 0', encoding='utf8')
+        >>> report = scan_files(sorted(dpath.glob('*.txt')), workers=0)
+        >>> sorted(report.counts.items())
+        [('α', 2), ('β', 2), ('≤', 1), ('≥', 2)]
+    """
+    fpaths = list(fpaths)
+    chars, variants = _table_chars(fold)
+    if workers is None:
+        workers = _default_workers(len(fpaths))
+    if workers <= 0:
+        results = [_scan_path(fpath, chars, positions) for fpath in fpaths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                _scan_path, fpaths, [chars] * len(fpaths),
+                [positions] * len(fpaths)))
+    report = ScanReport(positions={} if positions else None)
+    for result in results:
+        report.update(result)
+    return _fold_report(report, variants)
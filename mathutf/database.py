@@ -0,0 +1,485 @@
+r"""
+A memory-mapped binary symbol database.
+
+The database holds the curated symbol tables together with every other named
+unicode character in a single file that is opened with :mod:`mmap` and
+queried in place. Nothing is deserialized into Python dictionaries: numeric
+columns are exposed as ``memoryview`` casts of the mapping and strings are
+decoded only when a row is actually read. Several processes that open the
+same file share one page-cache copy of it.
+
+The file is a small header followed by a directory of named sections, each
+aligned to 8 bytes:
+
+    ==============  ===========================================================
+    section         contents
+    ==============  ===========================================================
+    ``meta``        JSON with the unidata version, row count, group names and
+                    the :func:`tables_hash` of the curated tables
+    ``codepoints``  ``uint32`` codepoint per row
+    ``group_ids``   ``uint16`` group index per row
+    ``<col>.off``   ``uint32`` offsets (count + 1) into ``<col>.blob``
+    ``<col>.blob``  UTF-8 strings for the ``name``, ``key``, ``tex``,
+                    ``alias`` and ``refs`` columns (multiple aliases and
+                    references are joined by ``\x1f``)
+    ``key_order``   ``uint32`` row ids sorted by key
+    ``cp_order``    ``uint32`` row ids sorted by codepoint
+    ==============  ===========================================================
+
+Rows from the curated tables come first (in table order), followed by every
+other named character with the group ``"unicode"`` and its normalized name
+(see :func:`mathutf.unicode_names.normalize_name`) as the key.
+
+The database is opt-in: :func:`mathutf.symbols.search` and
+:func:`mathutf.symbols.lookup` answer from the in-memory
+:data:`mathutf.symbols.STORE`, whose indexes are faster once built. Use
+:meth:`SymbolDatabase.load_or_build` in processes that need every named
+character without building the tables, or that share one copy of the data.
+A cached database is keyed by the content of the tables, so editing a table
+or registering one (see :mod:`mathutf.registry`) writes a new file.
+
+Example:
+    >>> import tempfile
+    >>> from os.path import join
+    >>> from mathutf.database import SymbolDatabase, write_database
+    >>> fpath = join(tempfile.mkdtemp(), 'symbols.db')
+    >>> write_database(fpath)
+    >>> with SymbolDatabase(fpath) as db:
+    >>>     record = db.record(db.find_key('nabla')[0])
+    >>>     print(record.chr, record.tex, record.alias)
+    >>>     rowids = db.prefix_keys('double_struck_capital_')
+    >>>     print([db.key(r) for r in rowids][:3])
+    >>>     print([db.key(r) for r in db.lookup('ℝ')])
+    >>>     tables = db.to_tables()
+    ∇ \varnabla ('del', 'gradient')
+    ['double_struck_capital_gamma', 'double_struck_capital_pi']
+    ['real']
+"""
+import hashlib
+import json
+import os
+import struct
+import unicodedata
+from array import array
+from mathutf.records import SymbolRecord
+
+#: Bump this when the on-disk layout changes
+FORMAT_VERSION = 1
+
+#: The group given to characters that are not in the curated tables
+UNICODE_GROUP = 'unicode'
+
+_MAGIC = b'MUTFSYDB'
+_HEADER = struct.Struct('=8sII')
+_SECTION = struct.Struct('=16sQQ')
+_SEP = '\x1f'
+
+_STRING_COLUMNS = ['name', 'key', 'tex', 'alias', 'refs']
+
+
+def _pack_strings(strings):
+    offsets = array('I', [0])
+    parts = []
+    total = 0
+    for text in strings:
+        data = text.encode('utf8')
+        parts.append(data)
+        total += len(data)
+        offsets.append(total)
+    return offsets.tobytes(), b''.join(parts)
+
+
+def _iter_rows(tables, all_unicode):
+    """
+    Yield (codepoint, group, name, key, tex, alias, refs) for every row.
+    """
+    from mathutf.unicode_names import iter_named_codepoints, normalize_name
+    seen = set()
+    for group, rows in tables.items():
+        for item in rows:
+            codepoint = ord(item['chr'])
+            seen.add(codepoint)
+            yield (codepoint, group, item['utf_name'], item['key'],
+                   item.get('tex', None) or '',
+                   _SEP.join(item.get('alias', ())),
+                   _SEP.join(item.get('references', ())))
+    if all_unicode:
+        for codepoint, utf_name in iter_named_codepoints():
+            if codepoint not in seen:
+                yield (codepoint, UNICODE_GROUP, utf_name,
+                       normalize_name(utf_name), '', '', '')
+
+
+def tables_hash(tables=None):
+    """
+    A digest of the content of symbol tables.
+
+    Args:
+        tables (Mapping[str, Iterable[Dict]] | None): defaults to
+            :data:`mathutf.symbols.TABLES`
+
+    Returns:
+        str: hexadecimal, it changes when any row or group changes
+
+    Example:
+        >>> from mathutf.database import tables_hash
+        >>> row = {'chr': '∞', 'key': 'inf', 'utf_name': 'INFINITY'}
+        >>> tables_hash({'a': [row]}) == tables_hash({'a': [dict(row)]})
+        True
+        >>> tables_hash({'a': [row]}) == tables_hash({'b': [row]})
+        False
+    """
+    if tables is None:
+        from mathutf.symbols import TABLES as tables
+    content = [[group, [dict(item) for item in rows]]
+               for group, rows in tables.items()]
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf8')).hexdigest()
+
+
+def write_database(fpath, tables=None, all_unicode=True):
+    """
+    Generate a database file from symbol tables and :mod:`unicodedata`.
+
+    The file is written to a temporary name and moved into place, so readers
+    never see a partial file.
+
+    Args:
+        fpath (str): the destination
+        tables (Mapping[str, Iterable[Dict]] | None):
+            rows in the :data:`mathutf.symbols.TABLES` format, defaults to
+            :data:`mathutf.symbols.TABLES`.
+        all_unicode (bool): if True also add every other named character
+    """
+    if tables is None:
+        from mathutf.symbols import TABLES as tables
+    digest = tables_hash(tables)
+    rows = list(_iter_rows(tables, all_unicode))
+    groups = list(dict.fromkeys(row[1] for row in rows))
+    group_to_id = {g: i for i, g in enumerate(groups)}
+
+    sections = {}
+    sections['meta'] = json.dumps({
+        'unidata_version': unicodedata.unidata_version,
+        'count': len(rows),
+        'groups': groups,
+        'tables_hash': digest,
+    }).encode('utf8')
+    sections['codepoints'] = array('I', [row[0] for row in rows]).tobytes()
+    sections['group_ids'] = array(
+        'H', [group_to_id[row[1]] for row in rows]).tobytes()
+    for col_idx, col in enumerate(_STRING_COLUMNS, start=2):
+        offsets, blob = _pack_strings(row[col_idx] for row in rows)
+        sections[col + '.off'] = offsets
+        sections[col + '.blob'] = blob
+    key_order = sorted(range(len(rows)),
+                       key=lambda i: rows[i][3].encode('utf8'))
+    sections['key_order'] = array('I', key_order).tobytes()
+    cp_order = sorted(range(len(rows)), key=lambda i: rows[i][0])
+    sections['cp_order'] = array('I', cp_order).tobytes()
+
+    directory_size = _HEADER.size + _SECTION.size * len(sections)
+    offset = _align(directory_size)
+    directory = []
+    for name, data in sections.items():
+        directory.append((name, offset, len(data)))
+        offset = _align(offset + len(data))
+
+    dpath = os.path.dirname(fpath)
+    if dpath:
+        os.makedirs(dpath, exist_ok=True)
+    tmp_fpath = '{}.tmp.{}'.format(fpath, os.getpid())
+    with open(tmp_fpath, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, len(sections)))
+        for name, start, size in directory:
+            file.write(_SECTION.pack(name.encode('ascii'), start, size))
+        for (name, start, size) in directory:
+            file.write(b'\0' * (start - file.tell()))
+            file.write(sections[name])
+    os.replace(tmp_fpath, fpath)
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+class _StringColumn:
+    """
+    Strings stored as an offset table into a blob of a mapped file.
+    """
+
+    def __init__(self, mm, offsets, blob_start, blob):
+        self._mm = mm
+        self._offsets = offsets
+        self._blob_start = blob_start
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def raw(self, idx):
+        """
+        Returns:
+            bytes: the encoded string (a small copy out of the mapping)
+        """
+        start = self._blob_start
+        offsets = self._offsets
+        return self._mm[start + offsets[idx]:start + offsets[idx + 1]]
+
+    def view(self, idx):
+        """
+        Returns:
+            memoryview: the encoded string without copying it out of the
+            mapping. Release it before closing the database.
+        """
+        return self._blob[self._offsets[idx]:self._offsets[idx + 1]]
+
+    def __getitem__(self, idx):
+        return self.raw(idx).decode('utf8')
+
+
+class SymbolDatabase:
+    """
+    Read-only access to a database written by :func:`write_database`.
+
+    Args:
+        fpath (str): path to the database file
+    """
+
+    def __init__(self, fpath):
+        import mmap
+        self.fpath = fpath
+        self._views = []
+        with open(fpath, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        mm = self._mmap
+        magic, version, num_sections = _HEADER.unpack_from(mm)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            raise ValueError(
+                f'{self.fpath} is not a v{FORMAT_VERSION} symbol database')
+        self._sections = {}
+        for idx in range(num_sections):
+            name, start, size = _SECTION.unpack_from(
+                mm, _HEADER.size + idx * _SECTION.size)
+            self._sections[name.rstrip(b'\0').decode('ascii')] = (start, size)
+
+        self.meta = json.loads(self._section_bytes('meta').decode('utf8'))
+        self.groups = self.meta['groups']
+        self.unidata_version = self.meta['unidata_version']
+        self.tables_hash = self.meta.get('tables_hash', None)
+        self.codepoints = self._cast('codepoints', 'I')
+        self.group_ids = self._cast('group_ids', 'H')
+        self.key_order = self._cast('key_order', 'I')
+        self.cp_order = self._cast('cp_order', 'I')
+        self.columns = {}
+        for col in _STRING_COLUMNS:
+            offsets = self._cast(col + '.off', 'I')
+            blob = self._cast(col + '.blob', 'B')
+            blob_start, _ = self._sections[col + '.blob']
+            self.columns[col] = _StringColumn(mm, offsets, blob_start, blob)
+
+    def _section_bytes(self, name):
+        start, size = self._sections[name]
+        return self._mmap[start:start + size]
+
+    def _cast(self, name, fmt):
+        start, size = self._sections[name]
+        view = memoryview(self._mmap)[start:start + size].cast(fmt)
+        self._views.append(view)
+        return view
+
+    @classmethod
+    def load_or_build(cls, fpath=None, dpath=None):
+        """
+        Open the database for this mathutf version, unicode database and
+        content of :data:`mathutf.symbols.TABLES`, writing it first if it
+        is missing or was written from different tables.
+
+        Args:
+            fpath (str | None): defaults to :func:`default_fpath`
+            dpath (str | None): cache directory used when fpath is not given
+
+        Returns:
+            SymbolDatabase
+        """
+        digest = tables_hash()
+        if fpath is None:
+            fpath = default_fpath(dpath, digest=digest)
+        if os.path.exists(fpath):
+            try:
+                db = cls(fpath)
+            except (ValueError, KeyError, struct.error):
+                pass
+            else:
+                if db.tables_hash == digest:
+                    return db
+                db.close()
+        write_database(fpath)
+        return cls(fpath)
+
+    def close(self):
+        for view in self.__dict__.pop('_views', []):
+            view.release()
+        mm = self.__dict__.pop('_mmap', None)
+        if mm is not None:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.codepoints)
+
+    def key(self, rowid):
+        return self.columns['key'][rowid]
+
+    def record(self, rowid):
+        """
+        Args:
+            rowid (int): the row index
+
+        Returns:
+            SymbolRecord
+        """
+        columns = self.columns
+        tex = columns['tex'][rowid] or None
+        alias = columns['alias'][rowid]
+        refs = columns['refs'][rowid]
+        return SymbolRecord(
+            chr(self.codepoints[rowid]),
+            columns['key'][rowid],
+            columns['name'][rowid],
+            tex,
+            self.groups[self.group_ids[rowid]],
+            tuple(alias.split(_SEP)) if alias else (),
+            tuple(refs.split(_SEP)) if refs else (),
+        )
+
+    def _bisect_key(self, key):
+        raw = self.columns['key'].raw
+        order = self.key_order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if raw(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix_keys(self, prefix):
+        """
+        Args:
+            prefix (str): a key prefix (case sensitive)
+
+        Yields:
+            int: row ids whose key starts with the prefix, in key order
+        """
+        prefix = prefix.encode('utf8')
+        raw = self.columns['key'].raw
+        order = self.key_order
+        idx = self._bisect_key(prefix)
+        while idx < len(order) and raw(order[idx]).startswith(prefix):
+            yield order[idx]
+            idx += 1
+
+    def find_key(self, key):
+        """
+        Args:
+            key (str): an exact key
+
+        Returns:
+            List[int]: row ids with that key
+        """
+        data = key.encode('utf8')
+        return [rowid for rowid in self.prefix_keys(key)
+                if self.columns['key'].raw(rowid) == data]
+
+    def lookup(self, chr_or_codepoint):
+        """
+        Args:
+            chr_or_codepoint (str | int): a character or its codepoint
+
+        Returns:
+            List[int]: row ids for that codepoint
+        """
+        codepoint = chr_or_codepoint
+        if isinstance(codepoint, str):
+            codepoint = ord(codepoint)
+        codepoints = self.codepoints
+        order = self.cp_order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if codepoints[order[mid]] < codepoint:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < len(order) and codepoints[order[lo]] == codepoint:
+            found.append(order[lo])
+            lo += 1
+        return found
+
+    def iter_records(self, group=None):
+        """
+        Args:
+            group (str | None): if specified only yield rows in this group
+
+        Yields:
+            SymbolRecord
+        """
+        group_id = None if group is None else self.groups.index(group)
+        for rowid in range(len(self)):
+            if group_id is None or self.group_ids[rowid] == group_id:
+                yield self.record(rowid)
+
+    def to_tables(self):
+        """
+        Rebuild the curated tables (everything outside the ``"unicode"``
+        group) in the :data:`mathutf.symbols.TABLES` format.
+
+        Returns:
+            Dict[str, List[Dict]]
+        """
+        tables = {g: [] for g in self.groups if g != UNICODE_GROUP}
+        for rowid in range(len(self)):
+            group = self.groups[self.group_ids[rowid]]
+            if group != UNICODE_GROUP:
+                item = self.record(rowid).to_dict()
+                item.pop('group')
+                tables[group].append(item)
+        return tables
+
+
+def default_fpath(dpath=None, digest=None):
+    """
+    Args:
+        dpath (str | None): the cache directory, defaults to
+            :func:`mathutf.unicode_names.cache_dpath`
+        digest (str | None): the :func:`tables_hash` of the tables, computed
+            from :data:`mathutf.symbols.TABLES` if not given
+
+    Returns:
+        str: where the database for this mathutf version, unicode database
+        and set of tables is cached
+    """
+    from mathutf import __version__
+    from mathutf.unicode_names import cache_dpath
+    if dpath is None:
+        dpath = cache_dpath()
+    if digest is None:
+        digest = tables_hash()
+    fname = 'symbols_v{}_{}_{}_{}.db'.format(
+        FORMAT_VERSION, __version__, unicodedata.unidata_version, digest[:16])
+    return os.path.join(dpath, fname)
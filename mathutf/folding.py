@@ -0,0 +1,182 @@
+"""
+Fold look-alike characters onto the characters of the symbol tables.
+
+Text often uses a different code point than the tables for the same symbol:
+``µ`` MICRO SIGN for ``μ``, the math italic ``𝛼`` for ``α``, the fullwidth
+``＜`` for ``<``, or ``∆`` INCREMENT for ``Δ``. Two characters are treated as
+equivalent if they have the same folded form, which is their NFKC
+normalization after replacing the visual :data:`CONFUSABLES` that NFKC does
+not cover.
+
+:func:`fold_table` precomputes the folded form of every character that has
+one, once per process, so :func:`fold` folds a whole text with a single
+:meth:`str.translate` call and no per character normalization. The search
+and lookup indexes of :mod:`mathutf.symbols` use this module:
+
+* :func:`mathutf.symbols.search` folds queries, and a query that is a single
+  non-ASCII character finds every row whose character folds to the same
+  form (``∆`` finds both ``Δ`` and ``∆``),
+
+* :func:`mathutf.symbols.lookup`, :func:`mathutf.symbols.lookup_many` and
+  :func:`mathutf.corpus.scan` also accept the :func:`variants` of the table
+  characters.
+
+Example:
+    >>> from mathutf.folding import fold, fold_char
+    >>> print(fold('𝛼 = 2µ, ∆x ＜ 𝟏'))
+    α = 2μ, Δx < 1
+    >>> fold_char('∆') == fold_char('Δ') == fold_char('𝚫')
+    True
+"""
+import functools
+import unicodedata
+
+#: Visually confusable characters that NFKC keeps apart, mapped to the
+#: character they are folded to
+CONFUSABLES = {
+    '∆': 'Δ',  # INCREMENT
+    '∏': 'Π',  # N-ARY PRODUCT
+    '∑': 'Σ',  # N-ARY SUMMATION
+    '∊': '∈',  # SMALL ELEMENT OF
+    '∍': '∋',  # SMALL CONTAINS AS MEMBER
+    '−': '-',  # MINUS SIGN
+    '∗': '*',  # ASTERISK OPERATOR
+    '∕': '/',  # DIVISION SLASH
+    '⁄': '/',  # FRACTION SLASH
+    '∣': '|',  # DIVIDES
+    '∶': ':',  # RATIO
+    '∼': '~',  # TILDE OPERATOR
+    '⋅': '·',  # DOT OPERATOR
+    '∙': '·',  # BULLET OPERATOR
+    '⨯': '×',  # VECTOR OR CROSS PRODUCT
+}
+
+# Code point ranges that hold no character with a compatibility mapping:
+# CJK ideographs, hangul syllables (their decompositions are canonical),
+# surrogates and private use. Planes above the first two only hold
+# ideographs and are not considered at all.
+_SKIP = [(0x3400, 0x4DC0), (0x4E00, 0xA000), (0xAC00, 0xD7A4),
+         (0xD800, 0xF900)]
+_LAST = 0x20000
+
+
+def fold_char(char):
+    """
+    The folded form of one character.
+
+    Args:
+        char (str): a character
+
+    Returns:
+        str: usually one character, NFKC expands some (e.g. ``ﬁ``)
+
+    Example:
+        >>> from mathutf.folding import fold_char
+        >>> fold_char('µ'), fold_char('ϵ'), fold_char('⋅'), fold_char('ℝ')
+        ('μ', 'ε', '·', 'R')
+    """
+    folded = unicodedata.normalize('NFKC', CONFUSABLES.get(char, char))
+    if len(folded) == 1:
+        return CONFUSABLES.get(folded, folded)
+    # e.g. the FRACTION SLASH in the expansion of ½
+    return ''.join(CONFUSABLES.get(c, c) for c in folded)
+
+
+def _codepoints():
+    start = 0
+    for stop, resume in _SKIP:
+        yield from range(start, stop)
+        start = resume
+    yield from range(start, _LAST)
+
+
+@functools.lru_cache(maxsize=None)
+def fold_table():
+    """
+    The translate table of :func:`fold`.
+
+    Returns:
+        Dict[int, str]: the folded form of every character that changes
+    """
+    decomposition = unicodedata.decomposition
+    table = {}
+    for codepoint in _codepoints():
+        char = chr(codepoint)
+        # only characters with a decomposition can change under NFKC
+        if decomposition(char):
+            folded = fold_char(char)
+            if folded != char:
+                table[codepoint] = folded
+    for char in CONFUSABLES:
+        table[ord(char)] = fold_char(char)
+    return table
+
+
+def fold(text):
+    """
+    Replace each character with its folded form.
+
+    Args:
+        text (str): any text
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.folding import fold
+        >>> print(fold('ｄｅｌｔａ ∊ ℕ'))
+        delta ∈ N
+    """
+    if text.isascii():
+        return text
+    return text.translate(fold_table())
+
+
+def variants(chars):
+    """
+    Find the characters that should be treated as one of the given ones.
+
+    A character that folds to the same form as a member of ``chars``, and
+    is not a member itself, is a variant of the member that is that form,
+    or else of the member that is listed in :data:`CONFUSABLES` for it.
+    Members that only fold to it by NFKC do not take variants: ``𝐑`` is not
+    a variant of ``ℝ`` and ``+`` is not a variant of ``₊``. ASCII characters
+    are never variants, so ``-`` in prose is not a ``−`` MINUS SIGN.
+
+    Args:
+        chars (Iterable[str]): e.g. the characters of the symbol tables
+
+    Returns:
+        Dict[str, str]: variant to member
+
+    Example:
+        >>> from mathutf.folding import variants
+        >>> found = variants(['μ', 'Δ', '∆', '⋅', 'ℝ'])
+        >>> found['µ'], found['𝚫'], found['∙'], found['·']
+        ('μ', 'Δ', '⋅', '⋅')
+        >>> '𝐑' in found or '∆' in found or 'R' in found
+        False
+        >>> '-' in variants(['−'])
+        False
+    """
+    members = {}
+    for char in chars:
+        members.setdefault(char, None)
+    targets = {}
+    for char in members:
+        folded = fold_char(char)
+        if folded in members:
+            targets[folded] = folded
+        elif CONFUSABLES.get(char, None) == folded:
+            targets.setdefault(folded, char)
+    # the folded form itself, e.g. MIDDLE DOT for DOT OPERATOR, unless it is
+    # plain text like the HYPHEN-MINUS of MINUS SIGN
+    found = {folded: target for folded, target in targets.items()
+             if folded not in members and not folded.isascii()}
+    for codepoint, folded in fold_table().items():
+        target = targets.get(folded, None)
+        if target is not None:
+            char = chr(codepoint)
+            if char not in members:
+                found[char] = target
+    return found
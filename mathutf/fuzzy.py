@@ -0,0 +1,427 @@
+"""
+Typo tolerant, ranked search over symbol names.
+
+:class:`FuzzyIndex` tokenizes the key, unicode name and aliases of each symbol
+and precomputes:
+
+* a vocabulary of the distinct tokens, in sorted order for prefix lookups,
+* a trigram index over the vocabulary to find tokens within a small edit
+  distance of a (misspelled) query token,
+* postings from each token to the symbols that contain it, ordered by the
+  number of tokens in the symbol, so the shortest (best) matches come first
+  and long postings can be truncated without losing them.
+
+A query is split into tokens, each token is expanded to the vocabulary tokens
+it matches exactly or as a prefix, or, if it is not itself in the vocabulary,
+within an edit distance (transpositions count as one edit), and the symbols
+that contain those tokens are scored and the top-k returned. Work is bounded
+by :data:`CANDIDATE_LIMIT`, not by the number of symbols, so this is fast even
+over every unicode name.
+
+Example:
+    >>> from mathutf.fuzzy import FuzzyIndex
+    >>> index = FuzzyIndex([
+    >>>     (ord('λ'), [('lam', 1.0), ('GREEK SMALL LETTER LAMDA', 0.8)]),
+    >>>     (ord('∇'), [('nabla', 1.0), ('NABLA', 0.8), ('gradient', 1.0)]),
+    >>>     (ord('⊇'), [('supset_eq', 1.0), ('SUPERSET OF OR EQUAL TO', 0.8)]),
+    >>> ])
+    >>> [chr(index.codepoints[docid]) for _, docid in index.topk('nabal')]
+    ['∇']
+    >>> [chr(index.codepoints[docid]) for _, docid in index.topk('lamda')]
+    ['λ']
+    >>> [chr(index.codepoints[docid]) for _, docid in index.topk('supseteq')]
+    ['⊇']
+"""
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+#: Weights of the fields of a symbol, used by :func:`record_fields`
+KEY_WEIGHT = 1.0
+ALIAS_WEIGHT = 1.0
+NAME_WEIGHT = 0.8
+
+#: Similarity of a query token that is a prefix of a vocabulary token is
+#: between these bounds, depending on how much of the token it covers
+PREFIX_SIM = (0.6, 0.9)
+
+#: Similarity of a query token that is within the edit distance limit
+FUZZY_SIM = 0.85
+
+#: Maximum number of vocabulary tokens a query token is a prefix of
+PREFIX_LIMIT = 32
+
+#: Maximum number of vocabulary tokens (those sharing the most trigrams with
+#: a query token) whose edit distance is computed
+FUZZY_LIMIT = 32
+
+#: Maximum number of candidate symbols taken from the postings of each query
+#: token
+CANDIDATE_LIMIT = 256
+
+_TOKEN_PAT = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text (str): e.g. a key, a unicode name, or a query
+
+    Returns:
+        List[str]
+
+    Example:
+        >>> from mathutf.fuzzy import tokenize
+        >>> tokenize('LESS-THAN OR EQUAL TO'), tokenize('supset_eq')
+        (['less', 'than', 'or', 'equal', 'to'], ['supset', 'eq'])
+    """
+    return _TOKEN_PAT.findall(text.lower())
+
+
+def max_edits(token):
+    """
+    The number of edits tolerated for a query token of this length.
+    """
+    size = len(token)
+    if size < 3:
+        return 0
+    if size <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit=None):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions).
+
+    Args:
+        a (str): first string
+        b (str): second string
+        limit (int | None): if given, stop early and return ``limit + 1``
+            once the distance is known to exceed it
+
+    Returns:
+        int
+
+    Example:
+        >>> from mathutf.fuzzy import edit_distance
+        >>> edit_distance('lamda', 'lambda'), edit_distance('nabal', 'nabla')
+        (1, 1)
+    """
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    prev_ca = None
+    for i, ca in enumerate(a, start=1):
+        curr = [i]
+        row_min = i
+        prev_cb = None
+        for j, cb in enumerate(b, start=1):
+            value = prev[j - 1] + (ca != cb)
+            other = prev[j] + 1
+            if other < value:
+                value = other
+            other = curr[j - 1] + 1
+            if other < value:
+                value = other
+            if ca == prev_cb and cb == prev_ca and prev2 is not None:
+                other = prev2[j - 2] + 1
+                if other < value:
+                    value = other
+            curr.append(value)
+            if value < row_min:
+                row_min = value
+            prev_cb = cb
+        if limit is not None and row_min > limit:
+            return limit + 1
+        prev2, prev = prev, curr
+        prev_ca = ca
+    dist = prev[-1]
+    if limit is not None and dist > limit:
+        return limit + 1
+    return dist
+
+
+def _grams(token):
+    padded = '$' + token + '$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    A ranked, typo tolerant index over weighted text fields.
+
+    Args:
+        docs (Iterable[Tuple[int, Sequence[Tuple[str, float]]]]):
+            for each document its codepoint and its ``(text, weight)``
+            fields, see :func:`record_fields`. Document ids are positions in
+            this iterable.
+        signature (Any): identifies the data the index was built from
+        join (bool): if True also index the run-together form of multi token
+            fields (e.g. ``supseteq`` for ``supset_eq``)
+    """
+
+    def __init__(self, docs, signature=None, join=True):
+        self.signature = signature
+        self.join = join
+        self._expand_cache = {}
+        self.codepoints = array('I')
+        self.vocab = []
+        self.token_ids = {}
+        self.sorted_vocab = []
+        # flat per-document (token id, weight) lists
+        self.offsets = array('I', [0])
+        self.doc_tokens = array('I')
+        self.doc_weights = array('f')
+        self.postings = []
+        self.grams = {}
+        self._add_docs(docs)
+
+    def extend(self, docs, signature=None):
+        """
+        Index documents that were appended after the index was built,
+        instead of building a new index. Their ids continue after the
+        indexed documents.
+
+        Postings that gain documents and the sorted vocabulary are replaced
+        rather than changed in place, and new tokens are only looked up once
+        their postings exist, so concurrent queries see either the old or
+        the new documents. Document ids a query finds past the end of the
+        rows it read belong to documents added meanwhile. Documents must be
+        added by a single writer.
+
+        Args:
+            docs (Iterable[Tuple[int, Sequence[Tuple[str, float]]]]): the
+                new documents, see :class:`FuzzyIndex`
+            signature (Any): identifies the extended data
+
+        Example:
+            >>> from mathutf.fuzzy import FuzzyIndex
+            >>> index = FuzzyIndex([(ord('∇'), [('nabla', 1.0)])])
+            >>> index.extend([(ord('∆'), [('increment', 1.0)]),
+            >>>               (ord('⊸'), [('multimap', 1.0)])])
+            >>> [chr(index.codepoints[d]) for _, d in index.topk('incremnt')]
+            ['∆']
+            >>> len(index)
+            3
+        """
+        self._add_docs(docs)
+        self.signature = signature
+
+    def _add_docs(self, docs):
+        join = self.join
+        token_ids = self.token_ids
+        offsets = self.offsets
+        doc_tokens = self.doc_tokens
+        doc_weights = self.doc_weights
+        # tokens not in the vocabulary yet, published at the end
+        new_ids = {}
+        num_old = len(self.vocab)
+        added = {}
+        for docid, (codepoint, fields) in enumerate(
+                docs, start=len(self.codepoints)):
+            best = {}
+            for text, weight in fields:
+                tokens = tokenize(text)
+                if join and len(tokens) > 1:
+                    # also index the run-together form, e.g. "supseteq"
+                    tokens.append(''.join(tokens))
+                for token in tokens:
+                    if best.get(token, -1.0) < weight:
+                        best[token] = weight
+            for token, weight in best.items():
+                tid = token_ids.get(token, None)
+                if tid is None:
+                    tid = new_ids.get(token, None)
+                    if tid is None:
+                        tid = new_ids[token] = num_old + len(new_ids)
+                added.setdefault(tid, []).append(docid)
+                doc_tokens.append(tid)
+                doc_weights.append(weight)
+            offsets.append(len(doc_tokens))
+            self.codepoints.append(codepoint)
+        if not added:
+            return
+
+        def _order(docid):
+            return (offsets[docid + 1] - offsets[docid], docid)
+        postings = list(self.postings)
+        postings.extend([] for _ in new_ids)
+        for tid, docids in added.items():
+            if tid < num_old:
+                docids = list(postings[tid]) + docids
+            postings[tid] = array('I', sorted(docids, key=_order))
+        self.postings = postings
+        vocab = self.vocab
+        vocab.extend(new_ids)
+        grams = self.grams
+        for token, tid in new_ids.items():
+            for gram in _grams(token):
+                grams.setdefault(gram, []).append(tid)
+        token_ids.update(new_ids)
+        if new_ids:
+            self.sorted_vocab = sorted(vocab)
+        # expansions cached before may be missing the new tokens
+        self._expand_cache = {}
+
+    def __len__(self):
+        return len(self.codepoints)
+
+    def expand(self, token):
+        """
+        Find the vocabulary tokens that a query token may refer to.
+
+        Args:
+            token (str): a lowercase query token
+
+        Returns:
+            Dict[int, float]: token id to similarity in ``(0, 1]``
+        """
+        cache = self._expand_cache
+        found = cache.get(token, None)
+        if found is not None:
+            return found
+        found = {}
+        tid = self.token_ids.get(token, None)
+        if tid is not None:
+            found[tid] = 1.0
+        if len(token) >= 2:
+            lo, hi = PREFIX_SIM
+            sorted_vocab = self.sorted_vocab
+            idx = bisect_left(sorted_vocab, token)
+            stop = min(idx + PREFIX_LIMIT, len(sorted_vocab))
+            while idx < stop and sorted_vocab[idx].startswith(token):
+                other = sorted_vocab[idx]
+                if other != token:
+                    sim = lo + (hi - lo) * len(token) / len(other)
+                    found[self.token_ids[other]] = sim
+                idx += 1
+        limit = max_edits(token) if tid is None else 0
+        if limit:
+            # q-gram lemma: every edit destroys at most 3 trigrams
+            query_grams = _grams(token)
+            need = len(query_grams) - 3 * limit
+            counts = {}
+            for gram in query_grams:
+                for other in self.grams.get(gram, ()):
+                    counts[other] = counts.get(other, 0) + 1
+            size = len(token)
+            vocab = self.vocab
+            close = [(count, other) for other, count in counts.items()
+                     if count >= need and other not in found and
+                     abs(len(vocab[other]) - size) <= limit]
+            for _, other in heapq.nlargest(FUZZY_LIMIT, close):
+                dist = edit_distance(token, vocab[other], limit)
+                if dist <= limit:
+                    found[other] = FUZZY_SIM * (1 - dist / (size + 1))
+        if len(cache) >= 4096:
+            cache.clear()
+        cache[token] = found
+        return found
+
+    def topk(self, query, k=10, exclude=None):
+        """
+        Rank documents against a query.
+
+        Each query token contributes the best similarity of any document
+        token it expands to (times the weight of that token's field),
+        averaged over the query tokens. A small bonus rewards documents whose
+        tokens are mostly covered by those best matches. Ties keep document
+        order.
+
+        Args:
+            query (str): free text, e.g. ``"supset eq"`` or ``"lamda"``
+            k (int): number of results
+            exclude (Container[int] | None): codepoints to skip
+
+        Returns:
+            List[Tuple[float, int]]: ``(score, docid)`` pairs, best first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or k <= 0:
+            return []
+        expansions = [self.expand(token) for token in tokens]
+        postings = self.postings
+
+        # Candidates come from the rarest query tokens first. Postings are
+        # ordered shortest document first, so once the budget is spent the
+        # documents left out of a common token's postings are the ones it
+        # would score lowest.
+        def _num_postings(expansion):
+            return sum(len(postings[tid]) for tid in expansion)
+
+        codepoints = self.codepoints
+        candidates = set()
+        remaining = CANDIDATE_LIMIT
+        for expansion in sorted(expansions, key=_num_postings):
+            for tid, _ in sorted(expansion.items(), key=lambda t: -t[1]):
+                docids = postings[tid]
+                if exclude:
+                    # skipped before the budget, so they cannot use it up
+                    docids = islice((d for d in docids
+                                     if codepoints[d] not in exclude),
+                                    remaining)
+                else:
+                    docids = docids[:remaining]
+                before = len(candidates)
+                candidates.update(docids)
+                remaining -= len(candidates) - before
+                if remaining <= 0:
+                    break
+            if remaining <= 0:
+                break
+
+        # token id -> [(query token index, similarity)]
+        merged = {}
+        for qx, expansion in enumerate(expansions):
+            for tid, sim in expansion.items():
+                merged.setdefault(tid, []).append((qx, sim))
+
+        offsets = self.offsets
+        doc_tokens = self.doc_tokens
+        doc_weights = self.doc_weights
+        num = len(tokens)
+
+        def _score(docid):
+            start, stop = offsets[docid], offsets[docid + 1]
+            best = [0.0] * num
+            best_pos = [-1] * num
+            for pos in range(start, stop):
+                hits = merged.get(doc_tokens[pos], None)
+                if hits is not None:
+                    weight = doc_weights[pos]
+                    for qx, sim in hits:
+                        sim *= weight
+                        if sim > best[qx]:
+                            best[qx] = sim
+                            best_pos[qx] = pos
+            covered = len(set(best_pos)) - (-1 in best_pos)
+            return sum(best) / num + 0.2 * covered / (stop - start)
+
+        scored = ((_score(docid), -docid) for docid in candidates)
+        best = heapq.nlargest(k, scored)
+        return [(score, -neg_docid) for score, neg_docid in best if score > 0]
+
+
+def record_fields(record):
+    """
+    The weighted fields of a :class:`mathutf.records.SymbolRecord` that are
+    used for ranked search.
+
+    Args:
+        record (SymbolRecord): a symbol
+
+    Returns:
+        List[Tuple[str, float]]
+    """
+    fields = [(record.key, KEY_WEIGHT), (record.utf_name, NAME_WEIGHT)]
+    fields.extend((alias, ALIAS_WEIGHT) for alias in record.alias)
+    return fields
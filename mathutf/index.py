@@ -0,0 +1,664 @@
+r"""
+An inverted index over the symbol tables that backs
+:func:`mathutf.symbols.search`.
+
+The index holds three structures built once over the lowercased searchable
+fields of every row (``key``, ``utf_name``, ``group``, each ``alias`` and
+``tex``):
+
+    * n-gram postings (all grams up to :data:`MAX_GRAM` characters) which
+      answer plain substring queries,
+
+    * token postings with a sorted vocabulary which answer word-prefix
+      queries of the form ``\bprefix`` (where prefix is made of word
+      characters),
+
+    * a sorted list of whole field values which answers field-prefix queries
+      of the form ``^prefix``,
+
+    * the rows of each folded character (see :mod:`mathutf.folding`), which
+      answer queries that are a single non-ASCII character.
+
+Non-ASCII plain queries are folded before they are matched, e.g. the
+fullwidth ``ｄｅｌｔａ`` finds ``delta``.
+
+Anything else is treated as a real regular expression and falls back to a
+linear scan. Regular expressions are compiled by :func:`compile_query`, which
+keeps an LRU cache of compiled patterns and rejects patterns that could
+backtrack catastrophically.
+"""
+import bisect
+import functools
+import re
+
+from mathutf.folding import fold, fold_char, variants
+
+try:
+    from re import _constants as _sre_constants
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants as _sre_constants
+    import sre_parse as _sre_parse
+
+#: Characters that give a query regex meaning. A query that contains none of
+#: these is matched as a plain case-insensitive substring.
+REGEX_METACHARS = frozenset('.^$*+?{}[]\\|()')
+
+#: The longest n-gram stored in the postings. Substring queries up to this
+#: length are answered exactly by a single postings lookup, longer queries
+#: intersect the postings of their n-grams and verify the survivors.
+MAX_GRAM = 3
+
+_TOKEN_PAT = re.compile(r'\w+')
+
+#: The number of compiled query patterns kept by :func:`compile_query`
+REGEX_CACHE_SIZE = 512
+
+#: Longer regex queries are rejected by :func:`check_pattern`
+MAX_PATTERN_LENGTH = 256
+
+#: A repeat with a larger upper bound is treated as unbounded when looking for
+#: nested repeats
+_MAX_SAFE_REPEAT = 16
+
+#: Patterns with more unbounded repeats are rejected by :func:`check_pattern`
+MAX_UNBOUNDED_REPEATS = 2
+
+_REPEAT_OPS = {
+    getattr(_sre_constants, name) for name in [
+        'MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT']
+    if hasattr(_sre_constants, name)
+}
+
+
+class UnsafePatternError(ValueError):
+    """
+    Raised for a regex query that is too long or that could take exponential
+    time to match.
+    """
+
+
+def check_pattern(pattern):
+    r"""
+    Reject regex queries that could stall a search.
+
+    Python's :mod:`re` backtracks, so a pattern that nests unbounded
+    repeats, like ``(a+)+`` or ``(\w*)*x``, or that repeats an alternation,
+    like ``(.|.)*``, can take exponential time on a field that almost
+    matches, and a chain of repeats like ``.*.*.*.*`` takes polynomial time
+    of a high degree. Such patterns are rejected after parsing, before they
+    are ever run, because a running match cannot be interrupted.
+
+    Args:
+        pattern (str): a regular expression
+
+    Raises:
+        UnsafePatternError: if the pattern is longer than
+            :data:`MAX_PATTERN_LENGTH`, contains a repeat or an alternation
+            inside an unbounded repeat, or has more than
+            :data:`MAX_UNBOUNDED_REPEATS` unbounded repeats
+        re.error: if the pattern is invalid
+
+    Example:
+        >>> from mathutf.index import check_pattern, UnsafePatternError
+        >>> check_pattern('^sub_[0-9]+$')
+        >>> try:
+        ...     check_pattern('(a+)+$')
+        ... except UnsafePatternError as ex:
+        ...     print(ex)
+        nested repeat in pattern '(a+)+$'
+        >>> try:
+        ...     check_pattern('(.|.)*!')
+        ... except UnsafePatternError as ex:
+        ...     print(ex)
+        alternation inside a repeat in pattern '(.|.)*!'
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise UnsafePatternError(
+            f'pattern is longer than {MAX_PATTERN_LENGTH} characters')
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except _sre_constants.error as ex:
+        raise re.error(str(ex), pattern) from None
+    unbounded = []
+    problem = _find_unsafe(parsed, False, unbounded)
+    if problem is None and len(unbounded) > MAX_UNBOUNDED_REPEATS:
+        problem = f'more than {MAX_UNBOUNDED_REPEATS} unbounded repeats'
+    if problem is not None:
+        raise UnsafePatternError(f'{problem} in pattern {pattern!r}')
+
+
+def _find_unsafe(subpattern, in_repeat, unbounded):
+    """
+    Describe the first unsafe construct of a parsed pattern, collecting its
+    unbounded repeats along the way.
+    """
+    for op, av in subpattern:
+        items = ()
+        if op in _REPEAT_OPS:
+            lo, hi, item = av
+            is_unbounded = (hi == _sre_constants.MAXREPEAT or
+                            hi > _MAX_SAFE_REPEAT)
+            if is_unbounded:
+                if in_repeat:
+                    return 'nested repeat'
+                unbounded.append(av)
+            problem = _find_unsafe(item, in_repeat or is_unbounded, unbounded)
+            if problem is not None:
+                return problem
+        elif op is _sre_constants.SUBPATTERN:
+            items = [av[-1]]
+        elif op is _sre_constants.BRANCH:
+            if in_repeat:
+                return 'alternation inside a repeat'
+            items = av[1]
+        elif op in (_sre_constants.ASSERT, _sre_constants.ASSERT_NOT):
+            items = [av[1]]
+        elif op is _sre_constants.GROUPREF_EXISTS:
+            if in_repeat:
+                return 'alternation inside a repeat'
+            items = [item for item in av[1:] if item is not None]
+        elif op is getattr(_sre_constants, 'ATOMIC_GROUP', None):
+            items = [av]
+        for item in items:
+            problem = _find_unsafe(item, in_repeat, unbounded)
+            if problem is not None:
+                return problem
+    return None
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_query(query):
+    """
+    Check and compile a regex query (case insensitive), with an LRU cache.
+
+    Use ``compile_query.cache_info()`` for the hit / miss statistics and the
+    cache size, and ``compile_query.cache_clear()`` to empty it.
+
+    Args:
+        query (str): a regular expression
+
+    Returns:
+        re.Pattern
+
+    Raises:
+        UnsafePatternError: see :func:`check_pattern`
+        re.error: if the pattern is invalid
+
+    Example:
+        >>> from mathutf.index import compile_query
+        >>> compile_query('sub_[0-9]') is compile_query('sub_[0-9]')
+        True
+        >>> compile_query.cache_info().maxsize
+        512
+    """
+    check_pattern(query)
+    return re.compile(query, flags=re.IGNORECASE)
+
+
+def is_plain(text):
+    """
+    Check if a query has no regex meaning.
+
+    Args:
+        text (str): the query
+
+    Returns:
+        bool
+
+    Example:
+        >>> from mathutf.index import is_plain
+        >>> is_plain('alpha'), is_plain('alp.*a'), is_plain('sub_1')
+        (True, False, True)
+    """
+    return REGEX_METACHARS.isdisjoint(text)
+
+
+def _add_posting(postings, term, rowid):
+    ids = postings.get(term, None)
+    if ids is None:
+        postings[term] = [rowid]
+    elif ids[-1] != rowid:
+        ids.append(rowid)
+
+
+class SearchIndex:
+    r"""
+    Token and n-gram postings over the searchable fields of a list of rows.
+
+    Args:
+        rows (List[mathutf.records.SymbolRecord]): the rows to index in the
+            order they should be returned.
+
+        signature (Hashable | None):
+            an opaque value describing the data the index was built from. The
+            owner of the index compares it to decide when to rebuild.
+
+    Example:
+        >>> from mathutf.index import SearchIndex
+        >>> from mathutf.records import SymbolRecord
+        >>> rows = [
+        >>>     SymbolRecord('α', 'alpha', 'GREEK SMALL LETTER ALPHA', '\\alpha', 'greek', (), ()),
+        >>>     SymbolRecord('₁', 'sub_1', 'SUBSCRIPT ONE', '_1', 'subscripts', (), ()),
+        >>>     SymbolRecord('∞', 'infinity', 'INFINITY', None, 'misc', ('infty',), ()),
+        >>> ]
+        >>> index = SearchIndex(rows)
+        >>> list(index.find('ALP'))
+        [0]
+        >>> list(index.find('script one'))
+        [1]
+        >>> list(index.find('^inf'))
+        [2]
+        >>> list(index.find('\\bone'))
+        [1]
+        >>> list(index.find('a|y$'))
+        [0, 2]
+        >>> list(index.find('𝛼')), list(index.find('ｉｎｆ'))
+        ([0], [2])
+    """
+
+    def __init__(self, rows, signature=None):
+        self.rows = rows
+        self.signature = signature
+        self.fields = []
+        self.grams = {}
+        self.tokens = {}
+        self.chars = {}
+        self._vocab = []
+        self._prefixes = []
+        for rowid, row in enumerate(rows):
+            self._add_row(rowid, row, self._prefixes)
+        self._vocab = sorted(self.tokens)
+        self._prefixes.sort()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def extend(self, rows, signature=None):
+        """
+        Index rows that were appended after the index was built, instead of
+        building a new index.
+
+        Postings only grow at their end, and the sorted lists are replaced
+        rather than sorted in place, so concurrent queries see either the
+        old or the new rows. Row ids a query finds that are past the end of
+        the :attr:`rows` it read belong to rows added meanwhile. Rows must
+        be extended in order, by a single writer.
+
+        Args:
+            rows (Sequence[SymbolRecord]): every row, the indexed ones first
+            signature (Hashable | None): the signature of the extended data
+
+        Example:
+            >>> from mathutf.index import SearchIndex
+            >>> from mathutf.records import SymbolRecord
+            >>> rows = (SymbolRecord('∞', 'inf', 'INFINITY', None, 'misc', (), ()),)
+            >>> index = SearchIndex(rows)
+            >>> index.extend(rows + (
+            >>>     SymbolRecord('∅', 'empty', 'EMPTY SET', None, 'sets', (), ()),))
+            >>> list(index.find('^empty')), list(index.find('in'))
+            ([1], [0])
+        """
+        prefixes = list(self._prefixes)
+        for rowid in range(len(self.fields), len(rows)):
+            self._add_row(rowid, rows[rowid], prefixes)
+        prefixes.sort()
+        self._prefixes = prefixes
+        self._vocab = sorted(self.tokens)
+        self.rows = rows
+        self.signature = signature
+
+    def _add_row(self, rowid, row, prefixes):
+        fields = [row.key, row.utf_name, row.group]
+        fields.extend(row.alias)
+        if row.tex:
+            fields.append(row.tex)
+        fields = tuple(f.lower() for f in fields)
+        self.fields.append(fields)
+
+        grams = self.grams
+        tokens = self.tokens
+        for field in fields:
+            prefixes.append((field, rowid))
+            n = len(field)
+            for i in range(n):
+                for j in range(i + 1, min(i + MAX_GRAM, n) + 1):
+                    _add_posting(grams, field[i:j], rowid)
+            for tok in _TOKEN_PAT.findall(field):
+                _add_posting(tokens, tok, rowid)
+        _add_posting(self.chars, fold_char(row.chr), rowid)
+
+    def find(self, query, literal=False, info=None):
+        r"""
+        Find the ids of the rows matching a query.
+
+        Args:
+            query (str): a plain substring, ``^prefix``, ``\bprefix``, ``*``,
+                a regular expression, or a single non-ASCII character which
+                finds the rows of every character that folds to the same
+                form. Matching is case insensitive.
+            literal (bool): if True the query is a plain substring, unless
+                it is ``*``
+            info (Dict | None): if given, ``plan`` (how the query is
+                answered) and ``scanned`` (the number of rows examined) are
+                stored here, see :mod:`mathutf.instrument`
+
+        Returns:
+            Iterable[int]: matching row ids in ascending order
+
+        Raises:
+            UnsafePatternError: see :func:`check_pattern`
+            re.error: if the query is an invalid regular expression
+        """
+        if info is not None:
+            return self._find_explained(query, literal, info)
+        if query == '*':
+            return range(len(self.rows))
+        if len(query) == 1 and not query.isascii():
+            return self.chars.get(fold_char(query), [])
+        if literal or is_plain(query):
+            return self._find_substring(fold(query).lower())
+        if query.startswith('^') and is_plain(query[1:]):
+            return self._find_field_prefix(query[1:].lower())
+        if query.startswith('\\b') and _TOKEN_PAT.fullmatch(query[2:]):
+            return self._find_token_prefix(query[2:].lower())
+        return self._find_regex(query)
+
+    def _find_explained(self, query, literal, info):
+        """
+        :meth:`find`, recording how the query is answered.
+        """
+        num_rows = len(self.rows)
+        if query == '*':
+            info['plan'], info['scanned'] = 'all', 0
+            return range(num_rows)
+        if len(query) == 1 and not query.isascii():
+            info['plan'], info['scanned'] = 'char', 0
+            return self.chars.get(fold_char(query), [])
+        if literal or is_plain(query):
+            text = fold(query).lower()
+            if not text:
+                info['plan'], info['scanned'] = 'all', 0
+                return range(num_rows)
+            if len(text) <= MAX_GRAM:
+                found = self.grams.get(text, [])
+                # the postings are the answer, nothing is verified
+                info['plan'], info['scanned'] = 'gram', 0
+                return found
+            info['plan'] = 'substring'
+            return self._find_substring(text, info)
+        if query.startswith('^') and is_plain(query[1:]):
+            info['plan'], info['scanned'] = 'field_prefix', 0
+            return self._find_field_prefix(query[1:].lower())
+        if query.startswith('\\b') and _TOKEN_PAT.fullmatch(query[2:]):
+            info['plan'], info['scanned'] = 'token_prefix', 0
+            return self._find_token_prefix(query[2:].lower())
+        info['plan'], info['scanned'] = 'regex', num_rows
+        return self._find_regex(query)
+
+    def find_many(self, queries, literal=False):
+        """
+        Find the matching row ids for many queries with a single pass over
+        the rows.
+
+        Plain queries are bucketed by length. For each field, every substring
+        whose length is one of the query lengths is collected and the set is
+        intersected with the queries, so the cost grows with the number of
+        distinct query lengths, not the number of queries. Regex queries are
+        compiled once each and joined into one alternation that is used to
+        skip rows none of them can match.
+
+        Args:
+            queries (Iterable[str]): queries in the :func:`find` syntax.
+                Duplicates are only evaluated once.
+            literal (bool): if True every query except ``*`` is a plain
+                substring
+
+        Returns:
+            Dict[str, List[int]]: matching row ids (ascending) for each
+            distinct query, in first-seen order
+
+        Example:
+            >>> from mathutf.symbols import _get_index
+            >>> index = _get_index()
+            >>> found = index.find_many(['alpha', 'ALPHA', 'sub_[12]$', 'alpha'])
+            >>> found == {q: list(index.find(q)) for q in found}
+            True
+            >>> list(found)
+            ['alpha', 'ALPHA', 'sub_[12]$']
+        """
+        hits = {query: [] for query in queries}
+        everything = []
+        chars = []
+        plain = {}
+        lengths = set()
+        patterns = []
+        for query in hits:
+            if query == '' or query == '*':
+                everything.append(query)
+            elif len(query) == 1 and not query.isascii():
+                chars.append(query)
+            elif literal or is_plain(query):
+                text = fold(query).lower()
+                plain.setdefault(text, []).append(query)
+                lengths.add(len(text))
+            else:
+                patterns.append((query, compile_query(query)))
+
+        combined = None
+        if len(patterns) > 1:
+            try:
+                combined = re.compile('|'.join(
+                    '(?:{})'.format(query) for query, _ in patterns),
+                    flags=re.IGNORECASE)
+            except re.error:
+                # e.g. numbered backreferences do not survive concatenation
+                combined = None
+
+        lengths = sorted(lengths)
+        for rowid, fields in enumerate(self.fields):
+            if plain:
+                subs = {field[i:i + n] for field in fields for n in lengths
+                        for i in range(len(field) - n + 1)}
+                for text in subs.intersection(plain):
+                    for query in plain[text]:
+                        hits[query].append(rowid)
+            if patterns:
+                if combined is not None and not any(
+                        combined.search(field) for field in fields):
+                    continue
+                for query, pat in patterns:
+                    if any(pat.search(field) for field in fields):
+                        hits[query].append(rowid)
+
+        for query in everything:
+            hits[query] = list(range(len(self.rows)))
+        for query in chars:
+            hits[query] = list(self.chars.get(fold_char(query), []))
+        return hits
+
+    def _find_substring(self, text, info=None):
+        if not text:
+            return range(len(self.rows))
+        if len(text) <= MAX_GRAM:
+            return self.grams.get(text, [])
+        # Intersect the postings of every gram, rarest first, then verify
+        # the (usually tiny) candidate set.
+        parts = {text[i:i + MAX_GRAM] for i in range(len(text) - MAX_GRAM + 1)}
+        postings = sorted((self.grams.get(g, []) for g in parts), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(ids)
+        if info is not None:
+            info['scanned'] = len(candidates)
+        fields = self.fields
+        return [rowid for rowid in sorted(candidates)
+                if any(text in f for f in fields[rowid])]
+
+    def _find_field_prefix(self, text):
+        prefixes = self._prefixes
+        found = set()
+        idx = bisect.bisect_left(prefixes, (text,))
+        while idx < len(prefixes) and prefixes[idx][0].startswith(text):
+            found.add(prefixes[idx][1])
+            idx += 1
+        return sorted(found)
+
+    def _find_token_prefix(self, text):
+        vocab = self._vocab
+        found = set()
+        idx = bisect.bisect_left(vocab, text)
+        while idx < len(vocab) and vocab[idx].startswith(text):
+            found.update(self.tokens[vocab[idx]])
+            idx += 1
+        return sorted(found)
+
+    def _find_regex(self, query):
+        # compile eagerly so bad patterns raise when the query is made
+        return self._scan(compile_query(query))
+
+    def _scan(self, pat):
+        for rowid, fields in enumerate(self.fields):
+            for field in fields:
+                if pat.search(field):
+                    yield rowid
+                    break
+
+
+class CodepointIndex:
+    """
+    Maps each character in the symbol tables back to its row.
+
+    Args:
+        rows (Sequence[SymbolRecord]): the rows, when two rows have the same
+            character the first one wins
+        signature (Any): identifies the data the index was built from
+        fold (bool): if True the :func:`mathutf.folding.variants` of the
+            characters (e.g. ``µ`` for ``μ``) are also indexed. They can be
+            excluded per call.
+
+    Example:
+        >>> from mathutf.index import CodepointIndex
+        >>> from mathutf.records import SymbolRecord
+        >>> rows = [
+        >>>     SymbolRecord('∞', 'inf', 'INFINITY', None, 'misc', (), ()),
+        >>>     SymbolRecord('∈', 'in', 'ELEMENT OF', None, 'sets', (), ()),
+        >>> ]
+        >>> index = CodepointIndex(rows)
+        >>> index.get(0x221E).key
+        'inf'
+        >>> [(pos, row.key) for pos, row in index.find_all('x ∈ [0, ∞)')]
+        [(2, 'in'), (8, 'inf')]
+        >>> index = CodepointIndex(rows, fold=True)
+        >>> index.get('∊').key, index.get('∊', fold=False)
+        ('in', None)
+    """
+
+    def __init__(self, rows, signature=None, fold=False):
+        self.rows = rows
+        self.signature = signature
+        self.fold = fold
+        # records are built from the rows the first time they are found
+        self._records = {}
+        rowids = {}
+        for rowid, row in enumerate(rows):
+            rowids.setdefault(row.chr, rowid)
+        self._set_rowids(rowids)
+
+    def _set_rowids(self, rowids):
+        #: Dict[str, str]: indexed variants and the characters they fold to
+        variants_ = variants(rowids) if self.fold else {}
+        for char, target in variants_.items():
+            rowids[char] = rowids[target]
+        self.variants = variants_
+        #: Dict[str, int]: the row of every indexed character
+        self.rowids = rowids
+        if rowids:
+            # a character class lets the regex engine skip everything else
+            chars = sorted(rowids)
+            self.pattern = re.compile(
+                '[' + ''.join(map(re.escape, chars)) + ']')
+        else:
+            self.pattern = None
+
+    def __len__(self):
+        return len(self.rowids)
+
+    def _record(self, rowid):
+        record = self._records.get(rowid, None)
+        if record is None:
+            record = self._records[rowid] = self.rows[rowid]
+        return record
+
+    def extend(self, rows, signature=None):
+        """
+        Add the rows that were appended after the index was built.
+        Characters that are already indexed keep their row, except where the
+        index held a variant of another character.
+
+        Args:
+            rows (Sequence[SymbolRecord]): every row, the indexed ones first
+            signature (Any): identifies the extended data
+
+        Example:
+            >>> from mathutf.index import CodepointIndex
+            >>> from mathutf.records import SymbolRecord
+            >>> rows = (SymbolRecord('Δ', 'Delta', 'GREEK CAPITAL LETTER DELTA',
+            >>>                      None, 'greek', (), ()),)
+            >>> index = CodepointIndex(rows, fold=True)
+            >>> index.get('∆').key
+            'Delta'
+            >>> index.extend(rows + (SymbolRecord(
+            >>>     '∆', 'increment', 'INCREMENT', None, 'misc', (), ()),))
+            >>> index.get('∆').key, index.get('𝚫').key
+            ('increment', 'Delta')
+        """
+        rowids = {char: rowid for char, rowid in self.rowids.items()
+                  if char not in self.variants}
+        for rowid in range(len(self.rows), len(rows)):
+            rowids.setdefault(rows[rowid].chr, rowid)
+        # the old mapping stays in use until the new one is complete
+        self.rows = rows
+        self._set_rowids(rowids)
+        self.signature = signature
+
+    def get(self, chr_or_codepoint, default=None, fold=True):
+        """
+        Args:
+            chr_or_codepoint (str | int): a character or its codepoint
+            default (Any): returned for characters that are not in the tables
+            fold (bool): if False variants are not found
+
+        Returns:
+            SymbolRecord | Any
+        """
+        if not isinstance(chr_or_codepoint, str):
+            chr_or_codepoint = chr(chr_or_codepoint)
+        rowid = self.rowids.get(chr_or_codepoint, None)
+        if rowid is None or (not fold and chr_or_codepoint in self.variants):
+            return default
+        return self._record(rowid)
+
+    def find_all(self, text, fold=True):
+        """
+        Find every character of a text that is in the tables.
+
+        Args:
+            text (str): any text
+            fold (bool): if False variants are skipped
+
+        Returns:
+            List[Tuple[int, SymbolRecord]]: string offsets and rows, in order
+        """
+        pattern = self.pattern
+        if pattern is None:
+            return []
+        # read after the pattern, the rows of an extended index only grow
+        rowids = self.rowids
+        variants_ = self.variants if not fold else ()
+        record = self._record
+        return [(match.start(), record(rowids[match.group()]))
+                for match in pattern.finditer(text)
+                if match.group() not in variants_]
@@ -0,0 +1,260 @@
+"""
+Optional instrumentation of searches, lookups and index builds.
+
+Nothing is measured until a hook is registered. The instrumented functions
+of :mod:`mathutf.symbols` check whether :data:`HOOKS` is empty and take their
+normal code path if it is, so disabled instrumentation costs one list check
+per call.
+
+A hook is any callable that accepts an :class:`Event`. :class:`Stats` is a
+hook that aggregates events into per operation counters and latency
+histograms, ready to be exported to a metrics system.
+
+Operations:
+
+* ``search``: ``plan`` is how the query was answered (``substring``,
+  ``gram``, ``field_prefix``, ``token_prefix``, ``regex``, ``all``,
+  ``unicode_prefix`` or ``error``). ``scanned`` is the number of rows whose
+  fields were checked against the query (0 when an index holds the answer,
+  every row for a regex), ``cache_hit`` tells if a regex came from the
+  compiled pattern cache. The event is emitted once the results are
+  exhausted or discarded, ``seconds`` only counts time spent inside mathutf.
+* ``search_many``, ``search_ranked``, ``lookup``, ``lookup_many``.
+* ``build``: an index was (re)built, ``plan`` names the index. Compare the
+  number of builds with the number of queries to see if an index pays off.
+
+Example:
+    >>> from mathutf import instrument, symbols
+    >>> with instrument.collect() as stats:
+    ...     found = list(symbols.search('^sup_[0-9]$'))
+    ...     found = list(symbols.search('^sup_[0-9]$'))
+    ...     record = symbols.lookup('∈')
+    >>> search = stats['search']
+    >>> search.calls, search.matched, search.scanned == 2 * len(symbols.STORE)
+    (2, 20, True)
+    >>> search.plans
+    Counter({'regex': 2})
+    >>> search.cache_hits >= 1, stats['lookup'].calls
+    (True, 1)
+"""
+import bisect
+import contextlib
+import threading
+from collections import Counter, namedtuple
+
+#: Registered hooks. Mutate it with :func:`add_hook` and :func:`remove_hook`,
+#: the instrumented modules hold a reference to this list.
+HOOKS = []
+
+#: Upper bounds (in seconds) of the latency histogram buckets used by
+#: :class:`Stats`, the last bucket is unbounded
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3,
+    2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, float('inf'))
+
+_HOOKS_LOCK = threading.Lock()
+
+
+class Event(namedtuple('Event', [
+        'name', 'seconds', 'scanned', 'matched', 'cache_hit', 'plan'])):
+    """
+    One instrumented call.
+
+    Attributes:
+        name (str): the operation, e.g. ``'search'``
+        seconds (float): time spent in the call
+        scanned (int | None): rows (or characters) examined, if known
+        matched (int | None): results produced
+        cache_hit (bool | None): if a cache was consulted, whether it hit
+        plan (str | None): how the call was answered
+    """
+    __slots__ = ()
+
+
+def add_hook(hook):
+    """
+    Start sending events to a hook.
+
+    Args:
+        hook (Callable[[Event], Any]): called synchronously, in the thread
+            that made the call. It should be fast and must not raise.
+    """
+    with _HOOKS_LOCK:
+        HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Stop sending events to a hook.
+
+    Args:
+        hook (Callable[[Event], Any]): a hook given to :func:`add_hook`
+    """
+    with _HOOKS_LOCK:
+        HOOKS.remove(hook)
+
+
+def emit(event):
+    """
+    Send an event to every hook.
+
+    Args:
+        event (Event): the event
+    """
+    for hook in tuple(HOOKS):
+        hook(event)
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    Aggregate the events of a block of code.
+
+    Yields:
+        Stats: statistics that are updated while the block runs
+    """
+    stats = Stats()
+    add_hook(stats)
+    try:
+        yield stats
+    finally:
+        remove_hook(stats)
+
+
+class OperationStats:
+    """
+    Aggregated events of one operation.
+
+    Attributes:
+        calls (int): number of events
+        seconds (float): total time
+        histogram (List[int]): event counts per :data:`LATENCY_BUCKETS`
+        scanned (int): total rows examined
+        matched (int): total results
+        cache_hits (int): events whose cache hit
+        cache_misses (int): events whose cache missed
+        plans (collections.Counter): events per plan
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.calls = 0
+        self.seconds = 0.0
+        self.histogram = [0] * len(buckets)
+        self.scanned = 0
+        self.matched = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.plans = Counter()
+
+    def __repr__(self):
+        return (f'<OperationStats calls={self.calls} '
+                f'seconds={self.seconds:.6f} matched={self.matched}>')
+
+    def add(self, event):
+        self.calls += 1
+        self.seconds += event.seconds
+        self.histogram[bisect.bisect_left(self.buckets, event.seconds)] += 1
+        if event.scanned is not None:
+            self.scanned += event.scanned
+        if event.matched is not None:
+            self.matched += event.matched
+        if event.cache_hit is not None:
+            if event.cache_hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if event.plan is not None:
+            self.plans[event.plan] += 1
+
+    @property
+    def cache_hit_rate(self):
+        """
+        float | None: the fraction of cache lookups that hit
+        """
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else None
+
+    def quantile(self, q):
+        """
+        Estimate a latency quantile from the histogram.
+
+        Args:
+            q (float): between 0 and 1, e.g. 0.99
+
+        Returns:
+            float | None: the upper bound of the bucket holding the quantile
+        """
+        if not self.calls:
+            return None
+        need = q * self.calls
+        seen = 0
+        for bound, count in zip(self.buckets, self.histogram):
+            seen += count
+            if seen >= need:
+                return bound
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'histogram': dict(zip(map(str, self.buckets), self.histogram)),
+            'scanned': self.scanned,
+            'matched': self.matched,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'plans': dict(self.plans),
+        }
+
+
+class Stats:
+    """
+    A hook that aggregates events per operation. Thread safe.
+
+    Args:
+        buckets (Sequence[float]): latency histogram bounds, sorted, ending
+            in ``inf``
+
+    Example:
+        >>> from mathutf.instrument import Event, Stats
+        >>> stats = Stats()
+        >>> stats(Event('search', 3e-6, 191, 3, None, 'substring'))
+        >>> stats(Event('search', 2e-4, 191, 1, True, 'regex'))
+        >>> stats['search'].quantile(0.5), stats['search'].cache_hit_rate
+        (5e-06, 1.0)
+        >>> stats.to_dict()['search']['plans']
+        {'substring': 1, 'regex': 1}
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            stats = self.operations.get(event.name, None)
+            if stats is None:
+                stats = self.operations[event.name] = OperationStats(
+                    self.buckets)
+            stats.add(event)
+
+    def __getitem__(self, name):
+        return self.operations[name]
+
+    def __contains__(self, name):
+        return name in self.operations
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+
+    def to_dict(self):
+        """
+        Returns:
+            Dict[str, Dict]: plain data for each operation
+        """
+        with self._lock:
+            return {name: stats.to_dict()
+                    for name, stats in self.operations.items()}
@@ -0,0 +1,82 @@
+"""
+Immutable records describing a single symbol.
+
+Search results are returned as :class:`SymbolRecord` objects rather than the
+raw rows of :data:`mathutf.symbols.TABLES`, so callers can never mutate the
+shared module state and concurrent searches never write to anything.
+"""
+from collections import namedtuple
+
+
+_SymbolRecordBase = namedtuple('_SymbolRecordBase', [
+    'chr', 'key', 'utf_name', 'tex', 'group', 'alias', 'references'])
+
+
+class SymbolRecord(_SymbolRecordBase):
+    r"""
+    A lightweight, immutable description of one symbol.
+
+    Attributes:
+        chr (str): the unicode character
+        key (str): the short name used for attribute access
+        utf_name (str): the official unicode name
+        tex (str | None): a LaTeX macro that renders the symbol
+        group (str): the name of the table the symbol belongs to
+        alias (Tuple[str, ...]): alternative names
+        references (Tuple[str, ...]): links to further reading
+
+    Example:
+        >>> from mathutf.records import SymbolRecord
+        >>> row = {'chr': '∞', 'key': 'infinity', 'utf_name': 'INFINITY',
+        >>>        'alias': ['infty'], 'tex': '\\infty'}
+        >>> record = SymbolRecord.from_dict(row, group='transfinite')
+        >>> record.alias
+        ('infty',)
+        >>> record.to_dict() == dict(row, group='transfinite')
+        True
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, item, group=None):
+        """
+        Create a record from a row in the :data:`mathutf.symbols.TABLES`
+        format.
+
+        Args:
+            item (Dict): the row
+            group (str | None): the table name, overrides any group in the row
+
+        Returns:
+            SymbolRecord
+        """
+        if group is None:
+            group = item.get('group', None)
+        return cls(
+            item['chr'],
+            item['key'],
+            item['utf_name'],
+            item.get('tex', None),
+            group,
+            tuple(item.get('alias', ())),
+            tuple(item.get('references', ())),
+        )
+
+    def to_dict(self):
+        """
+        Convert to a fresh plain dictionary in the same layout as the rows in
+        :data:`mathutf.symbols.TABLES` (plus the group). Optional fields that
+        are empty are omitted.
+
+        Returns:
+            Dict
+        """
+        item = {'chr': self.chr, 'key': self.key, 'utf_name': self.utf_name}
+        if self.tex is not None:
+            item['tex'] = self.tex
+        if self.alias:
+            item['alias'] = list(self.alias)
+        if self.references:
+            item['references'] = list(self.references)
+        item['group'] = self.group
+        return item
@@ -0,0 +1,201 @@
+r"""
+Register symbol tables at runtime, from code or from installed packages.
+
+A registered table is a group of :data:`mathutf.symbols.STORE` like the
+builtin ones: its symbols are found by :func:`mathutf.symbols.search` and
+:func:`mathutf.symbols.lookup`, and their keys show up in
+:data:`mathutf.symbols.SYMBOLS` and as attributes of the :mod:`mathutf`
+package.
+
+The rows are validated once, when the table is registered. Registering a new
+table appends to the store, so the key map and the search, ranked search and
+character indexes only add the new rows the next time they are used instead
+of being rebuilt. Unregistering or replacing a table rebuilds them.
+
+Packages provide tables through the ``mathutf.tables`` entry point group.
+The entry point name is the table name, and the object it refers to is a
+list of rows, a dictionary with ``rows`` and an optional ``version``, or a
+callable returning either of those::
+
+    # setup.py of a package with in-house notation
+    entry_points={
+        'mathutf.tables': ['house = house_notation.tables:ROWS'],
+    }
+
+Discovery imports :mod:`importlib.metadata`, which is too slow to do on
+every import of mathutf, so it only happens when :func:`load_entry_points`
+is called. ``mathutf serve`` calls it before warming its indexes.
+
+Example:
+    >>> import mathutf
+    >>> from mathutf import registry, symbols
+    >>> registry.register_table('doctest_notation', [
+    >>>     {'chr': '⊸', 'key': 'multimap', 'utf_name': 'MULTIMAP', 'tex': '\\multimap'},
+    >>> ], version='1.0')
+    >>> print(mathutf.multimap, symbols.lookup('⊸').group)
+    ⊸ doctest_notation
+    >>> registry.registered_tables()['doctest_notation'].version
+    '1.0'
+    >>> registry.unregister_table('doctest_notation')
+    >>> 'multimap' in symbols.SYMBOLS, symbols.lookup('⊸')
+    (False, None)
+"""
+import threading
+from collections import namedtuple
+
+#: The entry point group searched by :func:`load_entry_points`
+ENTRY_POINT_GROUP = 'mathutf.tables'
+
+_REGISTRY = {}
+_LOCK = threading.Lock()
+
+
+class RegisteredTable(namedtuple('RegisteredTable', [
+        'name', 'version', 'source', 'rows'])):
+    """
+    A table added by :func:`register_table`.
+
+    Attributes:
+        name (str): the group name in the store
+        version (str | None): the version given when it was registered
+        source (str | None): where it came from, e.g. an entry point
+        rows (Tuple[Dict]): the validated rows
+    """
+    __slots__ = ()
+
+
+def _validate(name, rows):
+    """
+    Check the rows of a table and copy them.
+    """
+    from mathutf.store import _check_row, attribute_key
+    checked = []
+    seen = set()
+    for row in rows:
+        if not isinstance(row, dict):
+            raise TypeError(
+                f'Rows of table {name!r} must be dicts, got {row!r}')
+        _check_row(row)
+        key = attribute_key(row['key'])
+        if key in seen:
+            raise ValueError(
+                f'Table {name!r} has more than one symbol with key {key!r}')
+        seen.add(key)
+        checked.append(dict(row))
+    return tuple(checked)
+
+
+def register_table(name, rows, version=None, source=None, replace=False):
+    """
+    Add a table of symbols.
+
+    Args:
+        name (str): the table name, it must not be the name of a builtin table
+        rows (Iterable[Dict]): rows in the :data:`mathutf.symbols.TABLES`
+            format. Each needs ``chr`` (a single codepoint), ``key`` and
+            ``utf_name`` strings and may have ``tex``, ``alias`` and
+            ``references``. Keys must be unique within the table, a key that
+            is also used by an earlier table takes over its attribute.
+        version (str | None): the version of the table
+        source (str | None): a description of where the table came from
+        replace (bool): if True replace a table registered under the same
+            name, otherwise that is an error
+
+    Returns:
+        RegisteredTable
+
+    Raises:
+        ValueError: if a row is invalid or the name is taken
+        TypeError: if a row is not a dict
+    """
+    from mathutf.symbols import STORE
+    checked = _validate(name, rows)
+    table = RegisteredTable(name, version, source, checked)
+    with _LOCK:
+        old = _REGISTRY.get(name, None)
+        if old is None and name in STORE.group_spans:
+            raise ValueError(f'{name!r} is a builtin table')
+        if old is not None and not replace:
+            raise ValueError(
+                f'Table {name!r} (version {old.version}) is already '
+                'registered, pass replace=True to replace it')
+        STORE.set_group(name, checked, checked=True)
+        _REGISTRY[name] = table
+    return table
+
+
+def unregister_table(name):
+    """
+    Remove a table added by :func:`register_table`.
+
+    Args:
+        name (str): the table name
+
+    Raises:
+        KeyError: if no table of that name is registered
+    """
+    from mathutf.symbols import STORE
+    with _LOCK:
+        _REGISTRY.pop(name)
+        STORE.remove_group(name)
+
+
+def registered_tables():
+    """
+    Returns:
+        Dict[str, RegisteredTable]: the registered tables, in registration
+        order
+    """
+    with _LOCK:
+        return dict(_REGISTRY)
+
+
+def _entry_points(group):
+    try:
+        from importlib import metadata
+    except ImportError:  # Python 3.7
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return []
+    found = metadata.entry_points()
+    if hasattr(found, 'select'):
+        return list(found.select(group=group))
+    return list(found.get(group, []))  # Python < 3.10
+
+
+def load_entry_points(group=ENTRY_POINT_GROUP):
+    """
+    Register the tables provided by installed packages.
+
+    A table that is already registered with the same version is left alone,
+    one with a different version is replaced. The version defaults to the
+    version of the distribution that provides the entry point.
+
+    Args:
+        group (str): the entry point group
+
+    Returns:
+        List[RegisteredTable]: the tables that were registered or replaced
+    """
+    loaded = []
+    for entry_point in _entry_points(group):
+        value = entry_point.load()
+        if callable(value):
+            value = value()
+        if isinstance(value, dict):
+            rows = value['rows']
+            version = value.get('version', None)
+        else:
+            rows = value
+            version = None
+        dist = getattr(entry_point, 'dist', None)
+        if version is None and dist is not None:
+            version = dist.version
+        old = registered_tables().get(entry_point.name, None)
+        if old is not None and old.version == version:
+            continue
+        loaded.append(register_table(
+            entry_point.name, rows, version=version,
+            source=f'entry point {entry_point.value}', replace=True))
+    return loaded
@@ -0,0 +1,280 @@
+r"""
+A long running process that answers queries with warm search indexes.
+
+Editor integrations that call ``python -m mathutf`` once per query pay for
+interpreter startup and for building the tables and indexes every time.
+``mathutf serve`` pays for that once and then answers requests that are
+sent as JSON lines, either on stdin / stdout or on a Unix socket (see
+:mod:`mathutf.client` for a client that falls back to answering in process
+when no server is running).
+
+A request is a JSON object on one line::
+
+    {"id": 1, "method": "search", "params": {"query": "element"}}
+
+and the response echoes the id with either a result or an error::
+
+    {"id": 1, "result": [{"chr": "∈", "key": "elementof", ...}]}
+    {"id": 2, "error": {"type": "UnsafePatternError", "message": "..."}}
+
+The methods are listed in :data:`METHODS`. Symbols are returned as
+dictionaries (see :meth:`mathutf.records.SymbolRecord.to_dict`).
+
+CommandLine:
+    python -m mathutf serve                 # JSON lines on stdin / stdout
+    python -m mathutf serve --socket        # on the default socket
+    echo '{"id": 1, "method": "lookup", "params": {"chr": "ℝ"}}' | python -m mathutf serve
+
+Example:
+    >>> import io, json
+    >>> from mathutf.server import serve_lines
+    >>> requests = [
+    >>>     {'id': 1, 'method': 'lookup', 'params': {'chr': '∇'}},
+    >>>     {'id': 2, 'method': 'search', 'params': {'query': '(a+)+'}},
+    >>>     {'id': 3, 'method': 'to_unicode', 'params': {'text': r'\alpha^2'}},
+    >>> ]
+    >>> rfile = io.BytesIO(b''.join(
+    >>>     json.dumps(r).encode('utf8') + b'\n' for r in requests))
+    >>> wfile = io.BytesIO()
+    >>> serve_lines(rfile, wfile)
+    >>> for line in wfile.getvalue().decode('utf8').splitlines():
+    >>>     print(line[:72])
+    {"id": 1, "result": {"chr": "∇", "key": "nabla", "utf_name": "NABLA", "t
+    {"id": 2, "error": {"type": "UnsafePatternError", "message": "nested rep
+    {"id": 3, "result": "α²"}
+"""
+import json
+import os
+import sys
+import threading
+
+
+def _search(query, all_unicode=False, literal=False):
+    from mathutf.symbols import search
+    return list(search(query, as_dict=True, all_unicode=all_unicode,
+                       literal=literal))
+
+
+def _search_many(queries, literal=False):
+    from mathutf.symbols import search_many
+    return search_many(queries, as_dict=True, literal=literal)
+
+
+def _search_ranked(query, k=10, all_unicode=False):
+    from mathutf.symbols import search_ranked
+    return search_ranked(query, k=k, as_dict=True, all_unicode=all_unicode)
+
+
+def _lookup(chr):
+    from mathutf.symbols import lookup
+    return lookup(chr, as_dict=True)
+
+
+def _lookup_many(text):
+    from mathutf.symbols import lookup_many
+    return lookup_many(text, as_dict=True)
+
+
+def _to_unicode(text):
+    from mathutf.transliterate import to_unicode
+    return to_unicode(text)
+
+
+def _to_latex(text):
+    from mathutf.transliterate import to_latex
+    return to_latex(text)
+
+
+def _scan(text):
+    from mathutf.corpus import scan
+    report = scan(text)
+    return {'total': report.total, 'rows': report.rows()}
+
+
+def _ping():
+    from mathutf import __version__
+    return {'version': __version__, 'pid': os.getpid()}
+
+
+#: The methods a server answers, and the functions that implement them
+METHODS = {
+    'ping': _ping,
+    'search': _search,
+    'search_many': _search_many,
+    'search_ranked': _search_ranked,
+    'lookup': _lookup,
+    'lookup_many': _lookup_many,
+    'to_unicode': _to_unicode,
+    'to_latex': _to_latex,
+    'scan': _scan,
+}
+
+
+def _error(request_id, kind, message):
+    return {'id': request_id, 'error': {'type': kind, 'message': message}}
+
+
+def handle(request):
+    r"""
+    Answer one request.
+
+    Args:
+        request (Dict): with ``method``, optional ``params`` and ``id``
+
+    Returns:
+        Dict: the response, errors are reported in it and never raised
+
+    Example:
+        >>> from mathutf.server import handle
+        >>> handle({'id': 7, 'method': 'to_latex', 'params': {'text': 'α ≤ β'}})
+        {'id': 7, 'result': '\\alpha \\leq \\beta'}
+        >>> handle({'id': 8, 'method': 'nope'})['error']['type']
+        'KeyError'
+    """
+    if not isinstance(request, dict):
+        return _error(None, 'ValueError', 'a request must be a JSON object')
+    request_id = request.get('id', None)
+    method = request.get('method', None)
+    params = request.get('params', None) or {}
+    func = METHODS.get(method, None)
+    if func is None:
+        return _error(request_id, 'KeyError', f'unknown method {method!r}')
+    if not isinstance(params, dict):
+        return _error(request_id, 'TypeError', 'params must be a JSON object')
+    try:
+        result = func(**params)
+    except Exception as ex:
+        return _error(request_id, type(ex).__name__, str(ex))
+    return {'id': request_id, 'result': result}
+
+
+def warm():
+    """
+    Register the tables of installed packages (see
+    :func:`mathutf.registry.load_entry_points`), then build the tables and
+    the indexes used by the default queries.
+    """
+    from mathutf import registry, symbols, transliterate
+    registry.load_entry_points()
+    symbols._get_index()
+    symbols._get_fuzzy_index()
+    symbols._get_codepoint_index()
+    transliterate._unicode_transliterator()
+    transliterate._latex_transliterator()
+
+
+def serve_lines(rfile, wfile, on_shutdown=None):
+    """
+    Answer JSON line requests until the input ends.
+
+    Args:
+        rfile (io.BufferedIOBase): requests, one UTF-8 JSON object per line
+        wfile (io.BufferedIOBase): responses are written here
+        on_shutdown (Callable | None): if given, a ``shutdown`` request is
+            answered and then this is called
+    """
+    for line in rfile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as ex:
+            response = _error(None, 'ValueError', f'invalid JSON: {ex}')
+        else:
+            if (on_shutdown is not None and isinstance(request, dict) and
+                    request.get('method', None) == 'shutdown'):
+                _write(wfile, {'id': request.get('id', None), 'result': None})
+                on_shutdown()
+                return
+            response = handle(request)
+        _write(wfile, response)
+
+
+def _write(wfile, response):
+    wfile.write(json.dumps(response, ensure_ascii=False).encode('utf8'))
+    wfile.write(b'\n')
+    wfile.flush()
+
+
+def _claim_socket(fpath):
+    """
+    Remove a socket file left over by a server that is no longer running.
+    """
+    import socket
+    if not os.path.exists(fpath):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(fpath)
+    except OSError:
+        os.unlink(fpath)
+    else:
+        raise OSError(f'a server is already listening on {fpath}')
+    finally:
+        probe.close()
+
+
+def make_server(fpath=None):
+    """
+    Create a threaded server on a Unix socket. Call ``serve_forever`` to
+    run it and ``server_close`` to remove the socket afterwards.
+
+    A ``shutdown`` request stops the server.
+
+    Args:
+        fpath (str | None): the socket, defaults to
+            :func:`mathutf.client.default_socket_path`
+
+    Returns:
+        socketserver.ThreadingUnixStreamServer
+    """
+    import socketserver
+    from mathutf.client import default_socket_path
+    if fpath is None:
+        fpath = default_socket_path()
+    _claim_socket(fpath)
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def _shutdown():
+                # shutdown() waits for serve_forever, which runs elsewhere
+                threading.Thread(target=self.server.shutdown).start()
+            serve_lines(self.rfile, self.wfile, on_shutdown=_shutdown)
+
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+    old_umask = os.umask(0o177)  # only the owner may connect
+    try:
+        server = _Server(fpath, _Handler)
+    finally:
+        os.umask(old_umask)
+    return server
+
+
+def serve(fpath=None, stdio=False):
+    """
+    Warm the indexes and answer requests until stopped.
+
+    Args:
+        fpath (str | None): the socket to listen on, see :func:`make_server`
+        stdio (bool): if True answer requests on stdin / stdout instead
+    """
+    warm()
+    if stdio:
+        serve_lines(sys.stdin.buffer, sys.stdout.buffer)
+        return
+    server = make_server(fpath)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
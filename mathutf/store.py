@@ -0,0 +1,602 @@
+r"""
+A compact columnar backing store for the symbol tables.
+
+Instead of one dictionary per symbol (with the same string keys repeated in
+every row), the store keeps parallel columns:
+
+    * ``codepoints`` - an ``array('I')`` with one codepoint per row
+    * ``group_ids`` - an ``array('H')`` indexing into ``groups``
+    * ``keys`` / ``tex`` - lists of interned strings
+    * ``alias_offsets`` / ``alias_values`` and ``ref_offsets`` /
+      ``ref_values`` - offset tables into flat lists of interned strings
+
+The unicode name of a row is not stored at all when it agrees with
+:func:`unicodedata.name`; only the (rare) rows that disagree keep an explicit
+override.
+
+:data:`mathutf.symbols.TABLES` and :data:`mathutf.symbols.SYMBOLS` are thin
+views over a :class:`SymbolStore` (see :class:`TablesView` and
+:class:`SymbolsView`). The search indexes read their rows from
+:meth:`SymbolStore.snapshot`, a :class:`StoreSnapshot` of the columns that
+builds a record only when a row is read.
+
+Example:
+    >>> from mathutf.store import SymbolStore
+    >>> store = SymbolStore()
+    >>> store.set_group('transfinite', [
+    >>>     {'chr': '∞', 'key': 'infinity', 'utf_name': 'INFINITY', 'alias': ['infty'], 'tex': '\\infty'},
+    >>>     {'chr': 'ℵ', 'key': 'aleph', 'utf_name': 'ALEF SYMBOL', 'tex': '\\aleph'},
+    >>> ])
+    >>> tables = store.tables()
+    >>> tables['transfinite'][0]['alias']
+    ['infty']
+    >>> store.symbols()['aleph']
+    'ℵ'
+    >>> record = store.record(1)
+    >>> record.utf_name, record.tex, record.group
+    ('ALEF SYMBOL', '\\aleph', 'transfinite')
+"""
+import keyword
+import sys
+import threading
+import unicodedata
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+from mathutf.records import SymbolRecord
+
+
+def attribute_key(key):
+    """
+    The name a symbol is exposed under in :data:`mathutf.symbols.SYMBOLS`
+    and the package namespace (python keywords get a trailing underscore).
+
+    Args:
+        key (str): the symbol key
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.store import attribute_key
+        >>> attribute_key('alpha'), attribute_key('and')
+        ('alpha', 'and_')
+    """
+    if keyword.iskeyword(key):
+        key = key + '_'
+    return key
+
+
+def _check_row(item):
+    """
+    Raise if a row cannot be stored.
+    """
+    for field in ['chr', 'key', 'utf_name']:
+        if not isinstance(item.get(field, None), str):
+            raise ValueError(f'Symbol row {item!r} needs a {field!r} string')
+    if len(item['chr']) != 1:
+        raise ValueError(
+            f'Symbol {item["key"]!r} must be a single codepoint, got {item["chr"]!r}')
+
+
+def _intern(text):
+    return None if text is None else sys.intern(text)
+
+
+class _RowReader:
+    """
+    Reads rows out of the columns of a :class:`SymbolStore` or a
+    :class:`StoreSnapshot`.
+    """
+
+    def utf_name(self, rowid):
+        """
+        Args:
+            rowid (int): the row index
+
+        Returns:
+            str: the unicode name of the row's character
+        """
+        name = self.utf_name_overrides.get(rowid, None)
+        if name is None:
+            # one string object per name, however many records use it
+            name = sys.intern(unicodedata.name(chr(self.codepoints[rowid])))
+        return name
+
+    def alias(self, rowid):
+        offsets = self.alias_offsets
+        return tuple(self.alias_values[offsets[rowid]:offsets[rowid + 1]])
+
+    def references(self, rowid):
+        offsets = self.ref_offsets
+        return tuple(self.ref_values[offsets[rowid]:offsets[rowid + 1]])
+
+    def record(self, rowid):
+        """
+        Args:
+            rowid (int): the row index
+
+        Returns:
+            SymbolRecord: an immutable record for the row
+        """
+        return SymbolRecord(
+            chr(self.codepoints[rowid]),
+            self.keys[rowid],
+            self.utf_name(rowid),
+            self.tex[rowid],
+            self.groups[self.group_ids[rowid]],
+            self.alias(rowid),
+            self.references(rowid),
+        )
+
+
+class SymbolStore(_RowReader):
+    """
+    Columnar storage for groups of symbol rows.
+
+    Rows are kept ordered by group, and groups are kept in insertion order.
+    Appending a new group only appends to the columns. Replacing or removing
+    an existing group rebuilds the columns.
+
+    Every mutation increments :attr:`version`, which consumers (like the
+    search index) use to detect stale derived data. Consumers that can add
+    rows to their derived data ask :meth:`appended_since` whether only rows
+    were appended since the version they were built from.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = 0
+        # the first row of every group appended since the last rebuild,
+        # with the version it created
+        self._appends = []
+        self._rebuilt_version = 0
+        # (version, StoreSnapshot) of the last snapshot
+        self._snapshot = None
+        self._reset()
+
+    def _reset(self):
+        self.codepoints = array('I')
+        self.group_ids = array('H')
+        self.keys = []
+        self.tex = []
+        self.alias_offsets = array('I', [0])
+        self.alias_values = []
+        self.ref_offsets = array('I', [0])
+        self.ref_values = []
+        self.groups = []
+        self.group_spans = {}
+        self.utf_name_overrides = {}
+        self._key_index = None
+
+    def __len__(self):
+        return len(self.codepoints)
+
+    def _append_row(self, item, group_id):
+        chr_ = item['chr']
+        rowid = len(self.codepoints)
+        self.codepoints.append(ord(chr_))
+        self.group_ids.append(group_id)
+        self.keys.append(sys.intern(item['key']))
+        self.tex.append(_intern(item.get('tex', None)))
+        utf_name = item['utf_name']
+        if unicodedata.name(chr_, None) != utf_name:
+            self.utf_name_overrides[rowid] = utf_name
+        self.alias_values.extend(map(sys.intern, item.get('alias', ())))
+        self.alias_offsets.append(len(self.alias_values))
+        self.ref_values.extend(map(sys.intern, item.get('references', ())))
+        self.ref_offsets.append(len(self.ref_values))
+        if self._key_index is not None:
+            self._key_index[attribute_key(item['key'])] = rowid
+
+    def _append_group(self, name, rows, checked=False):
+        if not checked:
+            for item in rows:
+                _check_row(item)
+        group_id = len(self.groups)
+        start = len(self.codepoints)
+        self.groups.append(name)
+        for item in rows:
+            self._append_row(item, group_id)
+        self.group_spans[name] = (start, len(self.codepoints))
+
+    def set_group(self, name, rows, checked=False):
+        """
+        Add a new group of rows, or replace the rows of an existing group.
+
+        Args:
+            name (str): the group name
+            rows (Iterable[Dict]): rows in the :data:`mathutf.symbols.TABLES`
+                format
+            checked (bool): if True the caller has already validated the
+                rows
+        """
+        with self._lock:
+            if name in self.group_spans:
+                groups = [(g, rows if g == name else self.group_rows(g))
+                          for g in self.groups]
+                self._rebuild(groups, changed=name, checked=checked)
+            else:
+                start = len(self.codepoints)
+                self._append_group(name, list(rows), checked=checked)
+                self._appends.append((self.version + 1, start))
+            self.version += 1
+
+    def remove_group(self, name):
+        """
+        Remove a group and all of its rows.
+
+        Args:
+            name (str): the group name
+        """
+        with self._lock:
+            if name not in self.group_spans:
+                raise KeyError(name)
+            groups = [(g, self.group_rows(g)) for g in self.groups if g != name]
+            self._rebuild(groups, changed=None)
+            self.version += 1
+
+    def _rebuild(self, groups, changed, checked=False):
+        """
+        Rebuild the columns. Rows of groups other than ``changed`` come from
+        the store and are not checked again.
+        """
+        groups = [(g, list(rows)) for g, rows in groups]
+        if not checked:
+            for g, rows in groups:
+                if g == changed:
+                    for item in rows:
+                        _check_row(item)
+        self._reset()
+        for g, rows in groups:
+            self._append_group(g, rows, checked=True)
+        self._appends = []
+        self._rebuilt_version = self.version + 1
+
+    def appended_since(self, version):
+        """
+        Find the rows added since an earlier version, if the store was only
+        appended to since then (row ids of older rows are unchanged).
+
+        Args:
+            version (int): an earlier :attr:`version`
+
+        Returns:
+            Tuple[int, range | None]: the current version and the ids of
+            the new rows, or None if rows were replaced or removed
+
+        Example:
+            >>> from mathutf.store import SymbolStore
+            >>> store = SymbolStore()
+            >>> store.set_group('a', [
+            >>>     {'chr': '∞', 'key': 'inf', 'utf_name': 'INFINITY'}])
+            >>> old = store.version
+            >>> store.set_group('b', [
+            >>>     {'chr': '∅', 'key': 'empty', 'utf_name': 'EMPTY SET'}])
+            >>> store.appended_since(old)
+            (2, range(1, 2))
+            >>> store.set_group('a', [])
+            >>> store.appended_since(old)
+            (3, None)
+        """
+        with self._lock:
+            if version < self._rebuilt_version:
+                return self.version, None
+            starts = [start for v, start in self._appends if v > version]
+            start = starts[0] if starts else len(self.codepoints)
+            return self.version, range(start, len(self.codepoints))
+
+    def snapshot(self):
+        """
+        The rows of the current :attr:`version`.
+
+        Later changes to the store do not affect a snapshot, so row ids
+        found in an index built from it always refer to the same rows. The
+        snapshot shares the columns of the store, which are only appended
+        to or replaced, and builds a record each time a row is read.
+
+        Returns:
+            Tuple[int, StoreSnapshot]: the version and the rows
+
+        Example:
+            >>> from mathutf.store import SymbolStore
+            >>> store = SymbolStore()
+            >>> store.set_group('a', [
+            >>>     {'chr': '∞', 'key': 'inf', 'utf_name': 'INFINITY'}])
+            >>> version, rows = store.snapshot()
+            >>> store.set_group('b', [
+            >>>     {'chr': '∅', 'key': 'empty', 'utf_name': 'EMPTY SET'}])
+            >>> new_rows = store.snapshot()[1]
+            >>> len(rows), len(new_rows), new_rows.extends(rows)
+            (1, 2, True)
+            >>> store.set_group('a', [])
+            >>> version, new_rows = store.snapshot()
+            >>> version, rows[0].key, [row.key for row in new_rows]
+            (3, 'inf', ['empty'])
+            >>> new_rows.extends(rows)
+            False
+        """
+        cached = self._snapshot
+        if cached is not None and cached[0] == self.version:
+            return cached
+        with self._lock:
+            cached = self._snapshot
+            if cached is None or cached[0] != self.version:
+                cached = self._snapshot = (self.version, StoreSnapshot(self))
+            return cached
+
+    def row_dict(self, rowid):
+        """
+        Args:
+            rowid (int): the row index
+
+        Returns:
+            Dict: a new dictionary in the :data:`mathutf.symbols.TABLES` row
+            layout (without a group)
+        """
+        item = self.record(rowid).to_dict()
+        item.pop('group')
+        return item
+
+    def group_rows(self, name):
+        """
+        Args:
+            name (str): the group name
+
+        Returns:
+            List[Dict]: new row dictionaries for every row in the group
+        """
+        start, stop = self.group_spans[name]
+        return [self.row_dict(rowid) for rowid in range(start, stop)]
+
+    def key_index(self):
+        """
+        A mapping from attribute key to row index. When two rows share a key
+        the later one wins. Built on first use.
+
+        Returns:
+            Dict[str, int]
+        """
+        key_index = self._key_index
+        if key_index is None:
+            with self._lock:
+                key_index = {attribute_key(key): rowid
+                             for rowid, key in enumerate(self.keys)}
+                self._key_index = key_index
+        return key_index
+
+    def tables(self):
+        """
+        Returns:
+            TablesView: a dict-like view of the groups
+        """
+        return TablesView(self)
+
+    def symbols(self):
+        """
+        Returns:
+            SymbolsView: a dict-like view from attribute key to character
+        """
+        return SymbolsView(self)
+
+    def records(self):
+        """
+        Returns:
+            RecordsView: a sequence of :class:`SymbolRecord` for every row,
+            that follows changes to the store
+        """
+        return RecordsView(self)
+
+    def memory_usage(self):
+        """
+        Estimate the number of bytes held by the store.
+
+        Every container is counted with :func:`sys.getsizeof` and every
+        distinct string object once.
+
+        Returns:
+            Dict[str, int]: bytes per column and the ``total``
+
+        Example:
+            >>> from mathutf import symbols
+            >>> usage = symbols.STORE.memory_usage()
+            >>> usage['total'] > 0
+            True
+        """
+        columns = {
+            'codepoints': self.codepoints,
+            'group_ids': self.group_ids,
+            'keys': self.keys,
+            'tex': self.tex,
+            'alias_offsets': self.alias_offsets,
+            'alias_values': self.alias_values,
+            'ref_offsets': self.ref_offsets,
+            'ref_values': self.ref_values,
+            'groups': self.groups,
+            'group_spans': self.group_spans,
+            'utf_name_overrides': self.utf_name_overrides,
+        }
+        usage = {k: sys.getsizeof(v) for k, v in columns.items()}
+        strings = {id(s): s for s in self.keys + self.tex + self.alias_values +
+                   self.ref_values + self.groups +
+                   list(self.utf_name_overrides.values()) if s is not None}
+        usage['strings'] = sum(map(sys.getsizeof, strings.values()))
+        usage['total'] = sum(usage.values())
+        return usage
+
+
+class StoreSnapshot(_RowReader, Sequence):
+    """
+    The rows of a :class:`SymbolStore` at one version.
+
+    It holds references to the columns of the store and the number of rows.
+    Appending to the store only adds rows past the end of the snapshot, and
+    replacing or removing a group gives the store new columns, so the rows
+    of a snapshot never change. Records are built when a row is read.
+
+    Args:
+        store (SymbolStore): the store, its lock must be held
+    """
+
+    def __init__(self, store):
+        self.codepoints = store.codepoints
+        self.group_ids = store.group_ids
+        self.keys = store.keys
+        self.tex = store.tex
+        self.alias_offsets = store.alias_offsets
+        self.alias_values = store.alias_values
+        self.ref_offsets = store.ref_offsets
+        self.ref_values = store.ref_values
+        self.groups = store.groups
+        self.utf_name_overrides = store.utf_name_overrides
+        self._len = len(store)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(rowid)
+                    for rowid in range(self._len)[index]]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('snapshot index out of range')
+        return self.record(index)
+
+    def __iter__(self):
+        record = self.record
+        for rowid in range(self._len):
+            yield record(rowid)
+
+    def extends(self, other):
+        """
+        Check if this snapshot only adds rows to an older one.
+
+        Args:
+            other (Sequence): an older snapshot
+
+        Returns:
+            bool: True if the rows of ``other`` are the first rows of this
+            snapshot
+        """
+        return (isinstance(other, StoreSnapshot) and
+                other.codepoints is self.codepoints and
+                len(other) <= self._len)
+
+    def __repr__(self):
+        return f'<StoreSnapshot rows={self._len}>'
+
+
+class TablesView(MutableMapping):
+    """
+    A dict-like view of a :class:`SymbolStore` mapping each group name to a
+    :class:`GroupView` of its rows.
+
+    Assigning a list of rows adds or replaces a group and deleting a name
+    removes it. Individual rows are read-only copies.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, name):
+        if name not in self.store.group_spans:
+            raise KeyError(name)
+        return GroupView(self.store, name)
+
+    def __setitem__(self, name, rows):
+        self.store.set_group(name, rows)
+
+    def __delitem__(self, name):
+        self.store.remove_group(name)
+
+    def __iter__(self):
+        return iter(list(self.store.groups))
+
+    def __len__(self):
+        return len(self.store.groups)
+
+    def __contains__(self, name):
+        return name in self.store.group_spans
+
+    def __repr__(self):
+        return f'<TablesView groups={len(self)} rows={len(self.store)}>'
+
+
+class GroupView(Sequence):
+    """
+    A sequence of new row dictionaries for one group of a
+    :class:`SymbolStore`.
+    """
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def _span(self):
+        return self.store.group_spans[self.name]
+
+    def __len__(self):
+        start, stop = self._span()
+        return stop - start
+
+    def __getitem__(self, index):
+        start, stop = self._span()
+        rowids = range(start, stop)[index]
+        if isinstance(index, slice):
+            return [self.store.row_dict(rowid) for rowid in rowids]
+        return self.store.row_dict(rowids)
+
+    def __iter__(self):
+        start, stop = self._span()
+        row_dict = self.store.row_dict
+        for rowid in range(start, stop):
+            yield row_dict(rowid)
+
+    def __repr__(self):
+        return f'<GroupView {self.name!r} rows={len(self)}>'
+
+
+class SymbolsView(Mapping):
+    """
+    A dict-like view of a :class:`SymbolStore` from attribute key to
+    character.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, key):
+        rowid = self.store.key_index()[key]
+        return chr(self.store.codepoints[rowid])
+
+    def __iter__(self):
+        return iter(list(self.store.key_index()))
+
+    def __len__(self):
+        return len(self.store.key_index())
+
+    def __contains__(self, key):
+        return key in self.store.key_index()
+
+    def __repr__(self):
+        return f'<SymbolsView symbols={len(self)}>'
+
+
+class RecordsView(Sequence):
+    """
+    A sequence of the :class:`SymbolRecord` of every row of a
+    :class:`SymbolStore`, read from its current :meth:`SymbolStore.snapshot`.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(self.store.snapshot()[1])
+
+    def __getitem__(self, index):
+        return self.store.snapshot()[1][index]
@@ -0,0 +1,166 @@
+"""
+Write text in the math alphabets (bold, double-struck, fraktur, ...).
+
+The Mathematical Alphanumeric Symbols block (U+1D400 - U+1D7FF) holds styled
+copies of the Latin letters, the digits and the Greek letters. A few of them
+were encoded earlier in the Letterlike Symbols block (e.g. ``ℂ``, ``ℎ``,
+``ℛ``, ``ℭ``), which leaves holes in the main block. :func:`style_table`
+builds a translate table for each alphabet from the ``<font>``
+decompositions of the block plus those letterlike exceptions, once per
+process, so :func:`style` converts a whole string with one
+:meth:`str.translate` call.
+
+Characters that are already styled are restyled (``style('ℝ', 'bf')`` gives
+``𝐑``) and ``'rm'`` removes the styling. Characters without a form in the
+requested alphabet are left unchanged.
+
+Example:
+    >>> from mathutf.styles import style
+    >>> print(style('R', 'bb'), style('P', 'cal'), style('g', 'frak'))
+    ℝ 𝒫 𝔤
+    >>> print(style('x + 1', 'bf'), style('αβ', 'it'), style('ℝ', 'sf'))
+    𝐱 + 𝟏 𝛼𝛽 𝖱
+    >>> print(style('𝐱 + 𝟏, ℋ', 'rm'))
+    x + 1, H
+"""
+import functools
+import unicodedata
+
+#: The alphabets. The names follow the LaTeX macros (``\mathbb``,
+#: ``\mathbf``, ...), ``bf`` combines with ``it``, ``cal``, ``frak`` and
+#: ``sf``. ``rm`` is the plain alphabet.
+STYLES = (
+    'rm', 'bf', 'it', 'bfit', 'cal', 'bfcal', 'frak', 'bffrak', 'bb', 'sf',
+    'bfsf', 'sfit', 'bfsfit', 'tt',
+)
+
+# How the styles are written in the character names of the block, longest
+# first so that "BOLD ITALIC" is not read as "BOLD"
+_NAME_STYLES = [
+    ('SANS-SERIF BOLD ITALIC ', 'bfsfit'),
+    ('SANS-SERIF BOLD ', 'bfsf'),
+    ('SANS-SERIF ITALIC ', 'sfit'),
+    ('SANS-SERIF ', 'sf'),
+    ('BOLD ITALIC ', 'bfit'),
+    ('BOLD SCRIPT ', 'bfcal'),
+    ('BOLD FRAKTUR ', 'bffrak'),
+    ('BOLD ', 'bf'),
+    ('ITALIC ', 'it'),
+    ('SCRIPT ', 'cal'),
+    ('FRAKTUR ', 'frak'),
+    ('DOUBLE-STRUCK ', 'bb'),
+    ('MONOSPACE ', 'tt'),
+]
+
+# Letters of the block that were encoded in Letterlike Symbols instead
+_LETTERLIKE = {
+    'it': {'h': 'ℎ'},
+    'cal': {'B': 'ℬ', 'E': 'ℰ', 'F': 'ℱ', 'H': 'ℋ', 'I': 'ℐ', 'L': 'ℒ',
+            'M': 'ℳ', 'R': 'ℛ', 'e': 'ℯ', 'g': 'ℊ', 'o': 'ℴ'},
+    'frak': {'C': 'ℭ', 'H': 'ℌ', 'I': 'ℑ', 'R': 'ℜ', 'Z': 'ℨ'},
+    'bb': {'C': 'ℂ', 'H': 'ℍ', 'N': 'ℕ', 'P': 'ℙ', 'Q': 'ℚ', 'R': 'ℝ',
+           'Z': 'ℤ'},
+}
+
+_BLOCK = range(0x1D400, 0x1D800)
+
+
+@functools.lru_cache(maxsize=None)
+def alphabets():
+    """
+    The styled form of each plain character, per style.
+
+    Returns:
+        Dict[str, Dict[str, str]]: style to a mapping from plain characters
+        to styled ones
+
+    Example:
+        >>> from mathutf.styles import alphabets
+        >>> bb = alphabets()['bb']
+        >>> bb['C'], bb['D'], bb['1']
+        ('ℂ', '𝔻', '𝟙')
+        >>> len(alphabets()['bf'])  # letters, digits, greek and digamma
+        122
+    """
+    found = {name: {} for name in STYLES if name != 'rm'}
+    for codepoint in _BLOCK:
+        char = chr(codepoint)
+        name = unicodedata.name(char, '')
+        decomposition = unicodedata.decomposition(char)
+        if not name.startswith('MATHEMATICAL ') or not decomposition:
+            continue
+        name = name[len('MATHEMATICAL '):]
+        for prefix, style_name in _NAME_STYLES:
+            if name.startswith(prefix):
+                break
+        else:
+            continue
+        tag, base = decomposition.split()
+        if tag == '<font>':
+            found[style_name].setdefault(chr(int(base, 16)), char)
+    for style_name, letters in _LETTERLIKE.items():
+        found[style_name].update(letters)
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def style_table(name):
+    """
+    The :meth:`str.translate` table that writes text in one alphabet.
+
+    Plain characters and characters in any other alphabet are mapped to the
+    requested alphabet.
+
+    Args:
+        name (str): one of :data:`STYLES`
+
+    Returns:
+        Dict[int, str]
+
+    Example:
+        >>> from mathutf.styles import style_table
+        >>> table = style_table('bb')
+        >>> table[ord('R')], table[ord('𝐑')], table[ord('ℛ')]
+        ('ℝ', 'ℝ', 'ℝ')
+    """
+    if name not in STYLES:
+        raise ValueError(f'unknown style {name!r}, expected one of {STYLES}')
+    found = alphabets()
+    target = {} if name == 'rm' else found[name]
+    table = {}
+    for letters in found.values():
+        for base, styled in letters.items():
+            # restyle, unless the target alphabet lacks the character
+            default = base if name == 'rm' else styled
+            table[ord(styled)] = target.get(base, default)
+    for base, styled in target.items():
+        table[ord(base)] = styled
+    # Leave out characters that would map to themselves
+    return {key: value for key, value in table.items() if chr(key) != value}
+
+
+def style(text, name):
+    """
+    Write text in a math alphabet.
+
+    Args:
+        text (str): text to style
+        name (str): one of :data:`STYLES`, e.g. ``'bb'`` (double-struck),
+            ``'bf'`` (bold), ``'cal'`` (script), ``'frak'`` (fraktur),
+            ``'sf'`` (sans-serif), ``'tt'`` (monospace), ``'it'`` (italic) or
+            ``'rm'`` (plain)
+
+    Returns:
+        str
+
+    Raises:
+        ValueError: for an unknown style
+
+    Example:
+        >>> from mathutf.styles import style
+        >>> print(style('Hello, World 42', 'frak'))
+        ℌ𝔢𝔩𝔩𝔬, 𝔚𝔬𝔯𝔩𝔡 42
+        >>> print(style('Hello, World 42', 'tt'))
+        𝙷𝚎𝚕𝚕𝚘, 𝚆𝚘𝚛𝚕𝚍 𝟺𝟸
+    """
+    return text.translate(style_table(name))
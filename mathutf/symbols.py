@@ -19,7 +19,11 @@ References:
 
     https://github.com/fKunstner/latex-to-utf8/blob/master/map.js
 """
-import ubelt as ub
+import threading
+import time
+from mathutf import instrument as _instrument
+from mathutf.records import SymbolRecord
+from mathutf.store import SymbolStore
 
 
 # From /r/mathmemes Useful Symbol Sidebar
@@ -66,7 +70,12 @@ Greek Letters
 𝛢𝛼 𝛣𝛽 𝛤𝛾 𝛥𝛿 𝛦𝜀𝜖 𝛧𝜁 𝛨𝜂 𝛩𝜃𝜗 𝛪𝜄 𝛫𝜅 𝛬𝜆 𝛭𝜇 𝛮𝜈 𝛯𝜉 𝛰𝜊 𝛱𝜋 𝛲𝜌 𝛴𝜎 𝛵𝜏 𝛶𝜐 𝛷𝜙𝜑 𝛸𝜒 𝛹𝜓 𝛺𝜔
 """
 
-TABLES = {}
+#: The columnar backing store that holds every symbol row
+STORE = SymbolStore()
+
+#: A dict-like view of :data:`STORE` mapping each table name to its rows.
+#: Assigning a list of row dictionaries adds (or replaces) a table.
+TABLES = STORE.tables()
 
 TABLES['greek_letters'] = [
     {'chr': 'α', 'key': 'alpha', 'utf_name': 'GREEK SMALL LETTER ALPHA', 'tex': '\\alpha'},
@@ -351,43 +360,8 @@ def _compositions():
     print(SYMBOLS['beth'] + SYMBOLS['sub_1'])
 
 
-SYMBOLS = {}
-
-
-def _populate_class():
-    import keyword
-    for table_name, subtable in TABLES.items():
-        for item in subtable:
-            key = item['key']
-            if keyword.iskeyword(key):
-                key = key + '_'
-            SYMBOLS[key] = item['chr']
-            # setattr(MathSymbols, key, item['chr'])
-
-
-_populate_class()
-
-
-def _build_unicode_named_table():
-    """
-    https://stackoverflow.com/questions/10229156/how-many-characters-can-utf-8-encode
-    TODO: generate all unicode characters, for now this is enough.
-    """
-    import unicodedata
-    num_chars = 11141120
-    import pygtrie
-    trie = pygtrie.StringTrie(separator='_')
-    invalids = []
-    for index in range(1, num_chars):
-        try:
-            chr_ = chr(index)
-            utf_name = unicodedata.name(chr_)
-            key = utf_name.replace('-', '_').replace(' ', '_').lower()
-            trie[key] = chr_
-        except Exception:
-            invalids.append(index)
-    trie['greek_capital_letter_theta']
-    # kwarray.group_consecutive(invalids)
+#: A dict-like view of :data:`STORE` mapping each symbol key to its character
+SYMBOLS = STORE.symbols()
 
 
 def _show_all():
@@ -411,189 +385,489 @@ def _show_all():
     # dups = ub.find_duplicates(all_items, key=lambda x: x['chr'])
 
 
-def _dev_map_to_latex():
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+# Instrumented functions take their normal path while this is empty
+_HOOKS = _instrument.HOOKS
+
+
+def _emit(name, start, scanned=None, matched=None, cache_hit=None,
+          plan=None):
+    _instrument.emit(_instrument.Event(
+        name, time.perf_counter() - start, scanned, matched, cache_hit, plan))
+
+
+def _get_index():
     """
-    Used to map symbols to latex names
+    Return the search index, building it if this is the first call or if
+    :data:`STORE` has changed since it was last built. If rows were only
+    appended (e.g. by :func:`mathutf.registry.register_table`) the new rows
+    are added to the existing index.
+
+    The index holds a :meth:`~mathutf.store.SymbolStore.snapshot` of the
+    store, so a search that is still being read when the tables change keeps
+    returning the rows it found, and searching never writes to
+    :data:`TABLES`.
+
+    Returns:
+        mathutf.index.SearchIndex
     """
-    js_map = ub.grabdata('https://raw.githubusercontent.com/fKunstner/latex-to-utf8/master/map.js')
-    import ast
-    latex_to_utf = ast.literal_eval(ub.Path(js_map).read_text()[10:])
-    latex_to_utf = ub.udict(latex_to_utf)
-    utf_to_latex = latex_to_utf.invert(unique_vals=0)
-
-    def reorder_dict(d, head=[], tail=[]):
-        orig = d
-        d = ub.udict(d)
-        head_parts = d & head
-        tail_parts = d & tail
-        rest_parts = d - (head_parts) - (tail_parts)
-        new = head_parts | rest_parts | tail_parts
-        orig.clear()
-        orig.update(new)
-        return new
-
-    hard_coded = {
-        'Υ': {r'\Upsilon'},
-        'ᵦ': {r'_\beta'},
-        'ᵧ': {r'_\gamma'},
-        'ᵨ': {r'_\rho'},
-        'ᵩ': {r'_\phi'},
-        'ᵪ': {r'_\chi'},
-        '∂': {r'\partial'},
-        '→': {r'\rightarrow'},
-        '∘': {r'\circ'},
-        '…': {r'\ldots'},
-        '≠': {r'\neq'},
-        '𝜏': {r'\mittau'},
-    }
-    utf_to_latex.update(hard_coded)
-
-    def lookup_item_tex(item):
-        tex_items = list(utf_to_latex[item['chr']])
-        if len(tex_items) > 1:
-            norms = list(ub.unique([t.replace('\\up', '\\') for t in tex_items]))
-            if len(norms) == 1:
-                tex_items = norms
-            norms = list(ub.unique([t.replace('\\unicode', '\\') for t in tex_items]))
-            if len(norms) == 1:
-                tex_items = norms
-            norms = list(ub.unique([t.lower() for t in tex_items]))
-            if len(norms) == 1:
-                tex_items = norms
-            if any('mathbb' in t for t in tex_items):
-                norms = [t for t in tex_items if t.startswith('\\mathbb{')]
-                if len(norms) == 1:
-                    tex_items = norms
-            if any('sqrt[' in t for t in tex_items):
-                norms = [t for t in tex_items if t.startswith('\\sqrt[')]
-                if len(norms) == 1:
-                    tex_items = norms
-        if len(tex_items) > 1:
-            ambiguous.append([item, tex_items])
-
-        return tex_items[0]
-
-    failed = []
-    ambiguous = []
-    for table_name, subtable in TABLES.items():
-        for item in subtable:
-            if 'tex' not in item:
-                try:
-                    item['tex'] = lookup_item_tex(item)
-                except Exception:
-                    failed.append(item)
+    global _INDEX
+    signature = STORE.version
+    index = _INDEX
+    if index is None or index.signature != signature:
+        with _INDEX_LOCK:
+            index = _INDEX
+            if index is None or index.signature != signature:
+                from mathutf.index import SearchIndex
+                start = time.perf_counter()
+                signature, rows = STORE.snapshot()
+                if _only_appended(index, rows):
+                    index.extend(rows, signature=signature)
+                    plan = 'search_index_update'
+                else:
+                    index = _INDEX = SearchIndex(rows, signature=signature)
+                    plan = 'search_index'
+                if _HOOKS:
+                    _emit('build', start, plan=plan)
+    return index
+
+
+def _only_appended(index, rows):
+    """
+    Check if an index can be extended to a new snapshot, that is the rows
+    it was built from are still the first rows of the snapshot.
+    """
+    return index is not None and rows.extends(index.rows)
+
+
+def search(query, as_dict=False, all_unicode=False, literal=False):
+    r"""
+    Find symbols whose key, unicode name, group, alias, or tex matches a
+    query (case insensitive).
+
+    Plain queries (no regex metacharacters) are answered from an n-gram
+    index, ``^prefix`` and ``\bprefix`` queries from sorted field and token
+    lists, and ``*`` returns everything. Any other query is compiled as a
+    regular expression (see :func:`mathutf.index.compile_query`, compiled
+    patterns are cached and patterns prone to catastrophic backtracking are
+    rejected) and checked against every row. Use ``literal=True`` for
+    untrusted input that should never be treated as a regex.
+
+    Non-ASCII plain queries are folded first (see :mod:`mathutf.folding`), and
+    a query that is a single non-ASCII character finds every symbol that
+    folds to the same character, e.g. ``∆`` finds ``Δ`` and ``∆``.
+
+    Searching is read-only and safe to run from multiple threads.
+
+    Args:
+        query (str): the text or pattern to search for
+
+        as_dict (bool):
+            By default immutable :class:`SymbolRecord` objects are yielded.
+            If True, yield a new plain dictionary per result instead (in the
+            row layout of :data:`TABLES` plus a ``group`` entry), which the
+            caller is free to modify.
+
+        all_unicode (bool):
+            If True, search the names of every unicode character instead of
+            the curated tables. In this mode the query is a name prefix in the
+            underscore separated format of
+            :func:`mathutf.unicode_names.normalize_name` (a trailing ``*`` is
+            allowed). The name index is cached on disk and built on first use.
+            Results have the group ``"unicode"``.
+
+        literal (bool):
+            If True, the query is a plain case-insensitive substring and
+            regex metacharacters have no meaning. ``*`` still returns
+            everything.
+
+    Yields:
+        SymbolRecord | Dict: the matching symbols in table order
+
+    Raises:
+        mathutf.index.UnsafePatternError: for a regex query that could take
+            exponential time or is too long
+        re.error: for an invalid regex query
 
-            reorder_dict(item, tail=['alias', 'references'])
+    Example:
+        >>> from mathutf.symbols import search
+        >>> [item.chr for item in search('beta')]
+        ['β', 'Β', 'ᵦ']
+        >>> [item.key for item in search('^sup_[0-2]$')]
+        ['sup_0', 'sup_1', 'sup_2']
+        >>> list(search('^sup_[0-2]$', literal=True))
+        []
+        >>> [item.utf_name for item in search('∆')]
+        ['GREEK CAPITAL LETTER DELTA', 'INCREMENT']
+        >>> row = next(search('nabla', as_dict=True))
+        >>> row['chr'], row['alias'], row['group']
+        ('∇', ['del', 'gradient'], 'calclus')
+    """
+    if _HOOKS:
+        return _search_instrumented(query, as_dict, all_unicode, literal)
+    if all_unicode:
+        return _search_all_unicode(query, as_dict)
+    index = _get_index()
+    # find before returning the generator, so bad patterns raise here
+    rowids = index.find(query, literal=literal)
+    return _iter_rows(index.rows, rowids, as_dict)
 
-    print('TABLES = {}')
-    for table_name, subtable in TABLES.items():
-        print('')
-        print(f'TABLES["{table_name}"] = ' + ub.urepr(subtable))
-        ...
 
+def _search_instrumented(query, as_dict, all_unicode, literal):
+    """
+    :func:`search` reporting a ``search`` event, see
+    :mod:`mathutf.instrument`.
+    """
+    from mathutf.index import compile_query
+    start = time.perf_counter()
+    info = {}
+    try:
+        if all_unicode:
+            info['plan'] = 'unicode_prefix'
+            items = _search_all_unicode(query, as_dict)
+        else:
+            index = _get_index()
+            hits = compile_query.cache_info().hits
+            rowids = index.find(query, literal=literal, info=info)
+            if info['plan'] == 'regex':
+                info['cache_hit'] = compile_query.cache_info().hits > hits
+            items = _iter_rows(index.rows, rowids, as_dict)
+    except Exception:
+        _emit('search', start, matched=0, plan='error')
+        raise
+    return _iter_timed('search', items, time.perf_counter() - start, info)
+
+
+def _iter_timed(name, items, seconds, info):
+    """
+    Yield from items, timing only the time spent producing them. The event
+    is emitted when the iterator is exhausted or discarded.
+    """
+    clock = time.perf_counter
+    matched = 0
+    try:
+        while True:
+            start = clock()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            finally:
+                seconds += clock() - start
+            matched += 1
+            yield item
+    finally:
+        _instrument.emit(_instrument.Event(
+            name, seconds, info.get('scanned', None), matched,
+            info.get('cache_hit', None), info.get('plan', None)))
+
+
+def _iter_rows(rows, rowids, as_dict):
+    # ids are ascending, those past the end are rows appended meanwhile
+    num_rows = len(rows)
+    if as_dict:
+        for rowid in rowids:
+            if rowid >= num_rows:
+                break
+            yield rows[rowid].to_dict()
+    else:
+        for rowid in rowids:
+            if rowid >= num_rows:
+                break
+            yield rows[rowid]
+
+
+def search_many(queries, as_dict=False, literal=False):
+    """
+    Run many :func:`search` queries at once.
+
+    The queries are deduplicated and all of them are matched in a single pass
+    over the symbol data (see :meth:`mathutf.index.SearchIndex.find_many`),
+    which is much faster than calling :func:`search` in a loop for large
+    batches.
+
+    Args:
+        queries (Iterable[str]): queries in the :func:`search` syntax
+        as_dict (bool): if True return plain dictionaries, see :func:`search`
+        literal (bool): if True every query is a plain substring
+
+    Returns:
+        Dict[str, List[SymbolRecord | Dict]]: the results of each distinct
+        query, in table order
 
-def _dev_search_for_symbols():
+    Example:
+        >>> from mathutf.symbols import search_many
+        >>> found = search_many(['beta', 'nabla', 'beta', 'no such symbol'])
+        >>> {q: [r.chr for r in rows] for q, rows in found.items()}
+        {'beta': ['β', 'Β', 'ᵦ'], 'nabla': ['∇'], 'no such symbol': []}
     """
-    Used to help build the initial list.
+    start = time.perf_counter()
+    index = _get_index()
+    rows = index.rows
+    # ids past the end are rows appended meanwhile
+    num_rows = len(rows)
+    found = {}
+    for query, rowids in index.find_many(queries, literal=literal).items():
+        records = [rows[rowid] for rowid in rowids if rowid < num_rows]
+        if as_dict:
+            records = [record.to_dict() for record in records]
+        found[query] = records
+    if _HOOKS:
+        _emit('search_many', start, scanned=len(rows),
+              matched=sum(map(len, found.values())), plan='batch')
+    return found
+
+
+_CODEPOINT_INDEX = None
+
+
+def _get_codepoint_index():
     """
-    import unicodedata
+    Return the character to row index, rebuilding it when :data:`STORE` has
+    changed, or adding the new rows if rows were only appended.
 
-    key_to_num = {}
-    for chr_ in '0123456789':
-        key = unicodedata.name(chr_).replace('DIGIT ', '').lower()
-        key_to_num[key] = chr_
+    Returns:
+        mathutf.index.CodepointIndex
+    """
+    global _CODEPOINT_INDEX
+    signature = STORE.version
+    index = _CODEPOINT_INDEX
+    if index is None or index.signature != signature:
+        with _INDEX_LOCK:
+            index = _CODEPOINT_INDEX
+            if index is None or index.signature != signature:
+                from mathutf.index import CodepointIndex
+                start = time.perf_counter()
+                signature, rows = STORE.snapshot()
+                if _only_appended(index, rows):
+                    index.extend(rows, signature=signature)
+                    plan = 'codepoint_index_update'
+                else:
+                    index = _CODEPOINT_INDEX = CodepointIndex(
+                        rows, signature=signature, fold=True)
+                    plan = 'codepoint_index'
+                if _HOOKS:
+                    _emit('build', start, plan=plan)
+    return index
+
+
+def lookup(chr_or_codepoint, default=None, as_dict=False, fold=True):
+    r"""
+    Find the table entry of a character.
+
+    This is a single dictionary probe on a precomputed index.
+
+    Args:
+        chr_or_codepoint (str | int): a character or its codepoint
+        default (Any): returned if the character is not in the tables
+        as_dict (bool): if True return a plain dictionary, see :func:`search`
+        fold (bool): if True a look-alike of a table character, such as
+            ``µ`` for ``μ`` or ``𝛼`` for ``α``, finds the entry of that
+            character (see :func:`mathutf.folding.variants`)
+
+    Returns:
+        SymbolRecord | Dict | Any
 
-    import re
-    set_related = re.compile('\\b(SUPERSET|SUBSET|SET)\\b')
+    Example:
+        >>> from mathutf.symbols import lookup
+        >>> record = lookup('ℝ')
+        >>> record.key, record.group, record.tex
+        ('real', 'numeric_sets', '\\mathbb{R}')
+        >>> lookup(0x2207).alias
+        ('del', 'gradient')
+        >>> lookup('x') is None
+        True
+        >>> lookup('µ').utf_name, lookup('µ', fold=False)
+        ('GREEK SMALL LETTER MU', None)
+    """
+    if _HOOKS:
+        return _lookup_instrumented(chr_or_codepoint, default, as_dict, fold)
+    record = _get_codepoint_index().get(chr_or_codepoint, None, fold)
+    if record is None:
+        return default
+    return record.to_dict() if as_dict else record
 
-    for i in range(1, 100000000):
-        try:
-            chr_ = chr(i)
-            utf_name = unicodedata.name(chr_)
-            key = utf_name.replace('-', '_').replace(' ', '_').lower()
-            found = False
-            # if 'MATHEMATICAL' in name:
-            #     print('{}'.format(ub.repr2(item, nl=0)))
-
-            key = key.replace('equal', 'eq')
-            if set_related.match(utf_name):
-                found = 0
-                key = key.replace('_of', '')
-                key = key.replace('_to', '')
-                key = key.replace('_or', '')
-
-            if 'SUPERSCRIPT' in utf_name:
-                found = 0
-                key = key.replace('latin_', '')
-                key = key.replace('greek_', '')
-                key = key.replace('subscript', 'sub')
-                key = key.replace('superscript', 'sup')
-                key = key.replace('small_letter_', '')
-                key = key.replace('_sign', '')
-                key = key.replace('parenthesis', 'paren')
-                key = key.replace('left_paren', 'lparen')
-                key = key.replace('right_paren', 'rparen')
-                key = key.replace('plus_with_sub_2', 'plus_sub_2')
-                key = key.replace('arabic_sub_alef', 'sub_alef')
-                for s, r in key_to_num.items():
-                    key = key.replace(s, r)
-
-            if 'SUBSCRIPT' in utf_name:
-                found = 0
-                key = key.replace('latin_', '')
-                key = key.replace('greek_', '')
-                key = key.replace('subscript', 'sub')
-                key = key.replace('small_letter_', '')
-                key = key.replace('_sign', '')
-                key = key.replace('parenthesis', 'paren')
-                key = key.replace('left_paren', 'lparen')
-                key = key.replace('right_paren', 'rparen')
-                key = key.replace('plus_with_sub_2', 'plus_sub_2')
-                key = key.replace('arabic_sub_alef', 'sub_alef')
-                for s, r in key_to_num.items():
-                    key = key.replace(s, r)
-
-            if 'ELEMENT OF' in utf_name:
-                found = 1
-            # if 'LOGICAL' in utf_name:
-            #     print('{}'.format(ub.repr2(item, nl=0)))
-            if found:
-                item = {
-                    'chr': chr_,
-                    'utf_name': utf_name,
-                    'key': key,
-                }
-                print('{},'.format(ub.repr2(item, nl=0)))
-        except Exception:
-            pass
-
-
-def search(query):
+
+def _lookup_instrumented(chr_or_codepoint, default, as_dict, fold):
+    index = _get_codepoint_index()
+    start = time.perf_counter()
+    record = index.get(chr_or_codepoint, None, fold)
+    _emit('lookup', start, scanned=1, matched=int(record is not None))
+    if record is None:
+        return default
+    return record.to_dict() if as_dict else record
+
+
+def lookup_many(text, as_dict=False, fold=True):
     """
+    Find the table entry of every math character in a text.
+
+    Characters that are not in the tables are skipped by a compiled regex
+    character class, each hit is one dictionary probe.
+
+    Args:
+        text (str): any text
+        as_dict (bool): if True return plain dictionaries, see :func:`search`
+        fold (bool): if True look-alikes of table characters are found too,
+            see :func:`lookup`
+
+    Returns:
+        List[Tuple[int, SymbolRecord | Dict]]: offsets into text and entries
+
     Example:
-        query = 'beta'
+        >>> from mathutf.symbols import lookup_many
+        >>> [(pos, r.key) for pos, r in lookup_many('∀ε>0 ∃δ')]
+        [(0, 'forall'), (1, 'epsilon'), (2, 'gt'), (5, 'exists'), (6, 'delta')]
     """
-    # Handle normalization of queries
-    if query == '*':
-        query = '.*'
+    start = time.perf_counter()
+    found = _get_codepoint_index().find_all(text, fold=fold)
+    if _HOOKS:
+        _emit('lookup_many', start, scanned=len(text), matched=len(found))
+    if as_dict:
+        return [(pos, record.to_dict()) for pos, record in found]
+    return found
 
-    import re
-    pat = re.compile(query, flags=re.IGNORECASE)
 
-    for table_name, subtable in TABLES.items():
-        for item in subtable:
-            item['group'] = table_name
+_FUZZY_INDEX = None
+_UNICODE_FUZZY_INDEX = None
+
+#: Scores of ``search_ranked(all_unicode=True)`` results that are not in the
+#: curated tables are scaled by this factor
+UNICODE_RANK_WEIGHT = 0.9
 
-            flag = pat.search(item['key'])
-            if not flag:
-                flag = pat.search(item['utf_name'])
-            if not flag:
-                flag = pat.search(item['group'])
-            if not flag:
-                for alias in item.get('alias', []):
-                    flag = pat.search(alias)
-                    if flag:
-                        break
-
-            if flag:
-                yield item
+
+def _get_fuzzy_index():
+    """
+    Return the ranked search index over :data:`STORE`, rebuilding it when the
+    store has changed, or adding the new rows if rows were only appended.
+
+    Returns:
+        mathutf.fuzzy.FuzzyIndex
+    """
+    global _FUZZY_INDEX
+    signature = STORE.version
+    index = _FUZZY_INDEX
+    if index is None or index.signature != signature:
+        with _INDEX_LOCK:
+            index = _FUZZY_INDEX
+            if index is None or index.signature != signature:
+                from mathutf.fuzzy import FuzzyIndex, record_fields
+                start = time.perf_counter()
+                signature, rows = STORE.snapshot()
+                if _only_appended(index, rows):
+                    num_old = len(index.rows)
+                    # the records the doc ids refer to, set first so every
+                    # doc id found has a record
+                    index.rows = rows
+                    docs = ((ord(record.chr), record_fields(record))
+                            for record in rows[num_old:])
+                    index.extend(docs, signature=signature)
+                    plan = 'fuzzy_index_update'
+                else:
+                    docs = ((ord(record.chr), record_fields(record))
+                            for record in rows)
+                    index = FuzzyIndex(docs, signature=signature)
+                    index.rows = rows
+                    _FUZZY_INDEX = index
+                    plan = 'fuzzy_index'
+                if _HOOKS:
+                    _emit('build', start, plan=plan)
+    return index
+
+
+def _get_unicode_fuzzy_index():
+    """
+    Return the ranked search index over the name of every unicode character.
+    It does not depend on :data:`STORE` and is built once per process.
+
+    Returns:
+        mathutf.fuzzy.FuzzyIndex
+    """
+    global _UNICODE_FUZZY_INDEX
+    if _UNICODE_FUZZY_INDEX is None:
+        with _INDEX_LOCK:
+            if _UNICODE_FUZZY_INDEX is None:
+                from mathutf.fuzzy import FuzzyIndex, NAME_WEIGHT
+                from mathutf.unicode_names import global_index
+                start = time.perf_counter()
+                docs = ((ord(chr_), [(key, NAME_WEIGHT)])
+                        for key, chr_ in global_index().prefix_items(''))
+                _UNICODE_FUZZY_INDEX = FuzzyIndex(docs, join=False)
+                if _HOOKS:
+                    _emit('build', start, plan='unicode_fuzzy_index')
+    return _UNICODE_FUZZY_INDEX
+
+
+def search_ranked(query, k=10, as_dict=False, all_unicode=False):
+    """
+    Find the symbols that best match a free text query, tolerating typos.
+
+    Unlike :func:`search`, which is an exact (regex) filter in table order,
+    this scores symbols by how well the query tokens match the tokens of
+    their key, unicode name and aliases (exactly, as a prefix, or within a
+    small edit distance) and returns the best ``k``. See
+    :mod:`mathutf.fuzzy`.
+
+    Args:
+        query (str): free text such as ``"lamda"`` or ``"supset eq"``
+        k (int): the maximum number of results
+        as_dict (bool): if True return plain dictionaries, see :func:`search`
+        all_unicode (bool): if True also rank the names of every unicode
+            character that is not in the tables (in the group ``"unicode"``).
+            The index over all names is built on first use.
+
+    Returns:
+        List[SymbolRecord | Dict]: best match first
+
+    Example:
+        >>> from mathutf.symbols import search_ranked
+        >>> [item.chr for item in search_ranked('lamda', k=2)]
+        ['λ', 'Λ']
+        >>> [item.key for item in search_ranked('nabal', k=1)]
+        ['nabla']
+        >>> [item.key for item in search_ranked('supset eq', k=1)]
+        ['supset_eq']
+    """
+    start = time.perf_counter()
+    if not query.isascii():
+        from mathutf.folding import fold
+        query = fold(query)
+    index = _get_fuzzy_index()
+    records = index.rows
+    # ids past the end are rows appended meanwhile
+    ranked = [(score, records[docid])
+              for score, docid in index.topk(query, k=k)
+              if docid < len(records)]
+    if all_unicode:
+        import unicodedata
+        from mathutf.unicode_names import normalize_name
+        unicode_index = _get_unicode_fuzzy_index()
+        # characters that have a curated row are only reported once
+        curated = set(index.codepoints)
+        for score, docid in unicode_index.topk(query, k=k, exclude=curated):
+            # prefer a curated row over an equally good unicode name
+            score *= UNICODE_RANK_WEIGHT
+            chr_ = chr(unicode_index.codepoints[docid])
+            utf_name = unicodedata.name(chr_)
+            record = SymbolRecord(chr_, normalize_name(utf_name), utf_name,
+                                  None, 'unicode', (), ())
+            ranked.append((score, record))
+        ranked.sort(key=lambda t: -t[0])
+        ranked = ranked[:k]
+    if _HOOKS:
+        _emit('search_ranked', start, matched=len(ranked),
+              plan='ranked_unicode' if all_unicode else 'ranked')
+    if as_dict:
+        return [record.to_dict() for _, record in ranked]
+    return [record for _, record in ranked]
+
+
+def _search_all_unicode(query, as_dict):
+    import unicodedata
+    from mathutf.unicode_names import global_index
+    for key, chr_ in global_index().prefix_items(query):
+        record = SymbolRecord(chr_, key, unicodedata.name(chr_), None,
+                              'unicode', (), ())
+        yield record.to_dict() if as_dict else record
@@ -0,0 +1,385 @@
+r"""
+Incrementally regenerate the ``TABLES`` literals in :mod:`mathutf.symbols`.
+
+This replaces the old ``_dev_map_to_latex`` helper, which downloaded the
+LaTeX map on every run and printed every table to stdout. Here:
+
+* The LaTeX map (``map.js`` from the latex-to-utf8 project) is downloaded
+  once into the cache directory, or read from a given file.
+
+* The inputs of the ``tex`` lookup (the unicode database version, the bytes
+  of the LaTeX map and :data:`TEX_OVERRIDES`) are hashed. Each table block in
+  the source is hashed together with them and compared against a manifest
+  from the previous run, which is kept in the cache directory (see
+  :func:`default_manifest_fpath`). Unchanged tables are skipped without
+  being parsed.
+
+* In a changed table, tex is only looked up for rows that have none, and for
+  rows whose tex was filled in by a previous run (as recorded in the
+  manifest) when the inputs changed. Hand-written tex values are never
+  touched.
+
+* Only the row lines that changed are rewritten, comments and blank lines
+  are kept, and the source and manifest are replaced atomically.
+
+CommandLine:
+    python -m mathutf.tablegen
+    python -m mathutf.tablegen --latex-map path/to/map.js --check
+
+Example:
+    >>> import os, tempfile
+    >>> from mathutf.tablegen import regenerate
+    >>> dpath = tempfile.mkdtemp()
+    >>> source = os.path.join(dpath, 'symbols.py')
+    >>> latex_map = os.path.join(dpath, 'map.js')
+    >>> with open(source, 'w') as file:
+    ...     _ = file.write("TABLES['demo'] = [\n"
+    ...                    "    {'chr': 'α', 'key': 'alpha'},\n"
+    ...                    "]\n")
+    >>> with open(latex_map, 'w') as file:
+    ...     _ = file.write(r'var map = {"\\alpha": "α"}')
+    >>> regenerate(source, latex_map_fpath=latex_map)
+    {'changed_tables': ['demo'], 'updated_rows': 1, 'failed': []}
+    >>> print(open(source).read().strip())
+    TABLES['demo'] = [
+        {'chr': 'α', 'key': 'alpha', 'tex': '\\alpha'},
+    ]
+    >>> regenerate(source, latex_map_fpath=latex_map)
+    {'changed_tables': [], 'updated_rows': 0, 'failed': []}
+"""
+import ast
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+#: Bump this when the manifest layout or the lookup rules change
+FORMAT_VERSION = 1
+
+#: Where the LaTeX map is downloaded from
+LATEX_MAP_URL = (
+    'https://raw.githubusercontent.com/fKunstner/latex-to-utf8/master/map.js')
+
+#: Tex forms that take precedence over the LaTeX map
+TEX_OVERRIDES = {
+    'Υ': [r'\Upsilon'],
+    'ᵦ': [r'_\beta'],
+    'ᵧ': [r'_\gamma'],
+    'ᵨ': [r'_\rho'],
+    'ᵩ': [r'_\phi'],
+    'ᵪ': [r'_\chi'],
+    '∂': [r'\partial'],
+    '→': [r'\rightarrow'],
+    '∘': [r'\circ'],
+    '…': [r'\ldots'],
+    '≠': [r'\neq'],
+    '𝜏': [r'\mittau'],
+}
+
+#: Row keys that are written last
+_TAIL_KEYS = ['alias', 'references']
+
+_BLOCK_START = re.compile(r"^TABLES\['(\w+)'\] = \[$")
+
+
+def default_source_fpath():
+    """
+    Returns:
+        str: the path of :mod:`mathutf.symbols`
+    """
+    return os.path.join(os.path.dirname(__file__), 'symbols.py')
+
+
+def default_manifest_fpath(source_fpath, dpath=None):
+    """
+    The manifest is a cache of the previous run, so it is not kept in the
+    source tree. A fresh checkout starts without one and every table is
+    checked once.
+
+    Args:
+        source_fpath (str): the file holding the tables
+        dpath (str | None): the cache directory, defaults to
+            :func:`mathutf.unicode_names.cache_dpath`
+
+    Returns:
+        str: the manifest of that file in the cache directory
+    """
+    from mathutf.unicode_names import cache_dpath
+    if dpath is None:
+        dpath = cache_dpath()
+    source_fpath = os.path.abspath(source_fpath)
+    stem = os.path.splitext(os.path.basename(source_fpath))[0]
+    digest = hashlib.sha1(source_fpath.encode('utf8')).hexdigest()[:16]
+    return os.path.join(dpath, 'tablegen', f'{stem}_{digest}.tables.json')
+
+
+def fetch_latex_map(dpath=None, redo=False):
+    """
+    Download the LaTeX map into the cache directory, unless it is already
+    there.
+
+    Args:
+        dpath (str | None): defaults to
+            :func:`mathutf.unicode_names.cache_dpath`
+        redo (bool): download even if the file exists
+
+    Returns:
+        str: the path of the cached file
+    """
+    from mathutf.unicode_names import cache_dpath
+    if dpath is None:
+        dpath = cache_dpath()
+    fpath = os.path.join(dpath, 'latex_to_utf8_map.js')
+    if redo or not os.path.exists(fpath):
+        import urllib.request
+        os.makedirs(dpath, exist_ok=True)
+        with urllib.request.urlopen(LATEX_MAP_URL) as response:
+            data = response.read()
+        _atomic_write(fpath, data)
+    return fpath
+
+
+def parse_latex_map(text):
+    """
+    Parse the JavaScript object literal of ``map.js``.
+
+    Args:
+        text (str): file contents, e.g. ``var map = {"\\alpha": "α", ...}``
+
+    Returns:
+        Dict[str, List[str]]: each character and its tex forms in file order
+    """
+    latex_to_utf = ast.literal_eval(text[text.index('{'):text.rindex('}') + 1])
+    utf_to_latex = {}
+    for tex, chr_ in latex_to_utf.items():
+        forms = utf_to_latex.setdefault(chr_, [])
+        if tex not in forms:
+            forms.append(tex)
+    return utf_to_latex
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def choose_tex(tex_items):
+    """
+    Pick the tex form of a character when the map has several.
+
+    Spelling variants (``\\up``, ``\\unicode`` and case) are merged, and a
+    ``\\mathbb{..}`` or ``\\sqrt[..]`` form is preferred.
+
+    Args:
+        tex_items (List[str]): candidate forms
+
+    Returns:
+        Tuple[str, bool]: the chosen form and whether it was ambiguous
+    """
+    if len(tex_items) > 1:
+        for norm in [lambda t: t.replace('\\up', '\\'),
+                     lambda t: t.replace('\\unicode', '\\'),
+                     lambda t: t.lower()]:
+            norms = _unique(norm(t) for t in tex_items)
+            if len(norms) == 1:
+                tex_items = norms
+        for prefix in ['\\mathbb{', '\\sqrt[']:
+            if any(prefix in t for t in tex_items):
+                norms = [t for t in tex_items if t.startswith(prefix)]
+                if len(norms) == 1:
+                    tex_items = norms
+    return tex_items[0], len(tex_items) > 1
+
+
+def inputs_hash(latex_map_bytes, overrides=None):
+    """
+    Hash everything a tex lookup depends on.
+
+    Args:
+        latex_map_bytes (bytes): contents of the LaTeX map file
+        overrides (Dict[str, List[str]] | None): defaults to
+            :data:`TEX_OVERRIDES`
+
+    Returns:
+        str: hex digest
+    """
+    if overrides is None:
+        overrides = TEX_OVERRIDES
+    hasher = hashlib.sha256()
+    hasher.update(f'v{FORMAT_VERSION}\0{unicodedata.unidata_version}\0'.encode())
+    hasher.update(hashlib.sha256(latex_map_bytes).digest())
+    hasher.update(json.dumps(overrides, sort_keys=True).encode())
+    return hasher.hexdigest()
+
+
+def _split_blocks(lines):
+    """
+    Find the ``TABLES['name'] = [`` ... ``]`` blocks.
+
+    Yields:
+        Tuple[str, int, int]: table name and the line span of its rows
+    """
+    name = None
+    for idx, line in enumerate(lines):
+        if name is None:
+            match = _BLOCK_START.match(line)
+            if match:
+                name, start = match.group(1), idx + 1
+        elif line == ']':
+            yield name, start, idx
+            name = None
+
+
+def render_row(row):
+    """
+    Format a row the way the tables in :mod:`mathutf.symbols` are written.
+
+    Args:
+        row (Dict): a table row
+
+    Returns:
+        str
+    """
+    head = {k: v for k, v in row.items() if k not in _TAIL_KEYS}
+    tail = {k: row[k] for k in _TAIL_KEYS if k in row}
+    return '    {!r},'.format({**head, **tail})
+
+
+def _atomic_write(fpath, data):
+    tmp_fpath = '{}.tmp.{}'.format(fpath, os.getpid())
+    with open(tmp_fpath, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_fpath, fpath)
+
+
+def regenerate(source_fpath=None, latex_map_fpath=None, manifest_fpath=None,
+               overrides=None, dry_run=False):
+    """
+    Fill in missing tex values of the table literals in a source file.
+
+    Args:
+        source_fpath (str | None): defaults to :func:`default_source_fpath`
+        latex_map_fpath (str | None): the LaTeX map, fetched into the cache
+            with :func:`fetch_latex_map` if not given
+        manifest_fpath (str | None): defaults to
+            :func:`default_manifest_fpath`
+        overrides (Dict[str, List[str]] | None): defaults to
+            :data:`TEX_OVERRIDES`
+        dry_run (bool): compute the changes but do not write anything
+
+    Returns:
+        Dict: the names of the tables that changed (or would change), the
+        number of rows whose tex was updated, and the rows (as
+        ``(table, chr)``) that have no tex form
+    """
+    if source_fpath is None:
+        source_fpath = default_source_fpath()
+    if manifest_fpath is None:
+        manifest_fpath = default_manifest_fpath(source_fpath)
+    if latex_map_fpath is None:
+        latex_map_fpath = fetch_latex_map()
+    if overrides is None:
+        overrides = TEX_OVERRIDES
+
+    with open(latex_map_fpath, 'rb') as file:
+        latex_map_bytes = file.read()
+    inputs = inputs_hash(latex_map_bytes, overrides)
+
+    manifest = {}
+    if os.path.exists(manifest_fpath):
+        with open(manifest_fpath, 'r') as file:
+            manifest = json.load(file)
+        if manifest.get('format') != FORMAT_VERSION:
+            manifest = {}
+    old_tables = manifest.get('tables', {})
+    inputs_changed = manifest.get('inputs') != inputs
+
+    with open(source_fpath, 'r', encoding='utf8') as file:
+        lines = file.read().split('\n')
+
+    utf_to_latex = None
+    new_tables = {}
+    changed_tables = []
+    failed = []
+    updated_rows = 0
+    for name, start, stop in _split_blocks(lines):
+        block_hash = hashlib.sha256(
+            (inputs + '\n'.join(lines[start:stop])).encode('utf8')).hexdigest()
+        old = old_tables.get(name, None)
+        if old is not None and old['hash'] == block_hash:
+            new_tables[name] = old
+            continue
+        generated = {} if old is None else dict(old['generated'])
+        block_changed = False
+        for idx in range(start, stop):
+            text = lines[idx].strip()
+            if not text.startswith('{'):
+                continue  # comment or blank line
+            row = ast.literal_eval(text.rstrip(','))
+            chr_ = row['chr']
+            stale = (inputs_changed and chr_ in generated and
+                     row.get('tex', None) == generated[chr_])
+            if 'tex' in row and not stale:
+                if generated.get(chr_, row['tex']) != row['tex']:
+                    # edited by hand since it was generated
+                    del generated[chr_]
+                continue
+            if utf_to_latex is None:
+                utf_to_latex = parse_latex_map(latex_map_bytes.decode('utf8'))
+                for key, forms in overrides.items():
+                    utf_to_latex[key] = list(forms)
+            tex_items = utf_to_latex.get(chr_, None)
+            if not tex_items:
+                failed.append((name, chr_))
+                continue
+            tex, _ = choose_tex(tex_items)
+            generated[chr_] = tex
+            if row.get('tex', None) != tex:
+                row['tex'] = tex
+                lines[idx] = render_row(row)
+                updated_rows += 1
+                block_changed = True
+        if block_changed:
+            changed_tables.append(name)
+        block_hash = hashlib.sha256(
+            (inputs + '\n'.join(lines[start:stop])).encode('utf8')).hexdigest()
+        new_tables[name] = {'hash': block_hash, 'generated': generated}
+
+    if not dry_run:
+        if changed_tables:
+            _atomic_write(source_fpath, '\n'.join(lines).encode('utf8'))
+        new_manifest = {'format': FORMAT_VERSION, 'inputs': inputs,
+                        'tables': new_tables}
+        if new_manifest != manifest:
+            os.makedirs(os.path.dirname(manifest_fpath) or '.', exist_ok=True)
+            _atomic_write(manifest_fpath, json.dumps(
+                new_manifest, indent=1, ensure_ascii=False,
+                sort_keys=True).encode('utf8'))
+    return {'changed_tables': changed_tables, 'updated_rows': updated_rows,
+            'failed': failed}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m mathutf.tablegen',
+        description='Fill in missing tex values of the symbol tables')
+    parser.add_argument('--source', default=None,
+                        help='file with the TABLES literals')
+    parser.add_argument('--latex-map', default=None,
+                        help='path to map.js (downloaded and cached if omitted)')
+    parser.add_argument('--manifest', default=None)
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 if the source would change')
+    args = parser.parse_args(argv)
+    result = regenerate(args.source, args.latex_map, args.manifest,
+                        dry_run=args.check)
+    for name, chr_ in result['failed']:
+        print(f'no tex form for {chr_!r} in {name}')
+    print('changed tables: {}'.format(', '.join(result['changed_tables']) or 'none'))
+    if args.check and result['changed_tables']:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,964 @@
+r"""
+Convert between LaTeX macros and unicode math text.
+
+:func:`to_unicode` rewrites the ``tex`` forms known to the symbol tables
+(e.g. ``\alpha``, ``\mathbb{R}``, ``_1``, ``^2``) into their unicode
+characters, and then braced script groups like ``^{2}`` or ``_{\beta\gamma}``
+whose characters all have a script form. The keys are arranged in a trie
+which is compiled into a single regular expression (shared prefixes are
+factored into nested groups, longer keys are tried first), so the text is
+converted in one linear pass by the regex engine instead of one
+``str.replace`` per macro.
+
+A key that ends in a letter only matches when it is not followed by another
+letter, so ``\in`` is converted but ``\infty`` or ``\inner`` are not mistaken
+for it.
+
+:func:`to_latex` goes the other way. Each known character is replaced by
+:meth:`str.translate` with a precomputed codepoint table, and a small regex
+post-pass merges runs of sub/superscripts into ``_{...}`` / ``^{...}`` and
+inserts a space after control words that are followed by a letter.
+
+:func:`to_subscript`, :func:`to_superscript` and :func:`render_scripts`
+(``x_12`` to ``x₁₂``) use translate tables derived from the rows whose
+``tex`` form is ``_x`` or ``^x``. Characters without a script form are
+handled by an explicit ``errors`` policy.
+
+Example:
+    >>> from mathutf.transliterate import to_unicode
+    >>> print(to_unicode(r'\forall x \in \mathbb{R}: x^2 \geq 0'))
+    ∀ x ∈ ℝ: x² ≥ 0
+    >>> print(to_unicode(r'\alpha_1 + \beta_2 \neq \inner'))
+    α₁ + β₂ ≠ \inner
+    >>> from mathutf.transliterate import to_latex
+    >>> print(to_latex('∀x ∈ ℝ: x² ≥ 0, αβ₁₂'))
+    \forall x \in \mathbb{R}: x^2 \geq 0, \alpha\beta_{12}
+"""
+import re
+import threading
+
+#: Number of characters read per chunk by the streaming functions
+CHUNK_SIZE = 1 << 16
+
+
+def _is_letter(char):
+    return ('a' <= char <= 'z') or ('A' <= char <= 'Z')
+
+
+def _trie_regex(keys):
+    r"""
+    Build a regex that matches exactly the given keys, preferring the longest.
+
+    Args:
+        keys (Iterable[str]): literal strings
+
+    Returns:
+        str: the pattern
+
+    Example:
+        >>> from mathutf.transliterate import _trie_regex
+        >>> print(_trie_regex(['\\in', '\\infty', '_1']))
+        (?:\\in(?:fty(?![A-Za-z])|(?![A-Za-z]))|_1)
+    """
+    trie = {}
+    end = ''  # marker key, can never collide with a single character
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[end] = key
+
+    def _emit(node):
+        branches = []
+        for char in sorted(k for k in node if k != end):
+            child = node[char]
+            # Collapse chains of single-child nodes into one literal
+            literal = char
+            while len(child) == 1 and end not in child:
+                (char, child), = child.items()
+                literal += char
+            branches.append(re.escape(literal) + _emit(child))
+        if end in node:
+            key = node[end]
+            branches.append('(?![A-Za-z])' if _is_letter(key[-1]) else '')
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return _emit(trie)
+
+
+class Transliterator:
+    r"""
+    Replace every occurrence of a set of keys with their values in one pass.
+
+    Args:
+        mapping (Dict[str, str]): key to replacement
+
+    Example:
+        >>> from mathutf.transliterate import Transliterator
+        >>> trans = Transliterator({'\\to': '→', '\\top': '⊤'})
+        >>> print(trans.convert('a \\to b, \\top, \\today'))
+        a → b, ⊤, \today
+    """
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        self.max_key_len = max(map(len, self.mapping), default=0)
+        if self.mapping:
+            self.pattern = re.compile(_trie_regex(self.mapping))
+        else:
+            self.pattern = None
+        self._replace = self._make_replace()
+
+    def _make_replace(self):
+        mapping = self.mapping
+
+        def _replace(match):
+            return mapping[match.group()]
+        return _replace
+
+    def convert(self, text):
+        """
+        Args:
+            text (str): input text
+
+        Returns:
+            str: the converted text
+        """
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._replace, text)
+
+    def convert_partial(self, text):
+        """
+        Convert the part of a text that cannot change if more text is
+        appended to it.
+
+        Args:
+            text (str): the text seen so far (not yet converted)
+
+        Returns:
+            Tuple[str, str]: the converted head and the unconverted tail,
+            which should be prefixed to the next piece of input
+        """
+        holdback = self.max_key_len + 1
+        if len(text) <= holdback:
+            return '', text
+        # Any match that starts before cut ends (including its lookahead)
+        # inside of text, so it is final.
+        cut = len(text) - holdback
+        parts = []
+        pos = 0
+        if self.pattern is not None:
+            mapping = self.mapping
+            for match in self.pattern.finditer(text):
+                start = match.start()
+                if start >= cut:
+                    break
+                parts.append(text[pos:start])
+                parts.append(mapping[match.group()])
+                pos = match.end()
+        if pos < cut:
+            parts.append(text[pos:cut])
+            pos = cut
+        return ''.join(parts), text[pos:]
+
+    def iter_convert(self, file, chunk_size=CHUNK_SIZE):
+        """
+        Convert a text stream chunk by chunk.
+
+        Only a bounded tail (the longest key plus one character of lookahead)
+        is held back between chunks, so memory use does not depend on the
+        size of the input.
+
+        Args:
+            file (io.TextIOBase | Iterable[str]): an object with a
+                ``read(size)`` method returning ``str``, or an iterable of
+                strings (e.g. lines)
+            chunk_size (int): number of characters to read at a time
+
+        Yields:
+            str: converted text. Joining the pieces gives the same result as
+            :meth:`convert` on the whole input.
+        """
+        return _iter_convert(self, file, chunk_size)
+
+
+#: Longer braced script groups are left as they are by :func:`to_unicode`,
+#: which bounds the text held back while streaming
+MAX_SCRIPT_GROUP = 32
+
+# A script mark and a braced group of converted text
+_SCRIPT_GROUP_PAT = re.compile(
+    r'([_^])\{([^{}]{1,%d})\}' % MAX_SCRIPT_GROUP)
+# Separates converted text waiting for the script group pass from the
+# unconverted text in the tail of UnicodeTransliterator.convert_partial. A
+# unicode noncharacter, like the markers of LatexTransliterator.
+_GROUPS_PENDING = '\ufdd6'
+
+
+class UnicodeTransliterator(Transliterator):
+    r"""
+    A :class:`Transliterator` that also writes braced sub/superscript groups
+    (``_{...}`` and ``^{...}``) with unicode script characters, after their
+    contents were converted.
+
+    A group is only rewritten if every character in it has a script form,
+    otherwise its markup is kept. Spaces in a group are dropped, as LaTeX
+    does in math mode. When streaming, up to ``MAX_SCRIPT_GROUP + 3``
+    converted characters are held back as well, until any group in them is
+    complete.
+
+    Args:
+        mapping (Dict[str, str]): key to replacement
+        subscript (ScriptTranslator): converts the ``_{...}`` groups
+        superscript (ScriptTranslator): converts the ``^{...}`` groups
+
+    Example:
+        >>> from mathutf.transliterate import (
+        >>>     ScriptTranslator, UnicodeTransliterator)
+        >>> trans = UnicodeTransliterator(
+        >>>     {'\beta': 'β', '_1': '₁'},
+        >>>     ScriptTranslator({'β': 'ᵦ', '1': '₁', '2': '₂'}),
+        >>>     ScriptTranslator({'2': '²'}))
+        >>> print(trans.convert('x_1 + y_{\beta 12}^{2} + z^{n}'))
+        x₁ + yᵦ₁₂² + z^{n}
+    """
+
+    def __init__(self, mapping, subscript, superscript):
+        super().__init__(mapping)
+        self.subscript = subscript
+        self.superscript = superscript
+
+    def _render_group(self, match):
+        mark, script = match.groups()
+        script = script.replace(' ', '')
+        translator = self.subscript if mark == '_' else self.superscript
+        if not script or translator.find_unrepresentable(script) is not None:
+            return match.group()
+        return translator.convert(script, errors='keep')
+
+    def convert(self, text):
+        pending = ''
+        if _GROUPS_PENDING in text:
+            pending, text = text.split(_GROUPS_PENDING, 1)
+        text = pending + super().convert(text)
+        if '{' not in text:
+            return text
+        return _SCRIPT_GROUP_PAT.sub(self._render_group, text)
+
+    def convert_partial(self, text):
+        r"""
+        Convert the part of a text that cannot change if more text is
+        appended to it.
+
+        Args:
+            text (str): the text seen so far (not yet converted)
+
+        Returns:
+            Tuple[str, str]: the converted head and the tail, which should be
+            prefixed to the next piece of input. Converted text that may
+            still be part of a script group is kept in the tail, in front of
+            a marker.
+
+        Example:
+            >>> from mathutf.transliterate import (
+            >>>     ScriptTranslator, UnicodeTransliterator)
+            >>> trans = UnicodeTransliterator(
+            >>>     {'\beta': 'β'}, ScriptTranslator({'β': 'ᵦ'}),
+            >>>     ScriptTranslator({'2': '²'}))
+            >>> head, tail = trans.convert_partial('x' * 40 + '_{\beta')
+            >>> print(head + trans.convert(tail + '}'))
+            xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxᵦ
+        """
+        pending = ''
+        if _GROUPS_PENDING in text:
+            pending, text = text.split(_GROUPS_PENDING, 1)
+        head, tail = super().convert_partial(text)
+        # Groups are found in the converted text. A group is at most
+        # ``MAX_SCRIPT_GROUP + 3`` characters long, so one that starts
+        # before the last that many characters is complete.
+        pending += head
+        cut = len(pending) - (MAX_SCRIPT_GROUP + 3)
+        if cut <= 0:
+            head = ''
+        else:
+            parts = []
+            pos = 0
+            for match in _SCRIPT_GROUP_PAT.finditer(pending):
+                start = match.start()
+                if start >= cut:
+                    break
+                parts.append(pending[pos:start])
+                parts.append(self._render_group(match))
+                pos = match.end()
+            if pos < cut:
+                parts.append(pending[pos:cut])
+                pos = cut
+            head = ''.join(parts)
+            pending = pending[pos:]
+        if pending:
+            tail = pending + _GROUPS_PENDING + tail
+        return head, tail
+
+
+def _iter_chunks(file, chunk_size):
+    if hasattr(file, 'read'):
+        return iter(lambda: file.read(chunk_size), '')
+    return iter(file)
+
+
+def _iter_convert(transliterator, file, chunk_size):
+    buf = ''
+    for chunk in _iter_chunks(file, chunk_size):
+        out, buf = transliterator.convert_partial(buf + chunk)
+        if out:
+            yield out
+    if buf:
+        yield transliterator.convert(buf)
+
+
+# Markers used between the translate step and the post-pass of
+# LatexTransliterator. These are unicode noncharacters, which are reserved for
+# internal use and never appear in interchanged text.
+_SUB_OPEN = '\ufdd0'
+_SUP_OPEN = '\ufdd1'
+_SCRIPT_CLOSE = '\ufdd2'
+_WORD_END = '\ufdd3'
+# Starts the unconverted tail of LatexTransliterator.convert_partial when a
+# script group was opened in the converted head but not yet closed
+_OPEN_RUNS = {'\ufdd4': '_', '\ufdd5': '^'}
+_OPEN_RUN_MARKERS = {mark: marker for marker, mark in _OPEN_RUNS.items()}
+
+_SCRIPT_RUN_PAT = re.compile(
+    '(?:{0}[^{2}]*{2})+|(?:{1}[^{2}]*{2})+'.format(
+        _SUB_OPEN, _SUP_OPEN, _SCRIPT_CLOSE))
+_SCRIPT_ITEM_PAT = re.compile('[{}{}]([^{}]*){}'.format(
+    _SUB_OPEN, _SUP_OPEN, _SCRIPT_CLOSE, _SCRIPT_CLOSE))
+_WORD_SPACE_PAT = re.compile(_WORD_END + '(?=[A-Za-z])')
+
+
+def _merge_script_run(match):
+    run = match.group()
+    items = _SCRIPT_ITEM_PAT.findall(run)
+    mark = '_' if run[0] == _SUB_OPEN else '^'
+    if len(items) == 1:
+        return mark + items[0]
+    return mark + '{' + ''.join(items) + '}'
+
+
+def _resolve_word_ends(text):
+    if _WORD_END in text:
+        text = _WORD_SPACE_PAT.sub(' ', text).replace(_WORD_END, '')
+    return text
+
+
+class LatexTransliterator:
+    r"""
+    Replace characters with LaTeX forms using a precomputed translate table.
+
+    Args:
+        mapping (Dict[str, str]): character to tex. Values of the form ``_x``
+            or ``^x`` are treated as sub/superscripts and runs of them are
+            grouped.
+
+    Example:
+        >>> from mathutf.transliterate import LatexTransliterator
+        >>> trans = LatexTransliterator({'α': '\\alpha', '₁': '_1', '₂': '_2'})
+        >>> print(trans.convert('αx₁ + α₁₂'))
+        \alpha x_1 + \alpha_{12}
+    """
+
+    def __init__(self, mapping):
+        self.mapping = dict(mapping)
+        table = {}
+        sensitive = []
+        script_marks = {}
+        for chr_, tex in self.mapping.items():
+            if len(tex) > 1 and tex[0] in '_^':
+                inner = tex[1:]
+                if inner.startswith('{') and inner.endswith('}'):
+                    inner = inner[1:-1]
+                if _is_letter(inner[-1]) and inner[0] == '\\':
+                    inner += _WORD_END
+                opener = _SUB_OPEN if tex[0] == '_' else _SUP_OPEN
+                table[ord(chr_)] = opener + inner + _SCRIPT_CLOSE
+                script_marks[chr_] = tex[0]
+                sensitive.append(chr_)
+            elif tex[0] == '\\' and _is_letter(tex[-1]):
+                table[ord(chr_)] = tex + _WORD_END
+                sensitive.append(chr_)
+            else:
+                table[ord(chr_)] = tex
+        self.table = table
+        # A chunk can only be finalized after a character that does not
+        # depend on what follows it.
+        self._sensitive = frozenset(sensitive)
+        self._script_marks = script_marks
+
+    def convert(self, text):
+        """
+        Args:
+            text (str): input text
+
+        Returns:
+            str: the converted text
+        """
+        if text[:1] in _OPEN_RUNS:
+            end = self._run_end(text, _OPEN_RUNS[text[0]], 1)
+            return self._script_items(text[1:end]) + '}' + self.convert(
+                text[end:])
+        text = text.translate(self.table)
+        if _SUB_OPEN in text or _SUP_OPEN in text:
+            text = _SCRIPT_RUN_PAT.sub(_merge_script_run, text)
+        return _resolve_word_ends(text)
+
+    def _run_end(self, text, mark, start):
+        """
+        Index after the run of ``mark`` scripts that begins at ``start``.
+        """
+        script_marks = self._script_marks
+        end = start
+        while end < len(text) and script_marks.get(text[end], None) == mark:
+            end += 1
+        return end
+
+    def _script_items(self, chars, follow=''):
+        """
+        The grouped tex of a run of script characters, where ``follow`` is
+        the text that comes after the last one.
+        """
+        table = self.table
+        items = ''.join([table[ord(c)][1:-1] for c in chars])
+        text = _resolve_word_ends(items + follow)
+        return text[:len(text) - len(follow)]
+
+    def _open_run(self, mark, chars):
+        """
+        Convert all but the last character of a script run whose group is
+        already known to need braces, and keep that group open.
+        """
+        last = self.table[ord(chars[-1])][1:-1]
+        head = self._script_items(chars[:-1], follow=last[0])
+        return head, _OPEN_RUN_MARKERS[mark] + chars[-1]
+
+    def convert_partial(self, text):
+        """
+        Convert the part of a text that cannot change if more text is
+        appended to it.
+
+        Args:
+            text (str): the text seen so far (not yet converted)
+
+        Returns:
+            Tuple[str, str]: the converted head and the unconverted tail,
+            which should be prefixed to the next piece of input. The tail
+            holds at most one input character.
+
+        Example:
+            >>> from mathutf.transliterate import LatexTransliterator
+            >>> trans = LatexTransliterator({'α': '\\alpha', '₁': '_1'})
+            >>> head, tail = trans.convert_partial('α₁₁₁')
+            >>> print(head)
+            \alpha_{11
+            >>> print(head + trans.convert(tail + '₁ x'))
+            \alpha_{1111} x
+        """
+        head = ''
+        if text[:1] in _OPEN_RUNS:
+            mark = _OPEN_RUNS[text[0]]
+            end = self._run_end(text, mark, 1)
+            if end == len(text):
+                if end == 1:
+                    return '', text
+                return self._open_run(mark, text[1:])
+            head = self._script_items(text[1:end]) + '}'
+            text = text[end:]
+        if not text:
+            return head, text
+        mark = self._script_marks.get(text[-1], None)
+        if mark is None:
+            cut = len(text)
+            if text[-1] in self._sensitive:
+                cut -= 1
+            return head + self.convert(text[:cut]), text[cut:]
+        start = len(text) - 1
+        while start and self._script_marks.get(text[start - 1], None) == mark:
+            start -= 1
+        head += self.convert(text[:start])
+        if start == len(text) - 1:
+            # a single script is only braced if another one follows
+            return head, text[start:]
+        items, tail = self._open_run(mark, text[start:])
+        return head + mark + '{' + items, tail
+
+    def iter_convert(self, file, chunk_size=CHUNK_SIZE):
+        """
+        Convert a text stream chunk by chunk.
+
+        A trailing character whose output depends on the next one (a
+        sub/superscript or a control word) is held back until more input
+        arrives. The group of a long run of sub/superscripts is written as
+        the run is read and closed when it ends.
+
+        Args:
+            file (io.TextIOBase | Iterable[str]): an object with a
+                ``read(size)`` method returning ``str``, or an iterable of
+                strings (e.g. lines)
+            chunk_size (int): number of characters to read at a time
+
+        Yields:
+            str: converted text. Joining the pieces gives the same result as
+            :meth:`convert` on the whole input.
+        """
+        return _iter_convert(self, file, chunk_size)
+
+
+def tex_to_unicode_map():
+    r"""
+    The mapping from ``tex`` forms to characters in the symbol tables.
+
+    When several rows share a tex form the first one wins. Forms that are
+    identical to their character (e.g. ``<``) are left out.
+
+    Returns:
+        Dict[str, str]
+
+    Example:
+        >>> from mathutf.transliterate import tex_to_unicode_map
+        >>> mapping = tex_to_unicode_map()
+        >>> mapping['\\mathbb{R}'], mapping['^2'], mapping['_\\beta']
+        ('ℝ', '²', 'ᵦ')
+    """
+    from mathutf.symbols import STORE
+    mapping = {}
+    codepoints = STORE.codepoints
+    for rowid, tex in enumerate(STORE.tex):
+        chr_ = chr(codepoints[rowid])
+        if tex and tex != chr_ and tex not in mapping:
+            mapping[tex] = chr_
+    return mapping
+
+
+def unicode_to_tex_map():
+    r"""
+    The mapping from characters to their ``tex`` forms in the symbol tables.
+
+    When a character appears in several rows the first one wins.
+
+    Returns:
+        Dict[str, str]
+
+    Example:
+        >>> from mathutf.transliterate import unicode_to_tex_map
+        >>> mapping = unicode_to_tex_map()
+        >>> mapping['ℝ'], mapping['²'], mapping['ᵦ']
+        ('\\mathbb{R}', '^2', '_\\beta')
+    """
+    from mathutf.symbols import STORE
+    mapping = {}
+    codepoints = STORE.codepoints
+    for rowid, tex in enumerate(STORE.tex):
+        chr_ = chr(codepoints[rowid])
+        if tex and tex != chr_ and chr_ not in mapping:
+            mapping[chr_] = tex
+    return mapping
+
+
+_DEFAULT = {}
+# reentrant, a factory may ask for another cached transliterator
+_DEFAULT_LOCK = threading.RLock()
+
+
+def _default_transliterator(name, factory):
+    """
+    Return a cached transliterator, rebuilding it when the symbol tables
+    change.
+    """
+    from mathutf.symbols import STORE
+    version = STORE.version
+    cached = _DEFAULT.get(name, None)
+    if cached is None or cached[0] != version:
+        with _DEFAULT_LOCK:
+            cached = _DEFAULT.get(name, None)
+            if cached is None or cached[0] != version:
+                cached = _DEFAULT[name] = (version, factory())
+    return cached[1]
+
+
+def _unicode_transliterator():
+    return _default_transliterator(
+        'to_unicode', lambda: UnicodeTransliterator(
+            tex_to_unicode_map(), _subscript_translator(),
+            _superscript_translator()))
+
+
+def to_unicode(text):
+    r"""
+    Replace the LaTeX forms of known symbols with unicode characters.
+
+    Args:
+        text (str): text containing LaTeX macros
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.transliterate import to_unicode
+        >>> print(to_unicode(r'\sum_i x_i \rightarrow \infty'))
+        ∑ᵢ xᵢ → ∞
+        >>> print(to_unicode(r'\mathbb{R}^{2}, a_{\beta\gamma}, e^{i(n-1)}'))
+        ℝ², aᵦᵧ, eⁱ⁽ⁿ⁻¹⁾
+    """
+    return _unicode_transliterator().convert(text)
+
+
+def iter_to_unicode(file, chunk_size=CHUNK_SIZE):
+    r"""
+    Streaming version of :func:`to_unicode` with bounded memory use.
+
+    Args:
+        file (io.TextIOBase | Iterable[str]): a text stream or an iterable of
+            strings
+        chunk_size (int): number of characters to read at a time
+
+    Yields:
+        str: pieces of converted text
+
+    Example:
+        >>> import io
+        >>> from mathutf.transliterate import iter_to_unicode
+        >>> file = io.StringIO(r'\alpha \leq \beta' * 3)
+        >>> print(''.join(iter_to_unicode(file, chunk_size=4)))
+        α ≤ βα ≤ βα ≤ β
+    """
+    return _unicode_transliterator().iter_convert(file, chunk_size=chunk_size)
+
+
+def _latex_transliterator():
+    return _default_transliterator(
+        'to_latex', lambda: LatexTransliterator(unicode_to_tex_map()))
+
+
+def to_latex(text):
+    r"""
+    Replace known unicode math characters with their LaTeX forms.
+
+    Runs of subscripts or superscripts are grouped and a space is inserted
+    after a control word when it is followed by a letter.
+
+    Args:
+        text (str): unicode text
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.transliterate import to_latex
+        >>> print(to_latex('∑ᵢ xᵢ² → ∞, eⁱᵗ, ℕ⊂ℝ'))
+        \sum_i x_i^2 \rightarrow \infty, e^{it}, \mathbb{N}\subset\mathbb{R}
+    """
+    return _latex_transliterator().convert(text)
+
+
+def iter_to_latex(file, chunk_size=CHUNK_SIZE):
+    r"""
+    Streaming version of :func:`to_latex` with bounded memory use.
+
+    Args:
+        file (io.TextIOBase | Iterable[str]): a text stream or an iterable of
+            strings
+        chunk_size (int): number of characters to read at a time
+
+    Yields:
+        str: pieces of converted text
+
+    Example:
+        >>> import io
+        >>> from mathutf.transliterate import iter_to_latex
+        >>> file = io.StringIO('x₁₂ ≤ αy' * 2)
+        >>> print(''.join(iter_to_latex(file, chunk_size=2)))
+        x_{12} \leq \alpha yx_{12} \leq \alpha y
+    """
+    return _latex_transliterator().iter_convert(file, chunk_size=chunk_size)
+
+
+#: Fallback policies for characters without a sub/superscript form
+SCRIPT_ERRORS = ('strict', 'keep', 'ignore')
+
+
+def script_map(kind):
+    r"""
+    The mapping from characters to their subscript or superscript form.
+
+    It is derived from the rows whose ``tex`` form is ``_x`` or ``^x``. When
+    ``x`` is a macro (e.g. ``_\beta``) the character of that macro is used.
+    Latin letters that have no such row use the unicode modifier letters
+    (e.g. ``MODIFIER LETTER SMALL K``) and subscript letters (e.g. ``LATIN
+    SUBSCRIPT SMALL LETTER K``), where unicode has them.
+
+    Args:
+        kind (str): ``'subscript'`` or ``'superscript'``
+
+    Returns:
+        Dict[str, str]
+
+    Example:
+        >>> from mathutf.transliterate import script_map
+        >>> mapping = script_map('subscript')
+        >>> mapping['1'], mapping['+'], mapping['β']
+        ('₁', '₊', 'ᵦ')
+        >>> script_map('superscript')['n'], script_map('superscript')['k']
+        ('ⁿ', 'ᵏ')
+    """
+    if kind == 'subscript':
+        mark = '_'
+    elif kind == 'superscript':
+        mark = '^'
+    else:
+        raise KeyError(kind)
+    from mathutf.symbols import STORE
+    macros = tex_to_unicode_map()
+    mapping = {}
+    codepoints = STORE.codepoints
+    for rowid, tex in enumerate(STORE.tex):
+        if not tex or len(tex) < 2 or tex[0] != mark:
+            continue
+        inner = tex[1:]
+        if inner.startswith('{') and inner.endswith('}'):
+            inner = inner[1:-1]
+        if inner.startswith('\\'):
+            inner = macros.get(inner, inner)
+        if len(inner) == 1 and inner not in mapping:
+            mapping[inner] = chr(codepoints[rowid])
+    for char, script in _SCRIPT_LETTER_NAMES[kind]():
+        mapping.setdefault(char, script)
+    return mapping
+
+
+def _script_letters(templates):
+    """
+    Find the unicode script forms of the latin letters.
+
+    Args:
+        templates (List[Tuple[str, Callable]]): a unicode name template with
+            a ``{}`` for the capital letter, and the function that turns the
+            capital letter into the character it is a script form of
+
+    Returns:
+        List[Tuple[str, str]]: letter and script form pairs
+    """
+    import string
+    import unicodedata
+    found = []
+    for template, case in templates:
+        for letter in string.ascii_uppercase:
+            try:
+                script = unicodedata.lookup(template.format(letter))
+            except KeyError:
+                continue
+            found.append((case(letter), script))
+    return found
+
+
+_SCRIPT_LETTER_NAMES = {
+    'subscript': lambda: _script_letters([
+        ('LATIN SUBSCRIPT SMALL LETTER {}', str.lower),
+    ]),
+    'superscript': lambda: _script_letters([
+        ('SUPERSCRIPT LATIN SMALL LETTER {}', str.lower),
+        ('MODIFIER LETTER SMALL {}', str.lower),
+        ('MODIFIER LETTER CAPITAL {}', str),
+    ]),
+}
+
+
+class ScriptTranslator:
+    """
+    Convert text to subscripts or superscripts with a precomputed translate
+    table.
+
+    Characters that already are in the target form are passed through.
+
+    Args:
+        mapping (Dict[str, str]): character to its script form
+        kind (str): used in error messages
+
+    Example:
+        >>> from mathutf.transliterate import ScriptTranslator
+        >>> trans = ScriptTranslator({'1': '₁', '2': '₂', 'i': 'ᵢ'})
+        >>> print(trans.convert('i12₁'))
+        ᵢ₁₂₁
+        >>> print(trans.convert('i+1', errors='keep'))
+        ᵢ+₁
+        >>> print(trans.convert('i+1', errors='ignore'))
+        ᵢ₁
+        >>> trans.convert('i+1')
+        Traceback (most recent call last):
+        ValueError: '+' at position 1 has no script form
+    """
+
+    def __init__(self, mapping, kind='script'):
+        self.mapping = dict(mapping)
+        self.kind = kind
+        self.table = str.maketrans(self.mapping)
+        representable = set(self.mapping) | set(self.mapping.values())
+        # Matches the first character that cannot be converted, so checking
+        # and dropping them also runs in the regex engine
+        self._unrepresentable = re.compile(
+            '[^' + ''.join(map(re.escape, sorted(representable))) + ']')
+
+    def find_unrepresentable(self, text):
+        """
+        Args:
+            text (str): input text
+
+        Returns:
+            re.Match | None: the first character that has no script form
+        """
+        return self._unrepresentable.search(text)
+
+    def convert(self, text, errors='strict'):
+        """
+        Args:
+            text (str): input text
+
+            errors (str): what to do with characters that have no script
+                form. ``'strict'`` raises a ValueError, ``'keep'`` leaves
+                them unchanged and ``'ignore'`` drops them.
+
+        Returns:
+            str: the converted text
+        """
+        if errors == 'strict':
+            match = self._unrepresentable.search(text)
+            if match is not None:
+                raise ValueError(
+                    f'{match.group()!r} at position {match.start()} has no '
+                    f'{self.kind} form')
+        elif errors == 'ignore':
+            text = self._unrepresentable.sub('', text)
+        elif errors != 'keep':
+            raise ValueError(
+                f'errors must be one of {SCRIPT_ERRORS}, got {errors!r}')
+        return text.translate(self.table)
+
+
+def _subscript_translator():
+    return _default_transliterator(
+        'subscript', lambda: ScriptTranslator(script_map('subscript'),
+                                              'subscript'))
+
+
+def _superscript_translator():
+    return _default_transliterator(
+        'superscript', lambda: ScriptTranslator(script_map('superscript'),
+                                                'superscript'))
+
+
+def to_subscript(text, errors='strict'):
+    """
+    Write a text with unicode subscript characters.
+
+    Args:
+        text (str): e.g. ``'i+1'``
+        errors (str): ``'strict'``, ``'keep'`` or ``'ignore'``, see
+            :meth:`ScriptTranslator.convert`
+
+    Returns:
+        str
+
+    Raises:
+        ValueError: if a character has no subscript form and errors is
+            ``'strict'``
+
+    Example:
+        >>> from mathutf.transliterate import to_subscript
+        >>> print('x' + to_subscript('i+1') + ', a' + to_subscript('(n-1)'))
+        xᵢ₊₁, a₍ₙ₋₁₎
+        >>> print('x' + to_subscript('ib', errors='keep'))
+        xᵢb
+    """
+    return _subscript_translator().convert(text, errors=errors)
+
+
+def to_superscript(text, errors='strict'):
+    """
+    Write a text with unicode superscript characters.
+
+    Args:
+        text (str): e.g. ``'n+1'``
+        errors (str): ``'strict'``, ``'keep'`` or ``'ignore'``, see
+            :meth:`ScriptTranslator.convert`
+
+    Returns:
+        str
+
+    Raises:
+        ValueError: if a character has no superscript form and errors is
+            ``'strict'``
+
+    Example:
+        >>> from mathutf.transliterate import to_superscript
+        >>> print('10' + to_superscript('-12') + ', e' + to_superscript('it'))
+        10⁻¹², eⁱᵗ
+        >>> to_superscript('k!')
+        Traceback (most recent call last):
+        ValueError: '!' at position 1 has no superscript form
+    """
+    return _superscript_translator().convert(text, errors=errors)
+
+
+# A script mark followed by a braced group, a run of digits or one character
+_SCRIPT_MARKUP_PAT = re.compile(r'([_^])(?:\{([^{}]*)\}|([0-9]+|[^\s{}\\]))')
+
+
+def render_scripts(text, errors='keep'):
+    r"""
+    Replace ``_x`` / ``^x`` markup with unicode sub/superscript characters.
+
+    The script is a braced group (``n^{k+1}``), a run of digits (``x_12``)
+    or a single character (``x_i``). Each script is converted with a
+    precomputed translate table, so labels can be formatted in bulk.
+
+    Args:
+        text (str): text with script markup
+
+        errors (str): what to do with a script that contains characters
+            without a script form. ``'keep'`` leaves its markup unchanged,
+            ``'ignore'`` drops those characters and ``'strict'`` raises a
+            ValueError.
+
+    Returns:
+        str
+
+    Example:
+        >>> from mathutf.transliterate import render_scripts
+        >>> print(render_scripts('x_12 + n^{k+1} - e^{i(n-1)}'))
+        x₁₂ + nᵏ⁺¹ - eⁱ⁽ⁿ⁻¹⁾
+        >>> print(render_scripts('a_{n+1} = a_n^2, x^{b!}', errors='keep'))
+        aₙ₊₁ = aₙ², x^{b!}
+        >>> print(render_scripts('a_{n+1} = a_n^2, x^{b!}', errors='ignore'))
+        aₙ₊₁ = aₙ², xᵇ
+        >>> render_scripts('n^{k!}', errors='strict')
+        Traceback (most recent call last):
+        ValueError: '!' at position 1 has no superscript form
+    """
+    if errors not in SCRIPT_ERRORS:
+        raise ValueError(
+            f'errors must be one of {SCRIPT_ERRORS}, got {errors!r}')
+    if '_' not in text and '^' not in text:
+        return text
+    sub = _subscript_translator()
+    sup = _superscript_translator()
+    keep = errors == 'keep'
+
+    def _render(match):
+        mark, braced, bare = match.groups()
+        script = bare if braced is None else braced
+        translator = sub if mark == '_' else sup
+        if keep and translator.find_unrepresentable(script) is not None:
+            return match.group()
+        return translator.convert(script, errors=errors)
+    return _SCRIPT_MARKUP_PAT.sub(_render, text)
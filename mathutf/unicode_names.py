@@ -0,0 +1,325 @@
+"""
+A prefix index over the names of every unicode character, built once and
+cached on disk.
+
+The index is a file holding the normalized names (``GREEK CAPITAL LETTER
+THETA`` becomes ``greek_capital_letter_theta``) in sorted order together with
+their codepoints. It is opened with :mod:`mmap`, so loading it is
+effectively free, and a prefix query is a binary search over the mapped
+bytes. This gives the same lookups as a trie keyed on underscore separated
+segments without holding ~150k Python objects in memory.
+
+File layout (all integers are native-endian ``uint32``)::
+
+    header      : magic, format version, count, blob size, unidata version
+    codepoints  : count entries, in name order
+    offsets     : count + 1 entries into the blob
+    blob        : the ASCII names concatenated in sorted order
+
+The cache file name includes :data:`FORMAT_VERSION` and
+:data:`unicodedata.unidata_version`, so a new Python (with a new unicode
+database) transparently builds a new file.
+
+Example:
+    >>> import tempfile
+    >>> from mathutf.unicode_names import UnicodeNameIndex
+    >>> dpath = tempfile.mkdtemp()
+    >>> index = UnicodeNameIndex.load_or_build(dpath=dpath)
+    >>> [chr_ for key, chr_ in index.prefix_items('greek_capital_letter_th')]
+    ['Θ']
+    >>> index.get('infinity')
+    '∞'
+    >>> index.close()
+"""
+import os
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+
+#: Bump this when the on-disk layout changes
+FORMAT_VERSION = 1
+
+_MAGIC = b'MUTFNAME'
+_HEADER = struct.Struct('=8sIII16s')
+
+#: Half-open codepoint ranges that can contain named characters. This skips
+#: surrogates, private use areas, and the unassigned planes 4 - 13, which is
+#: most of the codepoint space.
+ASSIGNED_RANGES = [
+    (0x00000, 0x0D800),  # BMP up to the surrogates
+    (0x0F900, 0x10000),  # BMP after the private use area
+    (0x10000, 0x40000),  # planes 1 - 3 (SMP, SIP, TIP)
+    (0xE0000, 0xE1000),  # plane 14 (tags and variation selectors)
+]
+
+
+def normalize_name(utf_name):
+    """
+    Convert a unicode name (or a user query) to the key format used by the
+    index.
+
+    Args:
+        utf_name (str): e.g. ``GREEK CAPITAL LETTER THETA``
+
+    Returns:
+        str: e.g. ``greek_capital_letter_theta``
+
+    Example:
+        >>> from mathutf.unicode_names import normalize_name
+        >>> normalize_name('LESS-THAN OR EQUAL TO')
+        'less_than_or_equal_to'
+    """
+    return utf_name.replace('-', '_').replace(' ', '_').lower()
+
+
+def iter_named_codepoints(start=None, stop=None):
+    """
+    Yield every named codepoint in :data:`ASSIGNED_RANGES` (optionally
+    clipped to ``[start, stop)``).
+
+    Args:
+        start (int | None): the first codepoint to consider
+        stop (int | None): one past the last codepoint to consider
+
+    Yields:
+        Tuple[int, str]: the codepoint and its unicode name
+    """
+    name = unicodedata.name
+    for lo, hi in ASSIGNED_RANGES:
+        if start is not None:
+            lo = max(lo, start)
+        if stop is not None:
+            hi = min(hi, stop)
+        for codepoint in range(lo, hi):
+            utf_name = name(chr(codepoint), None)
+            if utf_name is not None:
+                yield codepoint, utf_name
+
+
+def cache_dpath():
+    """
+    The directory used to cache generated data.
+
+    This follows the same conventions as ``ubelt.Path.appdir(type='cache')``
+    without importing ubelt, and can be overridden with the
+    ``MATHUTF_CACHE_DIR`` environment variable.
+
+    Returns:
+        str
+    """
+    dpath = os.environ.get('MATHUTF_CACHE_DIR', None)
+    if dpath:
+        return dpath
+    if sys.platform.startswith('win32'):
+        root = os.environ.get('LOCALAPPDATA', os.path.expanduser('~/AppData/Local'))
+    elif sys.platform.startswith('darwin'):
+        root = os.path.expanduser('~/Library/Caches')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(root, 'mathutf')
+
+
+def default_fpath(dpath=None):
+    """
+    Args:
+        dpath (str | None): the cache directory, defaults to :func:`cache_dpath`
+
+    Returns:
+        str: where the index for this python's unicode database is cached
+    """
+    if dpath is None:
+        dpath = cache_dpath()
+    fname = 'unicode_names_v{}_{}.bin'.format(
+        FORMAT_VERSION, unicodedata.unidata_version)
+    return os.path.join(dpath, fname)
+
+
+def write_index(fpath, items):
+    """
+    Write an index file atomically.
+
+    Args:
+        fpath (str): the destination
+        items (Iterable[Tuple[int, str]]): codepoints and unicode names
+    """
+    pairs = sorted((normalize_name(utf_name).encode('ascii'), codepoint)
+                   for codepoint, utf_name in items)
+    codepoints = array('I', [codepoint for _, codepoint in pairs])
+    offsets = array('I', [0])
+    total = 0
+    for key, _ in pairs:
+        total += len(key)
+        offsets.append(total)
+    blob = b''.join(key for key, _ in pairs)
+    header = _HEADER.pack(
+        _MAGIC, FORMAT_VERSION, len(pairs), len(blob),
+        unicodedata.unidata_version.encode('ascii'))
+
+    dpath = os.path.dirname(fpath)
+    if dpath:
+        os.makedirs(dpath, exist_ok=True)
+    tmp_fpath = '{}.tmp.{}'.format(fpath, os.getpid())
+    with open(tmp_fpath, 'wb') as file:
+        file.write(header)
+        file.write(codepoints.tobytes())
+        file.write(offsets.tobytes())
+        file.write(blob)
+    os.replace(tmp_fpath, fpath)
+
+
+class UnicodeNameIndex:
+    """
+    A read-only, memory-mapped, sorted name index over all of unicode.
+
+    Args:
+        fpath (str): path to a file written by :func:`write_index`
+    """
+
+    def __init__(self, fpath):
+        import mmap
+        self.fpath = fpath
+        with open(fpath, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, blob_size, unidata = _HEADER.unpack_from(self._mmap)
+            if magic != _MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{fpath} is not a v{FORMAT_VERSION} unicode name index')
+            size = _HEADER.size + 4 * count + 4 * (count + 1) + blob_size
+            if len(self._mmap) != size:
+                raise ValueError(f'{fpath} is truncated or corrupt')
+            self.unidata_version = unidata.rstrip(b'\0').decode('ascii')
+            view = memoryview(self._mmap)
+            pos = _HEADER.size
+            self._codepoints = view[pos:pos + 4 * count].cast('I')
+            pos += 4 * count
+            self._offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+            pos += 4 * (count + 1)
+            self._blob_start = pos
+            self._count = count
+            view.release()
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def build(cls, fpath=None, dpath=None):
+        """
+        Scan the unicode database, write the index, and open it.
+
+        Args:
+            fpath (str | None): destination, defaults to :func:`default_fpath`
+            dpath (str | None): cache directory used when fpath is not given
+
+        Returns:
+            UnicodeNameIndex
+        """
+        if fpath is None:
+            fpath = default_fpath(dpath)
+        write_index(fpath, iter_named_codepoints())
+        return cls(fpath)
+
+    @classmethod
+    def load_or_build(cls, fpath=None, dpath=None):
+        """
+        Open the cached index, building it first if it does not exist or is
+        unreadable.
+
+        Args:
+            fpath (str | None): destination, defaults to :func:`default_fpath`
+            dpath (str | None): cache directory used when fpath is not given
+
+        Returns:
+            UnicodeNameIndex
+        """
+        if fpath is None:
+            fpath = default_fpath(dpath)
+        if os.path.exists(fpath):
+            try:
+                return cls(fpath)
+            except (ValueError, TypeError, struct.error):
+                # e.g. a file another process did not finish writing
+                pass
+        return cls.build(fpath)
+
+    def close(self):
+        for attr in ['_codepoints', '_offsets']:
+            view = self.__dict__.pop(attr, None)
+            if view is not None:
+                view.release()
+        mm = self.__dict__.pop('_mmap', None)
+        if mm is not None:
+            mm.close()
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, idx):
+        start = self._blob_start
+        return self._mmap[start + self._offsets[idx]:start + self._offsets[idx + 1]]
+
+    def _bisect(self, key):
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, key, default=None):
+        """
+        Args:
+            key (str): a normalized name (see :func:`normalize_name`)
+            default (Any): returned if the name does not exist
+
+        Returns:
+            str | Any: the character with that name
+        """
+        key = normalize_name(key).encode('ascii', 'replace')
+        idx = self._bisect(key)
+        if idx < self._count and self._key(idx) == key:
+            return chr(self._codepoints[idx])
+        return default
+
+    def prefix_items(self, prefix):
+        """
+        Iterate over every name that starts with a prefix, in sorted order.
+
+        Args:
+            prefix (str): a name prefix, a trailing ``*`` is ignored and spaces
+                and dashes are treated as underscores
+
+        Yields:
+            Tuple[str, str]: the normalized name and its character
+        """
+        prefix = normalize_name(prefix.rstrip('*')).encode('ascii', 'replace')
+        idx = self._bisect(prefix)
+        while idx < self._count:
+            key = self._key(idx)
+            if not key.startswith(prefix):
+                break
+            yield key.decode('ascii'), chr(self._codepoints[idx])
+            idx += 1
+
+
+_GLOBAL_INDEX = None
+_GLOBAL_LOCK = threading.Lock()
+
+
+def global_index():
+    """
+    The process wide index for this python's unicode database, loaded from
+    (or built into) :func:`cache_dpath` on first use.
+
+    Returns:
+        UnicodeNameIndex
+    """
+    global _GLOBAL_INDEX
+    if _GLOBAL_INDEX is None:
+        with _GLOBAL_LOCK:
+            if _GLOBAL_INDEX is None:
+                _GLOBAL_INDEX = UnicodeNameIndex.load_or_build()
+    return _GLOBAL_INDEX
@@ -0,0 +1,85 @@
+import asyncio
+import io
+
+
+def test_async_api_matches_sync_api():
+    from mathutf import aio, symbols, transliterate
+    text = r'\forall x \in \mathbb{R}: x^2 \geq 0, \alpha_1 ' * 200
+
+    async def agen(pieces):
+        for piece in pieces:
+            await asyncio.sleep(0)
+            yield piece
+
+    async def main():
+        found = await aio.search('^sub_[0-9]$')
+        assert found == list(symbols.search('^sub_[0-9]$'))
+        found = await aio.search_many(['alpha', 'beta'])
+        assert found == symbols.search_many(['alpha', 'beta'])
+        found = await aio.search_ranked('nabal', k=1)
+        assert [r.key for r in found] == ['nabla']
+
+        want = transliterate.to_unicode(text)
+        assert await aio.to_unicode(text, chunk_size=100) == want
+        pieces = [text[i:i + 7] for i in range(0, len(text), 7)]
+        got = ''.join([p async for p in aio.aiter_to_unicode(agen(pieces))])
+        assert got == want
+        got = ''.join([p async for p in aio.aiter_to_unicode(
+            io.StringIO(text), chunk_size=50)])
+        assert got == want
+
+        latex_want = transliterate.to_latex(want)
+        assert await aio.to_latex(want, chunk_size=100) == latex_want
+        got = ''.join([p async for p in aio.aiter_to_latex(
+            agen(want), budget=0)])
+        assert got == latex_want
+
+    try:
+        asyncio.run(main())
+    finally:
+        aio.shutdown()
+
+
+def test_async_stream_renders_braced_scripts():
+    from mathutf import aio, transliterate
+    text = r'\mathbb{R}^{2}, a_{\beta\gamma} + x^{n} - y_{1 2}^{k} ' * 20
+
+    async def main():
+        for chunk_size in [1, 2, 3, 7, 64]:
+            pieces = [text[i:i + chunk_size]
+                      for i in range(0, len(text), chunk_size)]
+            got = ''.join([p async for p in aio.aiter_to_unicode(
+                pieces, chunk_size=chunk_size)])
+            assert got == want, chunk_size
+
+    want = transliterate.to_unicode(text)
+    assert 'ℝ², aᵦᵧ' in want
+    try:
+        asyncio.run(main())
+    finally:
+        aio.shutdown()
+
+
+def test_large_conversion_does_not_block_the_loop():
+    from mathutf import aio
+    text = r'\alpha \leq \beta, ' * 100000
+
+    async def main():
+        beats = []
+
+        async def heartbeat():
+            while True:
+                beats.append(None)
+                await asyncio.sleep(0.001)
+
+        task = asyncio.ensure_future(heartbeat())
+        await asyncio.sleep(0)
+        result = await aio.to_unicode(text)
+        task.cancel()
+        assert result.startswith('α ≤ β, ')
+        return len(beats)
+
+    try:
+        assert asyncio.run(main()) > 1
+    finally:
+        aio.shutdown()
@@ -0,0 +1,33 @@
+"""
+Check that the benchmarks in ``benchmarks/`` still run. Timings are not
+checked here, see ``benchmarks/run.py --compare``.
+"""
+import importlib.util
+import json
+import os
+
+BENCH_DPATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                           'benchmarks')
+
+
+def _runner():
+    spec = importlib.util.spec_from_file_location(
+        'bench_run', os.path.join(BENCH_DPATH, 'run.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_quick_run_writes_comparable_results(tmp_path):
+    run = _runner()
+    names = [name for _, benches in run.discover() for name, _ in benches]
+    assert any(name.startswith('bench_import.track_') for name in names)
+    # the subprocess and whole-unicode benchmarks are too slow for a test
+    pattern = r'bench_(search|symbols|transliterate)\.time_'
+    fpath = str(tmp_path / 'results.json')
+    assert run.main(['--quick', '--filter', pattern, '--output', fpath]) == 0
+    with open(fpath) as file:
+        results = json.load(file)
+    assert results['env']['python']
+    assert 'bench_search.time_search_literal' in results['results']
+    assert run.main(['--compare', fpath, fpath]) == 0
@@ -0,0 +1,29 @@
+def test_parallel_scan_matches_serial_scan():
+    from mathutf import build
+    serial = build.scan(r'\bSUBSCRIPT\b', workers=0)
+    parallel = build.scan(r'\bSUBSCRIPT\b', workers=2)
+    assert serial == parallel
+    named, matched = serial
+    assert [cp for cp, _ in named] == sorted(cp for cp, _ in named)
+    assert len(named) > 100000
+
+
+def test_candidate_keys_follow_the_curated_style():
+    from mathutf import build, symbols
+    rows = build.build_candidates(r'^SUBSCRIPT (ONE|TWO|LEFT PARENTHESIS)$',
+                                  workers=0)
+    keys = {row['chr']: row['key'] for row in rows}
+    curated = {row['chr']: row['key'] for row in symbols.TABLES['subscripts']}
+    assert keys == {chr_: curated[chr_] for chr_ in keys}
+
+
+def test_build_writes_the_name_index(tmp_path):
+    from mathutf import build
+    from mathutf.unicode_names import UnicodeNameIndex
+    rows, fpath = build.build('ELEMENT OF', workers=0, dpath=str(tmp_path))
+    assert '∈' in [row['chr'] for row in rows]
+    index = UnicodeNameIndex(fpath)
+    try:
+        assert index.get('element_of') == '∈'
+    finally:
+        index.close()
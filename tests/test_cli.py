@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+def _run(capsys, *args):
+    from mathutf.__main__ import MathUTFCLI
+    MathUTFCLI.main(cmdline=list(args))
+    return capsys.readouterr().out
+
+
+def test_machine_formats_agree(capsys):
+    from mathutf import symbols
+    want = [r.key for r in symbols.search('arrow')]
+    rows = json.loads(_run(capsys, 'arrow', '--format', 'json'))
+    assert [row['key'] for row in rows] == want
+    lines = _run(capsys, 'arrow', '--format', 'jsonl').splitlines()
+    assert [json.loads(line) for line in lines] == rows
+    for fmt, delimiter in [('csv', ','), ('tsv', '\t')]:
+        text = _run(capsys, 'arrow', '--format', fmt)
+        table = list(csv.DictReader(io.StringIO(text), delimiter=delimiter))
+        assert [row['key'] for row in table] == want
+        assert [row['utf_name'] for row in table] == [
+            row['utf_name'] for row in rows]
+
+
+def test_wildcard_lists_everything(capsys):
+    from mathutf import symbols
+    text = _run(capsys, '*', '--format', 'jsonl', '--fields', 'key')
+    keys = [json.loads(line)['key'] for line in text.splitlines()]
+    assert keys == [record.key for record in symbols.STORE.records()]
+    assert len(_run(capsys, '*').splitlines()) == len(keys) + 1
+
+
+def test_limit_and_fields(capsys):
+    text = _run(capsys, '--format', 'jsonl', '--limit', '5',
+                '--fields', 'key,references')
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert len(rows) == 5
+    assert all(list(row) == ['key', 'references'] for row in rows)
+    assert json.loads(_run(capsys, 'zzz', '--format', 'json')) == []
+    with pytest.raises(SystemExit):
+        _run(capsys, 'alpha', '--fields', 'key,nope')
@@ -0,0 +1,53 @@
+import io
+import pathlib
+
+
+TEXT = '∀ε>0 ∃δ>0: |x−y| < δ ⇒ |f(x)−f(y)| < ε, “quoted” … x² ∈ ℝ ∪ ℕ₀\n' * 50
+
+
+def _brute_force(text):
+    from mathutf import symbols
+    from collections import Counter
+    return Counter(c for c in text if symbols.lookup(c) is not None)
+
+
+def test_streams_and_files_agree_with_text(tmp_path, monkeypatch):
+    from mathutf import corpus
+    want = _brute_force(TEXT)
+    assert corpus.scan(TEXT).counts == want
+    # tiny chunks split multi-byte characters across reads
+    for chunk_size in [1, 2, 3, 7]:
+        data = io.BytesIO(TEXT.encode('utf8'))
+        assert corpus.scan(data, chunk_size=chunk_size).counts == want
+        text = io.StringIO(TEXT)
+        assert corpus.scan(text, chunk_size=chunk_size).counts == want
+
+    fpath = tmp_path / 'doc.txt'
+    fpath.write_text(TEXT, encoding='utf8')
+    assert corpus.scan(fpath).counts == want
+    monkeypatch.setattr(corpus, 'MMAP_THRESHOLD', 16)
+    report = corpus.scan(fpath, positions=True)
+    assert report.counts == want
+    data = fpath.read_bytes()
+    for pos, char in report.positions[str(fpath)]:
+        assert data[pos:].decode('utf8').startswith(char)
+
+
+def test_parallel_scan_files_matches_serial(tmp_path):
+    from mathutf import corpus
+    fpaths = []
+    for idx in range(4):
+        fpath = pathlib.Path(tmp_path) / f'{idx}.txt'
+        fpath.write_text(TEXT[idx * 7:], encoding='utf8')
+        fpaths.append(fpath)
+    serial = corpus.scan_files(fpaths, workers=0, positions=True)
+    parallel = corpus.scan_files(fpaths, workers=2, positions=True)
+    assert serial.counts == parallel.counts
+    assert serial.positions == parallel.positions
+    assert serial.sources == [str(f) for f in fpaths]
+    groups = serial.groups()
+    assert sum(sum(h.values()) for h in groups.values()) == serial.total
+    want = sum((_brute_force(f.read_text(encoding='utf8')) for f in fpaths),
+               _brute_force(''))
+    assert serial.counts == want
+    assert groups['relational']['lt'] == want['<']
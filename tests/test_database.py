@@ -0,0 +1,50 @@
+def test_database_round_trip(tmp_path):
+    from mathutf import symbols
+    from mathutf.database import SymbolDatabase, write_database
+    fpath = str(tmp_path / 'symbols.db')
+    write_database(fpath, all_unicode=False)
+    with SymbolDatabase(fpath) as db:
+        assert len(db) == len(symbols.STORE)
+        tables = {name: list(rows) for name, rows in symbols.TABLES.items()}
+        assert db.to_tables() == tables
+        for rowid, record in enumerate(symbols.STORE.records()):
+            assert db.record(rowid) == record
+        rowid = db.find_key('sup_2')[0]
+        view = db.columns['key'].view(rowid)
+        assert bytes(view) == b'sup_2'
+        view.release()
+        assert db.find_key('not_a_key') == []
+
+
+def test_database_all_unicode(tmp_path):
+    import unicodedata
+    from mathutf.database import SymbolDatabase, write_database, UNICODE_GROUP
+    fpath = str(tmp_path / 'symbols.db')
+    write_database(fpath)
+    with SymbolDatabase(fpath) as db:
+        assert db.unidata_version == unicodedata.unidata_version
+        emoji = db.record(db.lookup('\U0001F600')[0])
+        assert emoji.group == UNICODE_GROUP
+        assert emoji.key == 'grinning_face'
+        # Curated rows win over the generic unicode row for the same char
+        assert [db.key(r) for r in db.lookup('∞')] == ['infinity']
+
+
+def test_cached_database_follows_table_changes(tmp_path):
+    from mathutf import registry
+    from mathutf.database import SymbolDatabase, default_fpath
+    dpath = str(tmp_path)
+    with SymbolDatabase.load_or_build(dpath=dpath) as db:
+        assert db.find_key('test_multimap') == []
+        before = db.fpath
+    registry.register_table('test_database', [
+        {'chr': '⊸', 'key': 'test_multimap', 'utf_name': 'MULTIMAP'}])
+    try:
+        assert default_fpath(dpath) != before
+        with SymbolDatabase.load_or_build(dpath=dpath) as db:
+            assert [db.key(r) for r in db.lookup('⊸')] == ['test_multimap']
+        # an explicit path written from other tables is rewritten
+        with SymbolDatabase.load_or_build(fpath=before) as db:
+            assert db.find_key('test_multimap') != []
+    finally:
+        registry.unregister_table('test_database')
@@ -0,0 +1,59 @@
+def test_variants_never_capture_plain_or_table_characters():
+    from mathutf.folding import fold, fold_char, variants
+    from mathutf.symbols import STORE
+    chars = [record.chr for record in STORE.records()]
+    found = variants(chars)
+    assert found['µ'] == 'μ' and found['𝛼'] == 'α' and found['＜'] == '<'
+    for char, target in found.items():
+        assert not char.isascii() and char not in chars
+        assert fold_char(char) == fold_char(target)
+    # the table agrees with normalizing character by character
+    text = ''.join(chr(c) for c in range(0x2000, 0x2400)) + '𝛼𝐑ℝ﹤ﬁ'
+    want = ''.join(fold_char(c) for c in text)
+    assert fold(text) == want
+    assert fold(fold(text)) == fold(text)
+
+
+def test_lookup_and_search_fold_look_alikes():
+    from mathutf import symbols
+    assert symbols.lookup('µ') is symbols.lookup('μ')
+    assert symbols.lookup('𝛁').key == 'nabla'
+    assert symbols.lookup('𝐑') is None
+    assert symbols.lookup('∊', fold=False) is None
+    text = 'x ∊ ℝ, 𝛼 ≤ 2µ'
+    assert [(pos, r.chr) for pos, r in symbols.lookup_many(text)] == [
+        (2, '∈'), (4, 'ℝ'), (7, 'α'), (9, '≤'), (12, 'μ')]
+    assert [r.chr for _, r in symbols.lookup_many(text, fold=False)] == [
+        'ℝ', '≤']
+    assert [r.key for r in symbols.search('ｎａｂｌａ')] == ['nabla']
+    found = symbols.search_many(['∆', 'Δ', '𝚫', 'ｎａｂｌａ'])
+    assert found['∆'] == found['Δ'] == found['𝚫'] == list(symbols.search('∆'))
+    assert [r.key for r in found['ｎａｂｌａ']] == ['nabla']
+
+
+def test_scan_counts_look_alikes_as_table_characters(tmp_path):
+    from mathutf.corpus import scan, scan_files
+    text = 'µ ∊ 𝛼 ∈ α' * 3
+    report = scan(text, positions=True)
+    assert report.counts == {'μ': 3, '∈': 6, 'α': 6}
+    assert report.positions['<text>'][:3] == [(0, 'μ'), (2, '∈'), (4, 'α')]
+    assert scan(text, fold=False).counts == {'∈': 3, 'α': 3}
+    fpath = tmp_path / 'a.txt'
+    fpath.write_text(text, encoding='utf8')
+    assert scan_files([fpath], workers=0).counts == report.counts
+
+
+def test_ascii_is_never_a_variant():
+    from mathutf import registry, symbols
+    from mathutf.corpus import scan
+    registry.register_table('test_minus', [
+        {'chr': '−', 'key': 'test_minus', 'utf_name': 'MINUS SIGN'}])
+    try:
+        assert symbols.lookup('-') is None
+        assert symbols.lookup('−').key == 'test_minus'
+        assert scan('well-known re-use').counts == {}
+        assert scan('a − b').counts == {'−': 1}
+        variants = symbols._get_codepoint_index().variants
+        assert not any(char.isascii() for char in variants)
+    finally:
+        registry.unregister_table('test_minus')
@@ -0,0 +1,65 @@
+import random
+
+
+def _reference_distance(a, b):
+    dist = [[i + j if not i * j else 0 for j in range(len(b) + 1)]
+            for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            dist[i][j] = min(dist[i - 1][j] + 1, dist[i][j - 1] + 1,
+                             dist[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                dist[i][j] = min(dist[i][j], dist[i - 2][j - 2] + 1)
+    return dist[-1][-1]
+
+
+def test_edit_distance_matches_reference():
+    from mathutf.fuzzy import edit_distance
+    rng = random.Random(0)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 6)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 6)))
+        want = _reference_distance(a, b)
+        assert edit_distance(a, b) == want, (a, b)
+        limit = rng.randint(0, 3)
+        assert edit_distance(a, b, limit) == min(want, limit + 1), (a, b)
+
+
+def test_ranked_search_tolerates_typos():
+    from mathutf.symbols import search_ranked
+    cases = {
+        'lamda': 'λ',
+        'nabal': '∇',
+        'supset eq': '⊇',
+        'supseteq': '⊇',
+        'infinty': '∞',
+        'integarl': '∫',
+    }
+    for query, want in cases.items():
+        found = search_ranked(query, k=3)
+        assert found and found[0].chr == want, query
+    assert search_ranked('zzzzqqqq') == []
+
+
+def test_ranked_search_all_unicode(monkeypatch, tmp_path):
+    monkeypatch.setenv('MATHUTF_CACHE_DIR', str(tmp_path))
+    from mathutf import unicode_names, symbols
+    monkeypatch.setattr(unicode_names, '_GLOBAL_INDEX', None)
+    monkeypatch.setattr(symbols, '_UNICODE_FUZZY_INDEX', None)
+    found = symbols.search_ranked('grining face', k=3, all_unicode=True)
+    assert found[0].chr == '😀' and found[0].group == 'unicode'
+    # curated rows are not repeated as unicode results
+    found = symbols.search_ranked('nabla', k=10, all_unicode=True)
+    assert [item.chr for item in found].count('∇') == 1
+    assert found[0].group != 'unicode'
+
+
+def test_excluded_symbols_do_not_use_the_candidate_budget():
+    from mathutf.fuzzy import CANDIDATE_LIMIT, FuzzyIndex
+    docs = [(0x1000 + i, [('widget', 1.0)])
+            for i in range(CANDIDATE_LIMIT * 2)]
+    docs.append((0x2000, [('widget extra long name', 1.0)]))
+    index = FuzzyIndex(docs)
+    exclude = {codepoint for codepoint, _ in docs[:-1]}
+    found = index.topk('widget', k=3, exclude=exclude)
+    assert [index.codepoints[docid] for _, docid in found] == [0x2000]
@@ -1,2 +1,40 @@
 def test_import():
-    import mathutf
\ No newline at end of file
+    import mathutf  # NOQA
+
+
+def test_lazy_symbol_attributes():
+    import mathutf
+    from mathutf import symbols
+    assert mathutf.alpha == symbols.SYMBOLS['alpha']
+    assert 'alpha' not in vars(mathutf), 'symbols are not cached'
+    assert mathutf.and_ == '∧'
+    assert 'alpha' in dir(mathutf)
+    assert 'search' in mathutf.__all__
+    try:
+        mathutf.not_a_symbol
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('unknown names should raise AttributeError')
+
+
+def test_symbol_attributes_follow_table_changes():
+    import mathutf
+    from mathutf import symbols
+    row = {'chr': '⊸', 'key': 'test_lollipop', 'utf_name': 'MULTIMAP'}
+    symbols.TABLES['test_attributes'] = [row]
+    try:
+        assert mathutf.test_lollipop == '⊸'
+        symbols.TABLES['test_attributes'] = [dict(row, chr='⟜')]
+        assert mathutf.test_lollipop == '⟜'
+    finally:
+        del symbols.TABLES['test_attributes']
+    assert not hasattr(mathutf, 'test_lollipop')
+
+
+def test_import_does_not_build_tables():
+    import subprocess
+    import sys
+    code = 'import sys, mathutf; print("mathutf.symbols" in sys.modules)'
+    out = subprocess.check_output([sys.executable, '-c', code], text=True)
+    assert out.strip() == 'False'
@@ -0,0 +1,66 @@
+import pytest
+
+
+def test_events_describe_each_call():
+    from mathutf import instrument, symbols
+    from mathutf.index import UnsafePatternError
+    events = []
+    symbols.search('beta')  # nothing is recorded without hooks
+    instrument.add_hook(events.append)
+    try:
+        list(symbols.search('be'))
+        list(symbols.search('element'))
+        list(symbols.search('^sup_[0-9]$'))
+        next(symbols.search('*'))  # discarded before it is exhausted
+        with pytest.raises(UnsafePatternError):
+            symbols.search('(a+)+')
+        symbols.search_many(['alpha', 'beta'])
+        symbols.search_ranked('lamda', k=2)
+        symbols.lookup('∈')
+        symbols.lookup_many('x ∈ ℝ')
+    finally:
+        instrument.remove_hook(events.append)
+    symbols.lookup('∈')
+
+    names = [event.name for event in events]
+    assert names.count('search') == 5
+    plans = {event.plan: event for event in events if event.name == 'search'}
+    assert plans['gram'].matched == 5 and plans['gram'].scanned == 0
+    assert plans['substring'].scanned >= plans['substring'].matched == 2
+    assert plans['regex'].matched == 10
+    assert plans['regex'].scanned == len(symbols.STORE)
+    assert plans['regex'].cache_hit is not None
+    assert plans['all'].matched == 1
+    assert plans['error'].matched == 0
+    others = {event.name: event for event in events if event.name != 'search'}
+    assert others['search_many'].matched == len(
+        [r for rows in symbols.search_many(['alpha', 'beta']).values()
+         for r in rows])
+    assert others['search_ranked'].matched == 2
+    assert others['lookup'].matched == 1
+    assert others['lookup_many'].matched == 2
+    assert all(event.seconds >= 0 for event in events)
+
+
+def test_stats_report_builds_and_cache_hits():
+    from mathutf import instrument, symbols
+    from mathutf.index import compile_query
+    compile_query.cache_clear()
+    with instrument.collect() as stats:
+        symbols.TABLES['test_extra'] = [
+            {'chr': 'ꙮ', 'key': 'zzeye',
+             'utf_name': 'CYRILLIC LETTER MULTIOCULAR O'}]
+        try:
+            for _ in range(3):
+                list(symbols.search('zz[e]ye'))
+        finally:
+            del symbols.TABLES['test_extra']
+    # a new table is added to an index that already exists
+    plans = stats['build'].plans
+    assert plans['search_index'] + plans['search_index_update'] == 1
+    search = stats['search']
+    assert (search.calls, search.cache_hits, search.cache_misses) == (3, 2, 1)
+    assert sum(search.histogram) == 3
+    assert search.quantile(1.0) >= search.seconds / 3
+    exported = stats.to_dict()['search']
+    assert exported['matched'] == 3 and exported['plans'] == {'regex': 3}
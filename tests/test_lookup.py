@@ -0,0 +1,29 @@
+def test_lookup_matches_brute_force():
+    from mathutf import symbols
+    first = {}
+    for record in symbols.STORE.records():
+        first.setdefault(record.chr, record)
+    for chr_, record in first.items():
+        assert symbols.lookup(chr_) == record
+        assert symbols.lookup(ord(chr_)) == record
+    assert symbols.lookup('a') is None
+    assert symbols.lookup('a', default=0) == 0
+    assert symbols.lookup('∇', as_dict=True)['key'] == 'nabla'
+
+    text = ''.join(first) + 'plain text [x] - ^ \\ ' + ''.join(first)
+    want = [(pos, first[c]) for pos, c in enumerate(text) if c in first]
+    assert symbols.lookup_many(text) == want
+
+
+def test_lookup_follows_table_changes():
+    from mathutf import symbols
+    assert symbols.lookup('ꙮ') is None
+    symbols.TABLES['test_extra'] = [
+        {'chr': 'ꙮ', 'key': 'zzeye', 'utf_name': 'CYRILLIC LETTER MULTIOCULAR O'},
+    ]
+    try:
+        assert symbols.lookup('ꙮ').key == 'zzeye'
+        assert [r.key for _, r in symbols.lookup_many('aꙮb')] == ['zzeye']
+    finally:
+        del symbols.TABLES['test_extra']
+    assert symbols.lookup('ꙮ') is None
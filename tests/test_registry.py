@@ -0,0 +1,105 @@
+import types
+
+import pytest
+
+
+ROWS = [
+    {'chr': '⊸', 'key': 'multimap', 'utf_name': 'MULTIMAP',
+     'tex': '\\multimap'},
+    {'chr': '⨝', 'key': 'fulljoin', 'utf_name': 'FULL OUTER JOIN',
+     'alias': ('outerjoin',)},
+]
+
+
+def test_register_updates_indexes_incrementally():
+    import mathutf
+    from mathutf import instrument, registry, symbols
+    # build the indexes before the table exists
+    list(symbols.search('multimap'))
+    symbols.lookup('∈')
+    symbols.search_ranked('multimap')
+    try:
+        with instrument.collect() as stats:
+            registry.register_table('test_notation', ROWS, version='1')
+            assert [r.key for r in symbols.search('^outerjoin')] == [
+                'fulljoin']
+            assert symbols.lookup('⊸').key == 'multimap'
+            found = symbols.search_ranked('outer jion', k=1)
+            assert [r.key for r in found] == ['fulljoin']
+        assert stats['build'].plans == {
+            'search_index_update': 1, 'codepoint_index_update': 1,
+            'fuzzy_index_update': 1}
+        assert mathutf.multimap == '⊸' and symbols.SYMBOLS['fulljoin'] == '⨝'
+        # the extended indexes agree with fresh ones
+        from mathutf.index import CodepointIndex, SearchIndex
+        fresh = SearchIndex(symbols.STORE.records())
+        index = symbols._get_index()
+        for query in ['join', '^multi', '\\bouter', 'm', 'set', '∈', '*']:
+            assert list(index.find(query)) == list(fresh.find(query))
+        fresh = CodepointIndex(symbols.STORE.records(), fold=True)
+        assert symbols._get_codepoint_index().rowids == fresh.rowids
+        from mathutf.fuzzy import FuzzyIndex, record_fields
+        fresh = FuzzyIndex((ord(r.chr), record_fields(r))
+                           for r in symbols.STORE.records())
+        index = symbols._get_fuzzy_index()
+        for query in ['multimap', 'outer jion', 'join', 'element of', 'xyz']:
+            assert index.topk(query) == fresh.topk(query), query
+
+        with pytest.raises(ValueError):
+            registry.register_table('test_notation', ROWS)
+        registry.register_table('test_notation', ROWS[:1], version='2',
+                                replace=True)
+        assert registry.registered_tables()['test_notation'].version == '2'
+        assert symbols.lookup('⨝') is None
+        assert not hasattr(mathutf, 'fulljoin')
+    finally:
+        registry.unregister_table('test_notation')
+    assert symbols.lookup('⊸') is None
+    assert 'multimap' not in symbols.SYMBOLS
+    assert 'test_notation' not in registry.registered_tables()
+    with pytest.raises(KeyError):
+        registry.unregister_table('test_notation')
+
+
+def test_register_validates_rows():
+    from mathutf import registry, symbols
+    version = symbols.STORE.version
+    with pytest.raises(ValueError, match='builtin'):
+        registry.register_table('greek_letters', ROWS)
+    with pytest.raises(ValueError, match='more than one'):
+        registry.register_table('test_bad', ROWS + ROWS[:1])
+    with pytest.raises(ValueError, match='single codepoint'):
+        registry.register_table('test_bad', [dict(ROWS[0], chr='ab')])
+    with pytest.raises(TypeError):
+        registry.register_table('test_bad', [('⊸', 'multimap')])
+    assert symbols.STORE.version == version
+    assert 'test_bad' not in registry.registered_tables()
+
+
+def test_load_entry_points_registers_new_versions(monkeypatch):
+    from mathutf import registry, symbols
+
+    def entry_point(name, value, version):
+        return types.SimpleNamespace(
+            name=name, value='pkg.tables:ROWS', load=lambda: value,
+            dist=types.SimpleNamespace(version=version))
+
+    found = [entry_point('test_plugin', ROWS, '0.1'),
+             entry_point('test_versioned', lambda: {'rows': ROWS[1:],
+                                                     'version': 'v7'}, '0.1')]
+    monkeypatch.setattr(registry, '_entry_points', lambda group: found)
+    try:
+        loaded = registry.load_entry_points()
+        assert [(t.name, t.version) for t in loaded] == [
+            ('test_plugin', '0.1'), ('test_versioned', 'v7')]
+        assert symbols.lookup('⊸').group == 'test_plugin'
+        # the same versions again are left alone
+        assert registry.load_entry_points() == []
+        found[0] = entry_point('test_plugin', ROWS[:1], '0.2')
+        loaded = registry.load_entry_points()
+        assert [(t.name, t.version) for t in loaded] == [('test_plugin', '0.2')]
+        assert len(symbols.TABLES['test_plugin']) == 1
+    finally:
+        for name in ['test_plugin', 'test_versioned']:
+            if name in registry.registered_tables():
+                registry.unregister_table(name)
@@ -0,0 +1,108 @@
+import re
+
+
+def test_index_agrees_with_regex_scan():
+    """
+    Every fast path of the index must return exactly what the regex fallback
+    would for the equivalent pattern.
+    """
+    from mathutf import symbols
+    from mathutf.index import is_plain
+    index = symbols._get_index()
+    queries = set()
+    for fields in index.fields:
+        for field in fields:
+            for i in range(len(field)):
+                for j in range(i + 1, min(i + 5, len(field)) + 1, 2):
+                    queries.add(field[i:j])
+    queries = sorted(q for q in queries if is_plain(q))
+    queries += ['', 'zzzz', 'SUBSCRIPT', 'Greek Capital']
+    for query in queries:
+        for prefix in ['', '^', '\\b']:
+            got = list(index.find(prefix + query))
+            want = list(index._find_regex(prefix + re.escape(query)))
+            assert got == want, (prefix + query)
+
+
+def test_index_invalidated_when_tables_change():
+    from mathutf import symbols
+    assert list(symbols.search('zzfoo')) == []
+    symbols.TABLES['test_extra'] = [
+        {'chr': 'x', 'key': 'zzfoo', 'utf_name': 'LATIN SMALL LETTER X'},
+    ]
+    try:
+        found = [item.key for item in symbols.search('zzfoo')]
+        assert found == ['zzfoo']
+    finally:
+        del symbols.TABLES['test_extra']
+    assert list(symbols.search('zzfoo')) == []
+
+
+def test_search_does_not_mutate_tables():
+    from mathutf import symbols
+    before = [dict(item) for subtable in symbols.TABLES.values()
+              for item in subtable]
+    results = list(symbols.search('*'))
+    after = [dict(item) for subtable in symbols.TABLES.values()
+             for item in subtable]
+    assert before == after
+    assert all('group' not in item for item in after)
+    record = results[0]
+    try:
+        record.key = 'changed'
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('records should be immutable')
+    copy = next(symbols.search(record.key, as_dict=True))
+    copy['key'] = 'changed'
+    assert next(symbols.search(record.key)).key == record.key
+
+
+def test_unsafe_patterns_are_rejected():
+    import pytest
+    from mathutf import symbols
+    from mathutf.index import UnsafePatternError, MAX_PATTERN_LENGTH
+    for query in ['(a+)+$', '(\\w*)*x', '((ab)*c)*', '(.|.)*!',
+                  '.*.*.*.*.*.*.*.*!', 'x' * MAX_PATTERN_LENGTH + '.']:
+        with pytest.raises(UnsafePatternError):
+            symbols.search(query)
+        with pytest.raises(UnsafePatternError):
+            symbols.search_many(['alpha', query])
+    with pytest.raises(re.error):
+        symbols.search('(unclosed')
+    # literal mode never compiles the query
+    assert list(symbols.search('(a+)+$', literal=True)) == []
+
+
+def test_literal_mode_and_pattern_cache():
+    from mathutf import symbols
+    from mathutf.index import compile_query
+    assert [r.key for r in symbols.search('sub_1', literal=True)] == ['sub_1']
+    assert list(symbols.search('sub_.', literal=True)) == []
+    found = symbols.search_many(['*', 'sub_[1]'], literal=True)
+    assert found == {'*': list(symbols.search('*')), 'sub_[1]': []}
+    assert len(list(symbols.search('*', literal=True))) == len(symbols.STORE)
+    compile_query.cache_clear()
+    for _ in range(3):
+        list(symbols.search('^sub_[12]$'))
+    info = compile_query.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+
+def test_search_results_survive_table_changes():
+    from mathutf import symbols
+    original = list(symbols.TABLES['greek_letters'])
+    found = symbols.search('alpha')
+    first = next(found)
+    try:
+        symbols.TABLES['greek_letters'] = original[::-1]
+        rest = list(found)
+    finally:
+        symbols.TABLES['greek_letters'] = original
+    assert all('alpha' in (r.key + r.utf_name).lower() for r in rest)
+    assert [first.key] + [r.key for r in rest] == [
+        r.key for r in symbols.search('alpha')]
+    # records are built when they are read, from the columns of the store
+    records = symbols.STORE.records()
+    assert records[0] == records[0] and records[0] is not records[0]
@@ -0,0 +1,60 @@
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+
+def test_handle_matches_in_process_api():
+    from mathutf import server, symbols
+    response = server.handle({'id': 1, 'method': 'search_many',
+                              'params': {'queries': ['alpha', 'nabla']}})
+    assert response == {'id': 1, 'result': symbols.search_many(
+        ['alpha', 'nabla'], as_dict=True)}
+    response = server.handle({'id': 2, 'method': 'lookup_many',
+                              'params': {'text': 'x ∈ ℝ'}})
+    assert [(pos, row['key']) for pos, row in response['result']] == [
+        (2, 'elementof'), (4, 'real')]
+    response = server.handle({'id': 3, 'method': 'search',
+                              'params': {'nope': 1}})
+    assert response['error']['type'] == 'TypeError'
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs AF_UNIX')
+def test_socket_server_and_client_fallback(tmp_path):
+    from mathutf import client, server
+    fpath = str(tmp_path / 'mathutf.sock')
+    with pytest.raises(OSError):
+        client.call('ping', fpath=fpath, fallback=False)
+    # without a server the request is answered in process
+    assert client.call('lookup', fpath=fpath, chr='∇')['key'] == 'nabla'
+
+    srv = server.make_server(fpath)
+    thread = threading.Thread(target=srv.serve_forever)
+    thread.start()
+    try:
+        with client.Client(fpath) as conn:
+            info = conn.call('ping')
+            assert conn.call('lookup', chr='∇')['key'] == 'nabla'
+            with pytest.raises(client.RemoteError) as exc_info:
+                conn.call('search', query='(a+)+')
+            assert exc_info.value.kind == 'UnsafePatternError'
+        # a second server must not steal the socket
+        with pytest.raises(OSError):
+            server.make_server(fpath)
+        assert client.call('ping', fpath=fpath, fallback=False) == info
+        assert client.call('shutdown', fpath=fpath, fallback=False) is None
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+    finally:
+        srv.server_close()
+    assert not (tmp_path / 'mathutf.sock').exists()
+
+
+def test_client_does_not_build_the_tables():
+    code = ('import sys, mathutf.client; '
+            'print("mathutf.symbols" in sys.modules)')
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                          text=True, check=True)
+    assert proc.stdout.strip() == 'False'
@@ -0,0 +1,73 @@
+"""
+Startup regression checks for the command line interface.
+
+These run ``python -X importtime -m mathutf`` in a subprocess and parse the
+import log, so import creep on the fast path fails loudly. Run the file
+directly to print a report of the slowest imports:
+
+    python tests/test_startup.py
+"""
+import subprocess
+import sys
+
+#: Modules that must never be imported by the default CLI path
+HEAVY_MODULES = ['pandas', 'rich', 'scriptconfig', 'ubelt', 'numpy', 'pygments']
+
+#: Generous upper bound (in microseconds) on the cumulative import time of the
+#: mathutf modules themselves. This catches accidental eager work at import.
+MATHUTF_IMPORT_BUDGET_US = 200000
+
+
+def importtime_report(args):
+    """
+    Run mathutf with ``-X importtime`` and parse the timing log.
+
+    Args:
+        args (List[str]): arguments to ``python -m mathutf``
+
+    Returns:
+        Dict[str, Tuple[int, int]]: top level module name to the
+            (self, cumulative) import time in microseconds, for every module
+            that was imported
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'mathutf'] + args,
+        capture_output=True, text=True, check=True)
+    report = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        report[name.strip()] = (int(self_us), int(cumulative_us))
+    return report
+
+
+def test_cli_fast_path_avoids_heavy_imports():
+    report = importtime_report(['alpha'])
+    imported_roots = {name.split('.')[0] for name in report}
+    heavy = sorted(imported_roots & set(HEAVY_MODULES))
+    assert not heavy, f'The default CLI path imported {heavy}'
+
+
+def test_cli_streaming_formats_avoid_heavy_imports():
+    report = importtime_report(['--format', 'jsonl', 'alpha'])
+    imported_roots = {name.split('.')[0] for name in report}
+    heavy = sorted(imported_roots & set(HEAVY_MODULES))
+    assert not heavy, f'The jsonl CLI path imported {heavy}'
+
+
+def test_cli_import_budget():
+    report = importtime_report(['alpha'])
+    total = sum(self_us for name, (self_us, _) in report.items()
+                if name.split('.')[0] == 'mathutf')
+    assert total < MATHUTF_IMPORT_BUDGET_US, (
+        f'mathutf modules took {total}us to import')
+
+
+if __name__ == '__main__':
+    report = importtime_report(sys.argv[1:] or ['alpha'])
+    ranked = sorted(report.items(), key=lambda kv: kv[1][0], reverse=True)
+    print(f'{"self (us)":>10} {"cumulative (us)":>16}  module')
+    for name, (self_us, cumulative_us) in ranked[:25]:
+        print(f'{self_us:>10} {cumulative_us:>16}  {name}')
+    print(f'{len(report)} modules imported')
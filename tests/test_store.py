@@ -0,0 +1,95 @@
+import sys
+
+
+def _deep_sizeof(obj, seen):
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+def _traced_bytes(func):
+    """
+    The memory still allocated after calling func, and its result.
+    """
+    import gc
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def test_store_is_smaller_than_list_of_dicts():
+    from mathutf import symbols
+    from mathutf.store import SymbolStore
+    rows = [item for subtable in symbols.TABLES.values() for item in subtable]
+    dict_bytes = _deep_sizeof(rows, set())
+    store_bytes = symbols.STORE.memory_usage()['total']
+    assert store_bytes < dict_bytes / 2
+
+    store = SymbolStore()
+    for name, group in symbols.TABLES.items():
+        store.set_group(name, group)
+
+    def _search():
+        # an index reads every row of the snapshot once, then a search
+        # returns the rows it found
+        _, snapshot = store.snapshot()
+        for _ in snapshot:
+            pass
+        return snapshot[:10]
+
+    # the snapshot holds no copy of the rows
+    used_bytes, found = _traced_bytes(_search)
+    assert len(found) == 10
+    assert used_bytes - _deep_sizeof(found, set()) < 1024
+
+
+def test_tables_round_trip():
+    from mathutf.store import SymbolStore
+    from mathutf import symbols
+    store = SymbolStore()
+    original = {name: list(rows) for name, rows in symbols.TABLES.items()}
+    for name, rows in original.items():
+        store.set_group(name, rows)
+    tables = store.tables()
+    assert {name: list(rows) for name, rows in tables.items()} == original
+    # Names that disagree with unicodedata are kept verbatim
+    le_row = next(row for row in tables['relational'] if row['key'] == 'le')
+    assert le_row['utf_name'] == 'LESS-THAN OVER EQUAL TO'
+
+
+def test_replace_and_remove_group():
+    from mathutf.store import SymbolStore
+    store = SymbolStore()
+    tables = store.tables()
+    symbols = store.symbols()
+    tables['a'] = [{'chr': 'α', 'key': 'alpha', 'utf_name': 'GREEK SMALL LETTER ALPHA'}]
+    tables['b'] = [{'chr': 'β', 'key': 'beta', 'utf_name': 'GREEK SMALL LETTER BETA'}]
+    assert symbols['beta'] == 'β'
+    version = store.version
+    tables['a'] = [{'chr': 'γ', 'key': 'gamma', 'utf_name': 'GREEK SMALL LETTER GAMMA'}]
+    assert store.version > version
+    assert list(symbols) == ['gamma', 'beta']
+    del tables['a']
+    assert list(tables) == ['b']
+    assert store.record(0).group == 'b'
+    try:
+        tables['c'] = [{'chr': 'ab', 'key': 'bad', 'utf_name': 'BAD'}]
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('multi-codepoint rows are rejected')
+    assert len(store) == 1 and list(tables) == ['b']
@@ -0,0 +1,29 @@
+import string
+import unicodedata
+
+
+def test_styles_agree_with_nfkc():
+    from mathutf.styles import STYLES, alphabets, style
+    text = string.ascii_letters + string.digits + 'ΑΒΓΔαβγδϵϑϕ∇∂'
+    for name in STYLES:
+        styled = style(text, name)
+        assert unicodedata.normalize('NFKC', styled) == (
+            unicodedata.normalize('NFKC', text)), name
+        assert style(styled, 'rm') == text, name
+        if name != 'rm':
+            # every styled character was converted, including the
+            # letterlike exceptions
+            converted = [c for c in styled if c not in text]
+            assert len(converted) == len(
+                [c for c in text if c in alphabets()[name]]), name
+
+
+def test_restyle_and_unknown_style():
+    import pytest
+    from mathutf.styles import style
+    assert style('ℝ^ℋ', 'bf') == '𝐑^𝐇'
+    assert style(style('ℂ', 'frak'), 'bb') == 'ℂ'
+    # plain sans-serif has digits but no greek, which is left alone
+    assert style('𝛂1', 'sf') == '𝛂𝟣'
+    with pytest.raises(ValueError):
+        style('x', 'mathbb')
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+
+def _write(fpath, text):
+    with open(fpath, 'w', encoding='utf8') as file:
+        file.write(text)
+
+
+def _read(fpath):
+    with open(fpath, 'r', encoding='utf8') as file:
+        return file.read()
+
+
+def test_regenerating_the_shipped_tables_is_a_noop(tmp_path, monkeypatch):
+    from mathutf import tablegen
+    monkeypatch.setenv('MATHUTF_CACHE_DIR', str(tmp_path / 'cache'))
+    source = str(tmp_path / 'symbols.py')
+    shutil.copy(tablegen.default_source_fpath(), source)
+    latex_map = str(tmp_path / 'map.js')
+    _write(latex_map, 'var map = {"\\\\alpha": "α"}')
+    before = _read(source)
+    tablegen.regenerate(source, latex_map)
+    assert _read(source) == before
+    mtime = os.stat(source).st_mtime_ns
+    manifest_mtime = os.stat(tablegen.default_manifest_fpath(source)).st_mtime_ns
+    result = tablegen.regenerate(source, latex_map)
+    assert result['changed_tables'] == [] and result['updated_rows'] == 0
+    assert os.stat(source).st_mtime_ns == mtime
+    assert os.stat(tablegen.default_manifest_fpath(source)).st_mtime_ns == manifest_mtime
+    # nothing but the source is left next to it
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'map.js', 'symbols.py']
+
+
+def test_only_generated_rows_follow_input_changes(tmp_path, monkeypatch):
+    from mathutf import tablegen
+    monkeypatch.setenv('MATHUTF_CACHE_DIR', str(tmp_path / 'cache'))
+    source = str(tmp_path / 'symbols.py')
+    latex_map = str(tmp_path / 'map.js')
+    _write(source, '\n'.join([
+        "TABLES['demo'] = [",
+        "    # a comment",
+        "    {'chr': 'α', 'key': 'alpha'},",
+        "    {'chr': 'β', 'key': 'beta', 'tex': '\\\\beta'},",
+        "    {'chr': 'γ', 'key': 'gamma', 'alias': ['g']},",
+        "]",
+        "",
+        "TABLES['other'] = [",
+        "    {'chr': 'δ', 'key': 'delta'},",
+        "]",
+        "",
+    ]))
+    _write(latex_map, 'var map = {"\\\\alpha": "α", "\\\\beta": "β", '
+                      '"\\\\gamma": "γ", "\\\\delta": "δ"}')
+    result = tablegen.regenerate(source, latex_map, overrides={})
+    assert result == {'changed_tables': ['demo', 'other'], 'updated_rows': 3,
+                      'failed': []}
+    text = _read(source)
+    assert "    # a comment" in text
+    assert "{'chr': 'γ', 'key': 'gamma', 'tex': '\\\\gamma', 'alias': ['g']}" in text
+
+    # A new map only changes the rows that were generated from the old one
+    _write(latex_map, 'var map = {"\\\\varalpha": "α", "\\\\varbeta": "β", '
+                      '"\\\\gamma": "γ", "\\\\delta": "δ"}')
+    result = tablegen.regenerate(source, latex_map, overrides={})
+    assert result == {'changed_tables': ['demo'], 'updated_rows': 1,
+                      'failed': []}
+    text = _read(source)
+    assert "'tex': '\\\\varalpha'" in text
+    assert "'tex': '\\\\beta'" in text
@@ -0,0 +1,128 @@
+import io
+
+
+def test_streaming_matches_whole_text():
+    """
+    Chunk boundaries must never split or change a match.
+    """
+    from mathutf.transliterate import to_unicode, iter_to_unicode
+    text = (r'\forall \epsilon > 0 \exists \delta: x_1^2 \leq \inner'
+            r' \mathbb{R} \in \infty_\beta \alpha') * 5
+    want = to_unicode(text)
+    assert '\\forall' not in want and '\\inner' in want
+    for chunk_size in [1, 2, 3, 7, 64, 1 << 16]:
+        got = ''.join(iter_to_unicode(io.StringIO(text), chunk_size=chunk_size))
+        assert got == want, chunk_size
+    # Iterables of lines are also accepted
+    lines = io.StringIO(text.replace(' ', '\n')).readlines()
+    got = ''.join(iter_to_unicode(lines))
+    assert got == to_unicode(text.replace(' ', '\n'))
+
+
+def test_every_tex_form_converts():
+    from mathutf.transliterate import to_unicode, tex_to_unicode_map
+    for tex, chr_ in tex_to_unicode_map().items():
+        assert to_unicode(tex + ' ') == chr_ + ' ', tex
+
+
+def test_to_unicode_follows_table_changes():
+    from mathutf import symbols
+    from mathutf.transliterate import to_unicode
+    symbols.TABLES['test_extra'] = [
+        {'chr': 'x', 'key': 'zzfoo', 'utf_name': 'LATIN SMALL LETTER X',
+         'tex': '\\zzfoo'},
+    ]
+    try:
+        assert to_unicode('\\zzfoo') == 'x'
+    finally:
+        del symbols.TABLES['test_extra']
+    assert to_unicode('\\zzfoo') == '\\zzfoo'
+
+
+def test_to_latex_streaming_matches_whole_text():
+    from mathutf.transliterate import to_latex, iter_to_latex
+    text = '∀ε>0 ∃δ: x₁₂² ≤ αβy, eⁱᵗ ∈ ℝ plain ascii ᵦᵧ' * 5
+    want = to_latex(text)
+    assert want.count('x_{12}^2') == 5
+    assert '\\alpha\\beta y' in want
+    for chunk_size in [1, 2, 3, 7, 64, 1 << 16]:
+        got = ''.join(iter_to_latex(io.StringIO(text), chunk_size=chunk_size))
+        assert got == want, chunk_size
+
+
+def test_to_latex_streaming_long_runs():
+    """
+    Long runs of scripts and control words are written as they are read.
+    """
+    from mathutf.transliterate import to_latex, iter_to_latex
+    text = 'x' + '₁' * 1000 + 'ᵦ' * 1000 + 'α' * 1000 + ' y'
+    pieces = list(iter_to_latex(io.StringIO(text), chunk_size=10))
+    assert ''.join(pieces) == to_latex(text)
+    assert len(pieces) > 250
+    assert max(map(len, pieces)) < 100
+
+
+def test_to_latex_round_trip():
+    from mathutf.transliterate import to_latex, to_unicode
+    # to_unicode keeps the space that to_latex adds after a control word
+    text = '∀ x ∈ ℝ: x² ≥ 0 ⇒ α₁ ≠ ∞'
+    assert to_unicode(to_latex(text)) == text
+
+
+def test_braced_scripts_round_trip():
+    from mathutf.transliterate import iter_to_unicode, to_latex, to_unicode
+    text = 'aᵦᵧ + x₁₂² ∈ ℝ², ∑ᵢ₌₁ⁿ'
+    latex = to_latex(text)
+    assert '_{\\beta\\gamma}' in latex and '_{12}^2' in latex
+    assert to_unicode(latex) == text
+    assert to_unicode('\\mathbb{R}^{2}') == 'ℝ²'
+    # a group with a character that has no script form is kept
+    assert to_unicode('x^{n*k} + y_{}') == 'x^{n*k} + y_{}'
+    long_group = 'x_{' + '1' * 40 + '}'
+    assert to_unicode(long_group) == long_group
+    stream = (latex + ' x^{n*k} ' + long_group) * 5
+    want = to_unicode(stream)
+    for chunk_size in [1, 2, 5, 33, 1 << 16]:
+        got = ''.join(iter_to_unicode(io.StringIO(stream), chunk_size))
+        assert got == want, chunk_size
+
+
+def test_scripts_round_trip_through_latex():
+    from mathutf.transliterate import (
+        script_map, to_latex, to_subscript, to_superscript)
+    for kind, convert, mark in [('subscript', to_subscript, '_'),
+                                ('superscript', to_superscript, '^')]:
+        chars = ''.join(script_map(kind))
+        scripted = convert(chars)
+        assert len(scripted) == len(chars)
+        assert convert(scripted) == scripted
+        # every script character is known to to_latex
+        assert to_latex(scripted).startswith(mark)
+
+
+def test_scripts_follow_table_changes():
+    import pytest
+    from mathutf import symbols
+    from mathutf.transliterate import render_scripts, to_superscript
+    with pytest.raises(ValueError):
+        to_superscript('β')
+    symbols.TABLES['test_extra'] = [
+        {'chr': 'ᵝ', 'key': 'zzsup_beta', 'tex': '^\\beta',
+         'utf_name': 'MODIFIER LETTER SMALL BETA'},
+    ]
+    try:
+        assert render_scripts('n^{β+1}') == 'nᵝ⁺¹'
+    finally:
+        del symbols.TABLES['test_extra']
+    assert render_scripts('n^{β+1}') == 'n^{β+1}'
+
+
+def test_render_scripts_letters():
+    import pytest
+    from mathutf.transliterate import render_scripts, to_subscript
+    assert render_scripts('n^{k+1}') == 'nᵏ⁺¹'
+    assert render_scripts('x_{k} + T^{AB}') == 'xₖ + Tᴬᴮ'
+    assert to_subscript('aeoxhklmnpst') == 'ₐₑₒₓₕₖₗₘₙₚₛₜ'
+    for text in ['x_1', 'no markup']:
+        with pytest.raises(ValueError):
+            render_scripts(text, errors='replace')
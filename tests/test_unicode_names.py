@@ -0,0 +1,48 @@
+import unicodedata
+
+
+def test_index_covers_every_named_codepoint(tmp_path):
+    from mathutf.unicode_names import UnicodeNameIndex, normalize_name
+    index = UnicodeNameIndex.build(dpath=str(tmp_path))
+    try:
+        expected = {chr(i) for i in range(0x110000)
+                    if unicodedata.name(chr(i), None) is not None}
+        found = {chr_ for _, chr_ in index.prefix_items('')}
+        assert found == expected
+        assert index.unidata_version == unicodedata.unidata_version
+        for chr_ in ['α', '∞', '𝔽', '\U0001F600']:
+            assert index.get(normalize_name(unicodedata.name(chr_))) == chr_
+    finally:
+        index.close()
+
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    import os
+    from mathutf.unicode_names import UnicodeNameIndex
+    index = UnicodeNameIndex.build(dpath=str(tmp_path))
+    num_names = len(index)
+    fpath = index.fpath
+    index.close()
+    size = os.path.getsize(fpath)
+    for keep in [size - 1, size // 2, 100, 10, 0]:
+        with open(fpath, 'r+b') as file:
+            file.truncate(keep)
+        index = UnicodeNameIndex.load_or_build(fpath)
+        try:
+            assert len(index) == num_names
+            assert index.get('nabla') == '∇'
+        finally:
+            index.close()
+
+
+def test_search_all_unicode(tmp_path, monkeypatch):
+    from mathutf import symbols
+    from mathutf import unicode_names
+    monkeypatch.setenv('MATHUTF_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(unicode_names, '_GLOBAL_INDEX', None)
+    results = list(symbols.search('greek_capital_letter_th*', all_unicode=True))
+    assert [r.chr for r in results] == ['Θ']
+    assert results[0].group == 'unicode'
+    assert list(tmp_path.glob('unicode_names_v*.bin'))
+    results = list(symbols.search('DOUBLE-STRUCK CAPITAL R', all_unicode=True))
+    assert [r.chr for r in results] == ['ℝ']